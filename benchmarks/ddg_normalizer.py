@@ -0,0 +1,116 @@
+"""Бенчмарк нормализации результатов DuckDuckGo: прежний _parse_ddg_result
+(inline-регулярки и кортеж служебных путей) против parsers.normalizer.
+
+Запуск из корня проекта:
+
+    python -m benchmarks.ddg_normalizer [results.json]
+
+results.json — список сырых результатов ddgs.text ({href, title, body}).
+Без аргумента используется детерминированный набор из 5000 результатов
+в формате выдачи DDG по site:t.me (каналы, посты, служебные страницы, дубли).
+"""
+
+import json
+import random
+import re
+import sys
+import timeit
+from pathlib import Path
+
+from parsers.normalizer import normalize_many
+
+ROUNDS = 20
+LIMIT = 20
+
+
+def legacy_parse(item: dict) -> dict | None:
+    """Прежняя реализация TgstatParser._parse_ddg_result."""
+    href = item.get("href", "")
+    title = item.get("title", "")
+    body = item.get("body", "")
+    match = re.search(r"t\.me/(?:s/)?([a-zA-Z]\w{3,})", href)
+    if not match:
+        return None
+    username = match.group(1)
+    if username.lower() in ("s", "addstickers", "joinchat", "addtheme", "proxy"):
+        return None
+    clean_title = re.sub(
+        r"^Telegram:\s*(Contact|View|Join)\s*@\S+\s*[-–—]?\s*", "", title,
+    ).strip()
+    clean_title = re.sub(r"\s*[-–—]\s*Telegram\s*$", "", clean_title).strip()
+    if not clean_title:
+        clean_title = f"@{username}"
+    return {
+        "username": username,
+        "title": clean_title,
+        "description": body[:500] if body else None,
+        "subscribers_count": None,
+        "category": None,
+    }
+
+
+def legacy_normalize(results: list[dict], limit: int | None) -> list[dict]:
+    seen: set[str] = set()
+    channels: list[dict] = []
+    for item in results:
+        channel = legacy_parse(item)
+        if not channel or channel["username"] in seen:
+            continue
+        seen.add(channel["username"])
+        channels.append(channel)
+        if limit is not None and len(channels) >= limit:
+            break
+    return channels
+
+
+def generate_results(count: int = 5000, seed: int = 42) -> list[dict]:
+    """Синтетическая выдача DDG: разные формы ссылок и заголовков t.me."""
+    rnd = random.Random(seed)
+    words = ["python", "design", "remote", "jobs", "freelance", "smm", "devops", "orders"]
+    results = []
+    for i in range(count):
+        username = f"{rnd.choice(words)}_{rnd.choice(words)}{rnd.randint(0, count // 4)}"
+        href = rnd.choice([
+            f"https://t.me/{username}",
+            f"https://t.me/s/{username}",
+            f"https://t.me/{username}/{rnd.randint(1, 9999)}",
+            "https://t.me/joinchat/AAAAAEx1abc",
+            "https://t.me/addstickers/pack",
+            "https://t.me/abc",
+        ])
+        title = rnd.choice([
+            f"Telegram: Contact @{username}",
+            f"Telegram: View @{username} – Вакансии {i}",
+            f"Вакансии для фрилансеров {i} - Telegram",
+            f"{username} — Telegram",
+            "",
+        ])
+        body = "Удалённая работа и заказы. " * rnd.randint(0, 30)
+        results.append({"href": href, "title": title, "body": body})
+    return results
+
+
+def main() -> None:
+    if len(sys.argv) > 1:
+        results = json.loads(Path(sys.argv[1]).read_text(encoding="utf-8"))
+    else:
+        results = generate_results()
+
+    for limit in (LIMIT, None):
+        old = legacy_normalize(results, limit)
+        new = normalize_many(results, limit=limit)
+        if old != new:
+            raise SystemExit(f"limit={limit}: results differ")
+
+        old_time = timeit.timeit(lambda: legacy_normalize(results, limit), number=ROUNDS)
+        new_time = timeit.timeit(lambda: normalize_many(results, limit=limit), number=ROUNDS)
+        print(
+            f"{len(results)} results, limit={limit}: {len(new)} channels, "
+            f"legacy {old_time / ROUNDS * 1000:.2f} ms, "
+            f"normalizer {new_time / ROUNDS * 1000:.2f} ms, "
+            f"x{old_time / new_time:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
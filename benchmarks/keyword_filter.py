@@ -0,0 +1,84 @@
+"""Бенчмарк предфильтра постов: отдельный regex на каждого пользователя
+против общего индекса parsers.keyword_filter.KeywordFilter.
+
+Запуск из корня проекта:
+
+    python -m benchmarks.keyword_filter [users] [posts]
+
+По умолчанию — 200 профилей по 5 ключевых слов и 2000 синтетических постов.
+"""
+
+import random
+import re
+import sys
+import time
+
+from parsers.keyword_filter import KeywordFilter
+
+_KEYWORDS = [
+    "python", "django", "дизайн", "figma", "лендинг", "telegram бот", "парсер",
+    "smm", "таргет", "копирайтинг", "seo", "верстка", "react", "1с", "монтаж видео",
+    "иллюстрации", "логотип", "wordpress", "тильда", "аналитика", "excel",
+]
+_FILLER = [
+    "сегодня", "канал", "новости", "подборка", "опыт", "клиент", "работы",
+    "недели", "кейсы", "команда", "сроки", "результат", "для", "и", "в",
+]
+_MARKERS = ["Ищу", "Требуется", "Нужен", "Бюджет", "Оплата", "Задача"]
+
+
+def generate(users: int, posts: int, seed: int = 42) -> tuple[dict[str, list[str]], list[str]]:
+    rnd = random.Random(seed)
+    profiles = {f"user{i}": rnd.sample(_KEYWORDS, 5) for i in range(users)}
+    texts = []
+    for _ in range(posts):
+        words = rnd.choices(_FILLER, k=rnd.randint(20, 80))
+        if rnd.random() < 0.3:
+            words.insert(0, rnd.choice(_MARKERS))
+        if rnd.random() < 0.4:
+            words.insert(rnd.randrange(len(words)), rnd.choice(_KEYWORDS))
+        texts.append(" ".join(words))
+    return profiles, texts
+
+
+def naive_filters(profiles: dict[str, list[str]]) -> dict[str, re.Pattern]:
+    """Как сделали бы «в лоб»: regex из маркеров и слов — на каждого пользователя."""
+    markers = "|".join(["ищу", "ищем", "требуется", "нужен", "бюджет", "оплата", "задача"])
+    return {
+        owner: re.compile(
+            markers + "|" + "|".join(re.escape(k) for k in keywords), re.IGNORECASE,
+        )
+        for owner, keywords in profiles.items()
+    }
+
+
+def main() -> None:
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    posts = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    profiles, texts = generate(users, posts)
+
+    filters = naive_filters(profiles)
+    started = time.perf_counter()
+    naive_hits = sum(
+        1 for text in texts for pattern in filters.values() if pattern.search(text)
+    )
+    naive_time = time.perf_counter() - started
+
+    index = KeywordFilter.for_owners(profiles)
+    started = time.perf_counter()
+    survivors = 0
+    for text in texts:
+        if index.match(text):
+            survivors += 1
+    index_time = time.perf_counter() - started
+
+    print(
+        f"{users} profiles, {posts} posts: "
+        f"per-user regex {naive_time:.2f}s ({naive_hits} user hits), "
+        f"shared index {index_time:.2f}s ({survivors} posts survive, "
+        f"{posts / index_time:,.0f} posts/s), x{naive_time / index_time:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Нагрузочный бенчмарк LLM-части бота на локальной заглушке провайдера.
+
+N одновременных «пользователей» проходят сценарий:
+
+- compose — ComposerService.generate_broadcast по профилю и --rounds доработок
+  (история растёт, как в чате «Составить текст»); с --stream — потоком;
+- classify — VacancyClassifier.classify_many на --posts синтетических постах;
+- mixed — половина пользователей compose, половина classify.
+
+Заглушка (benchmarks.llm_stub_server) поднимается в том же процессе, если
+не задан --base-url, — провайдер и сеть не нужны. Результат: пропускная
+способность, p50/p95/p99 задержки операции и первого фрагмента потока,
+ошибки и сводка llm.metrics.
+
+Запуск из корня проекта:
+
+    python -m benchmarks.llm_load --users 50 --rounds 3 --stream --latency 0.8
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from dataclasses import dataclass, field
+
+from benchmarks.llm_stub_server import add_stub_arguments, config_from_args, start_stub
+
+_INSTRUCTIONS = [
+    "Сделай короче",
+    "Добавь про опыт работы с интернет-магазинами",
+    "Тон чуть менее официальный",
+    "Убери эмодзи",
+]
+
+_POSTS = [
+    "Ищем дизайнера для лендинга онлайн-школы, бюджет 40 000 ₽, пишите @school_hr",
+    "Продаю курс по таргету со скидкой 50%, только сегодня!",
+    "Нужен python-разработчик на парсер маркетплейса, оплата сдельная, контакт @dev_lead",
+    "Дайджест новостей дизайна за неделю: подборка лучших кейсов",
+    "Требуется SMM-специалист на ведение двух аккаунтов, удалённо, 30к в месяц",
+]
+
+
+@dataclass
+class Results:
+    """Замеры одного прогона."""
+
+    latencies: list[float] = field(default_factory=list)
+    first_delta: list[float] = field(default_factory=list)
+    errors: dict[str, int] = field(default_factory=dict)
+
+    def error(self, exc: BaseException) -> None:
+        name = type(exc).__name__
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def compose_user(user: int, args: argparse.Namespace, results: Results) -> None:
+    from services.composer import ComposerService
+
+    composer = ComposerService()
+    history = [{
+        "role": "user",
+        "content": "Мой профиль фрилансера:\n- Специализации: Дизайн, Вёрстка\n"
+                   f"- Описание услуг: лендинги и магазины (пользователь {user})\n\n"
+                   "Сгенерируй рассылочное сообщение на основе моего профиля.",
+    }]
+    for round_no in range(args.rounds + 1):
+        if round_no:
+            history.append({"role": "user", "content": random.choice(_INSTRUCTIONS)})
+
+        started = time.monotonic()
+        first_delta: list[float] = []
+
+        def on_delta(_: str) -> None:
+            if not first_delta:
+                first_delta.append(time.monotonic() - started)
+
+        try:
+            text = await composer.generate_broadcast(
+                f"user-{user}", history, on_delta=on_delta if args.stream else None,
+            )
+        except Exception as e:
+            results.error(e)
+            continue
+        results.latencies.append(time.monotonic() - started)
+        results.first_delta.extend(first_delta)
+        history.append({"role": "assistant", "content": text})
+
+
+async def classify_user(user: int, args: argparse.Namespace, results: Results) -> None:
+    from services.vacancy_classifier import VacancyClassifier
+
+    classifier = VacancyClassifier()
+    rnd = random.Random(user)
+    posts = [f"{rnd.choice(_POSTS)} (#{user}-{i})" for i in range(args.posts)]
+    started = time.monotonic()
+    try:
+        classified = await classifier.classify_many(posts, ["дизайн", "лендинг", "python"])
+    except Exception as e:
+        results.error(e)
+        return
+    results.latencies.append(time.monotonic() - started)
+    failed = sum(result is None for result in classified)
+    if failed:
+        results.errors["unclassified"] = results.errors.get("unclassified", 0) + failed
+
+
+async def run(args: argparse.Namespace) -> None:
+    runner = stub = None
+    base_url = args.base_url
+    if base_url is None:
+        runner, stub, base_url = await start_stub(config_from_args(args))
+
+    # Настройки читаются при импорте bot.config — окружение задаём до импорта сервисов
+    os.environ.setdefault("BOT_TOKEN", "0:benchmark")
+    os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+    os.environ.setdefault("SUPABASE_KEY", "benchmark.offline.key")  # формат JWT, в БД не ходим
+    os.environ["LLM_BASE_URL"] = base_url
+    os.environ.setdefault("LLM_API_KEY", "benchmark")
+    if not args.cache:
+        os.environ["LLM_CACHE_BACKEND"] = "off"
+
+    from llm.metrics import get_llm_metrics
+
+    scenarios = {"compose": compose_user, "classify": classify_user}
+    results = Results()
+    tasks = []
+    for user in range(args.users):
+        scenario = args.scenario
+        if scenario == "mixed":
+            scenario = "compose" if user % 2 == 0 else "classify"
+        tasks.append(scenarios[scenario](user, args, results))
+
+    started = time.monotonic()
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        elapsed = time.monotonic() - started
+        if runner is not None:
+            await runner.cleanup()
+
+    done = len(results.latencies)
+    print(f"scenario={args.scenario} users={args.users} elapsed={elapsed:.2f}s")
+    print(f"operations: {done} ok, {done / elapsed:.1f}/s; errors: {results.errors or 'none'}")
+    for name, values in (("latency", results.latencies), ("first delta", results.first_delta)):
+        if values:
+            print(
+                f"{name}: p50 {percentile(values, 0.5):.3f}s, "
+                f"p95 {percentile(values, 0.95):.3f}s, "
+                f"p99 {percentile(values, 0.99):.3f}s, max {max(values):.3f}s"
+            )
+    if stub is not None:
+        print(f"stub: {stub.requests} requests, {stub.errors} injected errors")
+    metrics = get_llm_metrics()
+    print("llm tokens:", json.dumps(metrics.token_totals(), ensure_ascii=False))
+    print("llm metrics:", json.dumps(metrics.summary()["tags"], ensure_ascii=False))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=("compose", "classify", "mixed"),
+                        default="compose")
+    parser.add_argument("--users", type=int, default=20, help="одновременных пользователей")
+    parser.add_argument("--rounds", type=int, default=2, help="доработок после первого текста")
+    parser.add_argument("--posts", type=int, default=40, help="постов на классификацию")
+    parser.add_argument("--stream", action="store_true", help="compose потоком")
+    parser.add_argument("--cache", action="store_true", help="не выключать кэш ответов LLM")
+    parser.add_argument("--base-url", help="уже запущенная заглушка или другой провайдер")
+    add_stub_arguments(parser)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""Локальная заглушка OpenAI-совместимого API для бенчмарков без провайдера.
+
+Отвечает на POST /v1/chat/completions (обычный и stream-режим) заготовленными
+ответами с настраиваемой задержкой и ошибками:
+
+- задержка — логнормальная с медианой --latency и разбросом --sigma,
+  в stream-режиме: первый токен через эту задержку, дальше --tokens-per-sec;
+- --error-429 / --error-500 — доля ответов с этими кодами (429 с Retry-After);
+- --timeout-rate — доля запросов, которые «зависают» на --hang секунд;
+- на промпты классификатора отвечает JSON (одиночным объектом или массивом
+  по числу сообщений в пачке), на остальные — текстом из --responses
+  (JSON-список строк) или встроенным шаблоном рассылки;
+- usage, в том числе prompt_tokens_details.cached_tokens: system-промпт,
+  который уже встречался, считается взятым из кэша префиксов.
+
+Запуск из корня проекта:
+
+    python -m benchmarks.llm_stub_server --port 8800 --latency 0.8 --error-429 0.02
+
+и LLM_BASE_URL=http://127.0.0.1:8800/v1 в .env. Бенчмарк benchmarks.llm_load
+поднимает заглушку сам.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from aiohttp import web
+
+from llm.tokens import estimate_tokens
+
+_BATCH_ITEM = re.compile(r"^=== СООБЩЕНИЕ (\d+) ===$", re.MULTILINE)
+
+DEFAULT_RESPONSES = [
+    "Привет! Я веб-дизайнер с опытом 5 лет: делаю лендинги и интернет-магазины "
+    "под ключ — от прототипа до запуска. Недавно подняли конверсию клиента в 2 раза "
+    "за счёт редизайна карточек товара. Если нужен сайт, который продаёт, — "
+    "пишите в ЛС, обсудим задачу 🙂",
+    "Добрый день! Настраиваю таргетированную рекламу и веду соцсети для малого "
+    "бизнеса. Работаю с бюджетами от 30 тысяч, отчитываюсь каждую неделю. "
+    "Портфолио и кейсы пришлю в личных сообщениях — напишите, расскажу подробнее.",
+]
+
+
+@dataclass
+class StubConfig:
+    """Поведение заглушки: задержки, ошибки и заготовленные ответы."""
+
+    latency: float = 0.5
+    sigma: float = 0.5
+    tokens_per_sec: float = 80.0
+    error_429: float = 0.0
+    error_500: float = 0.0
+    timeout_rate: float = 0.0
+    hang: float = 120.0
+    responses: list[str] = field(default_factory=lambda: list(DEFAULT_RESPONSES))
+    seed: int | None = None
+
+
+class StubLLM:
+    """Обработчик /v1/chat/completions со статистикой полученных запросов."""
+
+    def __init__(self, config: StubConfig) -> None:
+        self.config = config
+        self._random = random.Random(config.seed)
+        self._seen_prefixes: set[int] = set()
+        self.requests = 0
+        self.errors = 0
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self.handle)
+        app.router.add_post("/chat/completions", self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        self.requests += 1
+
+        error = self._pick_error()
+        if error is not None:
+            self.errors += 1
+            return error
+        if self._random.random() < self.config.timeout_rate:
+            # Клиент должен отвалиться по своему таймауту
+            await asyncio.sleep(self.config.hang)
+
+        messages = body.get("messages") or []
+        text = self._answer(messages)
+        usage = self._usage(messages, text)
+        n = int(body.get("n") or 1)
+
+        if body.get("stream"):
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            return await self._stream(request, body, text, usage if include_usage else None)
+
+        await asyncio.sleep(self._latency() + estimate_tokens(text) / self.config.tokens_per_sec)
+        choices = [
+            {
+                "index": i,
+                "message": {"role": "assistant", "content": text if i == 0 else self._canned()},
+                "finish_reason": "stop",
+            }
+            for i in range(n)
+        ]
+        return web.json_response(self._envelope(body, "chat.completion", choices, usage))
+
+    def _pick_error(self) -> web.Response | None:
+        roll = self._random.random()
+        if roll < self.config.error_429:
+            return web.json_response(
+                {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}},
+                status=429,
+                headers={"retry-after-ms": "200"},
+            )
+        if roll < self.config.error_429 + self.config.error_500:
+            return web.json_response(
+                {"error": {"message": "Internal error", "type": "server_error"}},
+                status=500,
+            )
+        return None
+
+    async def _stream(self, request: web.Request, body: dict, text: str,
+                      usage: dict | None) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        await asyncio.sleep(self._latency())
+
+        words = re.findall(r"\S+\s*", text)
+        delay = 1.0 / self.config.tokens_per_sec
+        for word in words:
+            choice = {"index": 0, "delta": {"content": word}, "finish_reason": None}
+            await self._send(response, self._envelope(body, "chat.completion.chunk", [choice]))
+            await asyncio.sleep(delay * max(1, estimate_tokens(word)))
+
+        done = {"index": 0, "delta": {}, "finish_reason": "stop"}
+        await self._send(response, self._envelope(body, "chat.completion.chunk", [done]))
+        if usage is not None:
+            # Как у OpenAI: usage — отдельным последним чанком с пустым choices
+            await self._send(response, self._envelope(body, "chat.completion.chunk", [], usage))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    @staticmethod
+    async def _send(response: web.StreamResponse, payload: dict) -> None:
+        await response.write(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode())
+
+    @staticmethod
+    def _envelope(body: dict, kind: str, choices: list[dict], usage: dict | None = None) -> dict:
+        return {
+            "id": f"stub-{uuid.uuid4().hex[:12]}",
+            "object": kind,
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": choices,
+            "usage": usage,
+        }
+
+    def _answer(self, messages: list[dict]) -> str:
+        system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+        user = messages[-1]["content"] if messages else ""
+        if "классификатор вакансий" not in system:
+            return self._canned()
+
+        batch = [int(i) for i in _BATCH_ITEM.findall(user)]
+        if batch:
+            return json.dumps([{"id": i, **self._classification()} for i in batch],
+                              ensure_ascii=False)
+        return json.dumps(self._classification(), ensure_ascii=False)
+
+    def _canned(self) -> str:
+        return self._random.choice(self.config.responses)
+
+    def _classification(self) -> dict:
+        if self._random.random() < 0.3:
+            return {
+                "is_vacancy": True,
+                "title": "Нужен дизайнер лендинга",
+                "budget": "от 30 000 ₽",
+                "contact": "@client",
+                "relevance_score": round(self._random.random(), 2),
+            }
+        return {"is_vacancy": False, "title": None, "budget": None, "contact": None,
+                "relevance_score": 0.0}
+
+    def _usage(self, messages: list[dict], text: str) -> dict:
+        prompt = sum(estimate_tokens(m.get("content") or "") + 4 for m in messages)
+        completion = estimate_tokens(text)
+        cached = 0
+        if messages and messages[0].get("role") == "system":
+            prefix = hash(messages[0]["content"])
+            if prefix in self._seen_prefixes:
+                cached = estimate_tokens(messages[0]["content"])
+            self._seen_prefixes.add(prefix)
+        return {
+            "prompt_tokens": prompt,
+            "completion_tokens": completion,
+            "total_tokens": prompt + completion,
+            "prompt_tokens_details": {"cached_tokens": cached},
+        }
+
+    def _latency(self) -> float:
+        if self.config.latency <= 0:
+            return 0.0
+        return self.config.latency * self._random.lognormvariate(0, self.config.sigma)
+
+
+async def start_stub(config: StubConfig, port: int = 0,
+                     host: str = "127.0.0.1") -> tuple[web.AppRunner, StubLLM, str]:
+    """Поднимает заглушку; возвращает (runner для cleanup(), обработчик, base_url)."""
+    stub = StubLLM(config)
+    runner = web.AppRunner(stub.app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = runner.addresses[0][1]
+    return runner, stub, f"http://{host}:{bound_port}/v1"
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser) -> None:
+    """Параметры заглушки — общие для сервера и бенчмарка."""
+    parser.add_argument("--latency", type=float, default=0.5,
+                        help="медиана задержки до ответа / первого токена, сек")
+    parser.add_argument("--sigma", type=float, default=0.5,
+                        help="разброс логнормальной задержки (0 — постоянная)")
+    parser.add_argument("--tokens-per-sec", type=float, default=80.0)
+    parser.add_argument("--error-429", type=float, default=0.0, help="доля ответов 429")
+    parser.add_argument("--error-500", type=float, default=0.0, help="доля ответов 500")
+    parser.add_argument("--timeout-rate", type=float, default=0.0,
+                        help="доля запросов, зависающих на --hang сек")
+    parser.add_argument("--hang", type=float, default=120.0)
+    parser.add_argument("--responses", type=Path, help="JSON-список заготовленных ответов")
+    parser.add_argument("--seed", type=int)
+
+
+def config_from_args(args: argparse.Namespace) -> StubConfig:
+    config = StubConfig(
+        latency=args.latency,
+        sigma=args.sigma,
+        tokens_per_sec=args.tokens_per_sec,
+        error_429=args.error_429,
+        error_500=args.error_500,
+        timeout_rate=args.timeout_rate,
+        hang=args.hang,
+        seed=args.seed,
+    )
+    if args.responses:
+        config.responses = json.loads(args.responses.read_text(encoding="utf-8"))
+    return config
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    stub = StubLLM(config_from_args(args))
+    web.run_app(stub.app(), host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Бенчмарк подбора подписчиков к вакансии: перебор всех профилей
+против db.profile_index.ProfileIndex.
+
+Запуск из корня проекта:
+
+    python -m benchmarks.profile_index [profiles] [vacancies]
+
+По умолчанию — 100 000 профилей по 3–5 ключевых слов из словаря в ~3000 слов
+и 200 вакансий.
+Результаты обоих способов сверяются.
+"""
+
+import random
+import sys
+import time
+
+from benchmarks.keyword_filter import _FILLER, _KEYWORDS
+from db.profile_index import ProfileIndex
+from parsers.keyword_filter import KeywordFilter
+
+_BUDGETS = [None, 5_000, 10_000, 30_000, 50_000, 100_000]
+_FORMATS = ["oneoff", "project", "permanent"]
+# Словарь профилей: частые слова и «длинный хвост» узких навыков
+_VOCABULARY = _KEYWORDS + [f"skill{i}" for i in range(3000)]
+
+
+def generate(profiles: int, vacancies: int,
+             seed: int = 42) -> tuple[list[dict], list[tuple[str, int | None, str | None]]]:
+    rnd = random.Random(seed)
+    rows = [
+        {
+            "id": f"profile{i}",
+            "user_id": f"user{i}",
+            "keywords": rnd.sample(_VOCABULARY, rnd.randint(3, 5)),
+            "min_budget": rnd.choice(_BUDGETS),
+            "work_format": rnd.sample(_FORMATS, rnd.randint(0, 2)),
+        }
+        for i in range(profiles)
+    ]
+    items = []
+    for _ in range(vacancies):
+        words = rnd.choices(_FILLER, k=rnd.randint(20, 60))
+        for keyword in rnd.sample(_VOCABULARY, rnd.randint(1, 3)):
+            words.insert(rnd.randrange(len(words)), keyword)
+        items.append((
+            " ".join(words),
+            rnd.choice([None, 3_000, 20_000, 80_000]),
+            rnd.choice([None, *_FORMATS]),
+        ))
+    return rows, items
+
+
+def naive_match(rows: list[dict], keyword_filter: KeywordFilter, text: str,
+                budget: int | None, work_format: str | None) -> set[str]:
+    """Как сделали бы «в лоб»: слова — общим KeywordFilter, остальное — перебором профилей."""
+    hits = keyword_filter.match(text)
+    return {
+        row["user_id"] for row in rows
+        if row["id"] in hits
+        and (budget is None or not row["min_budget"] or row["min_budget"] <= budget)
+        and (work_format is None or not row["work_format"] or work_format in row["work_format"])
+    }
+
+
+def main() -> None:
+    profiles = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    vacancies = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rows, items = generate(profiles, vacancies)
+
+    started = time.perf_counter()
+    index = ProfileIndex()
+    index.load(rows)
+    build_time = time.perf_counter() - started
+
+    keyword_filter = KeywordFilter.for_owners({row["id"]: row["keywords"] for row in rows})
+    started = time.perf_counter()
+    expected = [naive_match(rows, keyword_filter, *item) for item in items]
+    naive_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    found = [index.match(*item) for item in items]
+    index_time = time.perf_counter() - started
+
+    assert found == expected, "index and full scan disagree"
+    matched = sum(len(users) for users in found)
+    print(
+        f"{profiles} profiles, {vacancies} vacancies ({matched} user matches): "
+        f"index built in {build_time:.2f}s, "
+        f"full scan {naive_time / vacancies * 1000:.2f} ms/vacancy, "
+        f"index {index_time / vacancies * 1000:.3f} ms/vacancy, "
+        f"x{naive_time / index_time:.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
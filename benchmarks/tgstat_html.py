@@ -0,0 +1,83 @@
+"""Микробенчмарк разбора ответа tgstat: старый путь (html.parser + select_one)
+против текущего TgstatParser._parse_tgstat_html.
+
+Запуск из корня проекта (нужен заполненный .env, как для бота):
+
+    python -m benchmarks.tgstat_html [путь к HTML ...]
+
+По умолчанию берётся benchmarks/fixtures/tgstat_search.html — ответ поиска
+tgstat на 30 карточек. Перед замером проверяется, что оба пути возвращают
+одинаковые словари.
+"""
+
+import re
+import sys
+import timeit
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from parsers.tgstat import _HTML_PARSER, TgstatParser
+
+FIXTURES = [Path(__file__).parent / "fixtures" / "tgstat_search.html"]
+LIMIT = 20
+ROUNDS = 200
+
+
+def legacy_parse(html: str, limit: int) -> list[dict]:
+    """Прежняя реализация _parse_tgstat_html / _parse_tgstat_card."""
+    soup = BeautifulSoup(html, "html.parser")
+    results: list[dict] = []
+    for card in soup.select(".peer-item-row")[:limit]:
+        data: dict = {
+            "username": None,
+            "title": None,
+            "description": None,
+            "subscribers_count": None,
+            "category": None,
+        }
+        link = card.select_one("a[href*='/channel/@']")
+        if link:
+            for part in str(link.get("href", "")).split("/"):
+                if part.startswith("@"):
+                    data["username"] = part.lstrip("@")
+                    break
+        title_el = card.select_one(".font-16.text-dark")
+        if title_el:
+            data["title"] = title_el.get_text(strip=True)
+        subs_el = card.select_one(".font-14.text-dark")
+        if subs_el:
+            digits = re.sub(r"[^\d\s]", "", subs_el.get_text(strip=True)).replace(" ", "")
+            if digits:
+                data["subscribers_count"] = int(digits)
+        cat_el = card.select_one(".font-12.text-dark span")
+        if cat_el:
+            data["category"] = cat_el.get_text(strip=True)
+        if data["username"]:
+            results.append(data)
+    return results
+
+
+def main() -> None:
+    paths = [Path(p) for p in sys.argv[1:]] or FIXTURES
+    parser = TgstatParser()
+
+    for path in paths:
+        html = path.read_text(encoding="utf-8")
+        old = legacy_parse(html, LIMIT)
+        new = parser._parse_tgstat_html(html, LIMIT)
+        if old != new:
+            raise SystemExit(f"{path.name}: results differ\nold={old}\nnew={new}")
+
+        old_time = timeit.timeit(lambda: legacy_parse(html, LIMIT), number=ROUNDS)
+        new_time = timeit.timeit(lambda: parser._parse_tgstat_html(html, LIMIT), number=ROUNDS)
+        print(
+            f"{path.name}: {len(new)} channels, "
+            f"legacy {old_time / ROUNDS * 1000:.2f} ms, "
+            f"current ({_HTML_PARSER}) {new_time / ROUNDS * 1000:.2f} ms, "
+            f"x{old_time / new_time:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
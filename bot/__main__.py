@@ -11,6 +11,13 @@ from bot.config import settings
 from bot.handlers import register_all_handlers
 from bot.middlewares.auth import AuthMiddleware
 from bot.middlewares.throttling import ThrottlingMiddleware
+from db.connection import close_supabase_client
+from db.user_cache import get_user_cache
+from llm.cache import get_completion_cache
+from llm.metrics import get_llm_metrics, run_summary_log, start_metrics_server
+from parsers.executor import get_parser_executor
+from parsers.tgstat_sessions import get_tgstat_session_pool, run_maintenance
+from scheduler.jobs import get_scheduler, start_vacancy_monitor, stop_scheduler
 
 logging.basicConfig(
     level=logging.INFO,
@@ -33,11 +40,43 @@ async def main() -> None:
     # Хендлеры
     register_all_handlers(dp)
 
+    # Прогрев и обновление сессий tgstat в фоне
+    tgstat_maintenance = asyncio.create_task(run_maintenance(get_tgstat_session_pool()))
+
+    # Метрики LLM: периодическая сводка в лог и /metrics для Prometheus
+    metrics = get_llm_metrics()
+    background = [tgstat_maintenance]
+    if settings.llm_metrics_log_interval > 0:
+        background.append(asyncio.create_task(
+            run_summary_log(metrics, settings.llm_metrics_log_interval),
+        ))
+    metrics_server = None
+    if settings.metrics_port:
+        metrics_server = await start_metrics_server(metrics, settings.metrics_port)
+
+    # Фоновые задачи: мониторинг вакансий
+    start_vacancy_monitor(bot)
+    get_scheduler().start()
+
     logger.info("Бот запускается...")
     try:
         await dp.start_polling(bot)
     finally:
+        for task in background:
+            task.cancel()
+        await stop_scheduler()
+        if metrics_server is not None:
+            await metrics_server.cleanup()
         await bot.session.close()
+        await close_supabase_client()
+        get_parser_executor().shutdown()
+        logger.info("User cache stats: %s", get_user_cache().stats())
+        logger.info("Parser executor stats: %s", get_parser_executor().stats())
+        completion_cache = get_completion_cache()
+        if completion_cache is not None:
+            logger.info("LLM cache stats: %s", completion_cache.stats())
+            completion_cache.close()
+        logger.info("LLM metrics: %s", metrics.summary())
         logger.info("Бот остановлен.")
 
 
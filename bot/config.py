@@ -28,11 +28,77 @@ class Settings:
     # Supabase (MVP)
     supabase_url: str
     supabase_key: str
+    supabase_pool_size: int = 50
+    supabase_timeout: float = 15.0
+
+    # Кэш пользователей в AuthMiddleware
+    user_cache_size: int = 10_000
+    user_cache_ttl: float = 300.0
+
+    # Кэш результатов поиска каналов (радар)
+    search_cache_size: int = 1000
+    search_cache_ttl: float = 1800.0
+    search_cache_stale_ttl: float = 6 * 3600.0
+    search_cache_negative_ttl: float = 120.0
+
+    # Парсеры: размер пула потоков и лимиты одновременных запросов
+    parser_workers: int = 8
+    parser_max_in_flight: int = 8
+    parser_per_user: int = 2
+    parser_search_mode: str = "sequential"
+    tgstat_sessions: int = 3
+    tgstat_session_max_age: float = 1800.0
 
     # LLM
     llm_base_url: str = "https://api.openai.com/v1"
     llm_api_key: str = ""
     llm_model: str = "gpt-4o-mini"
+    llm_native_n: bool = False
+    llm_variant_concurrency: int = 3
+    llm_variant_timeout: float = 45.0
+    # Запрашивать usage в потоковых ответах (stream_options.include_usage)
+    llm_stream_usage: bool = True
+    # Сводка метрик LLM в лог раз в N секунд (0 — выкл.) и порт /metrics (0 — выкл.)
+    llm_metrics_log_interval: float = 600.0
+    metrics_port: int = 0
+    # Несколько провайдеров LLM: JSON-список endpoint'ов (пусто — только LLM_BASE_URL)
+    llm_endpoints: str = ""
+    # Через сколько секунд дублировать медленный запрос на другой endpoint (0 — никогда)
+    llm_hedge_after: float = 0.0
+    # Лимиты провайдера LLM (0 — без лимита), повторы и предохранитель
+    llm_rpm: int = 0
+    llm_tpm: int = 0
+    llm_max_attempts: int = 3
+    llm_breaker_threshold: int = 5
+    llm_breaker_reset: float = 30.0
+    # Кэш ответов LLM: memory / sqlite / off
+    llm_cache_backend: str = "memory"
+    llm_cache_path: str = "data/llm_cache.sqlite3"
+    llm_cache_size: int = 10_000
+    llm_cache_ttl: float = 7 * 24 * 3600.0
+    llm_cache_max_temperature: float = 0.3
+    # Средняя цена 1000 токенов — для оценки экономии от кэша
+    llm_price_per_1k_tokens: float = 0.0
+    # Классификация вакансий пачками: бюджет токенов и размер пачки, параллельных запросов
+    classify_batch_tokens: int = 6000
+    classify_batch_size: int = 20
+    classify_concurrency: int = 4
+    # Почти одинаковые сообщения: порог SimHash (бит), окно и размер индекса в памяти
+    dedup_max_distance: int = 6
+    dedup_window_days: int = 7
+    dedup_index_size: int = 100_000
+    # Сбор постов каналов (t.me/s): параллельных загрузок, страниц за обход,
+    # сколько обходов максимум пропускает канал без новых постов
+    channel_parse_concurrency: int = 8
+    channel_fetch_pages: int = 5
+    channel_idle_max_skip: int = 8
+    monitor_interval: int = 300
+    monitor_batch_limit: int = 500
+    # «Составить текст»: бюджет токенов запроса с историей и сколько последних сообщений не сжимать
+    compose_history_tokens: int = 4000
+    compose_history_keep_last: int = 4
+    # Минимальный интервал между правками сообщения при стриминге ответа (сек)
+    stream_edit_interval: float = 1.0
 
     # Рассылка (дефолты)
     default_broadcast_limit: int = 5
@@ -56,9 +122,56 @@ def _load_settings() -> Settings:
         admin_ids=_parse_admin_ids(getenv("ADMIN_IDS", "")),
         supabase_url=supabase_url,
         supabase_key=supabase_key,
+        supabase_pool_size=int(getenv("SUPABASE_POOL_SIZE", "50")),
+        supabase_timeout=float(getenv("SUPABASE_TIMEOUT", "15")),
+        user_cache_size=int(getenv("USER_CACHE_SIZE", "10000")),
+        user_cache_ttl=float(getenv("USER_CACHE_TTL", "300")),
+        search_cache_size=int(getenv("SEARCH_CACHE_SIZE", "1000")),
+        search_cache_ttl=float(getenv("SEARCH_CACHE_TTL", "1800")),
+        search_cache_stale_ttl=float(getenv("SEARCH_CACHE_STALE_TTL", "21600")),
+        search_cache_negative_ttl=float(getenv("SEARCH_CACHE_NEGATIVE_TTL", "120")),
+        parser_workers=int(getenv("PARSER_WORKERS", "8")),
+        parser_max_in_flight=int(getenv("PARSER_MAX_IN_FLIGHT", "8")),
+        parser_per_user=int(getenv("PARSER_PER_USER", "2")),
+        parser_search_mode=getenv("PARSER_SEARCH_MODE", "sequential"),
+        tgstat_sessions=int(getenv("TGSTAT_SESSIONS", "3")),
+        tgstat_session_max_age=float(getenv("TGSTAT_SESSION_MAX_AGE", "1800")),
         llm_base_url=getenv("LLM_BASE_URL", "https://api.openai.com/v1"),
         llm_api_key=getenv("LLM_API_KEY", ""),
         llm_model=getenv("LLM_MODEL", "gpt-4o-mini"),
+        llm_native_n=getenv("LLM_NATIVE_N", "").lower() in ("1", "true", "yes"),
+        llm_variant_concurrency=int(getenv("LLM_VARIANT_CONCURRENCY", "3")),
+        llm_variant_timeout=float(getenv("LLM_VARIANT_TIMEOUT", "45")),
+        llm_stream_usage=getenv("LLM_STREAM_USAGE", "true").lower() in ("1", "true", "yes"),
+        llm_metrics_log_interval=float(getenv("LLM_METRICS_LOG_INTERVAL", "600")),
+        metrics_port=int(getenv("METRICS_PORT", "0")),
+        llm_endpoints=getenv("LLM_ENDPOINTS", ""),
+        llm_hedge_after=float(getenv("LLM_HEDGE_AFTER", "0")),
+        llm_rpm=int(getenv("LLM_RPM", "0")),
+        llm_tpm=int(getenv("LLM_TPM", "0")),
+        llm_max_attempts=int(getenv("LLM_MAX_ATTEMPTS", "3")),
+        llm_breaker_threshold=int(getenv("LLM_BREAKER_THRESHOLD", "5")),
+        llm_breaker_reset=float(getenv("LLM_BREAKER_RESET", "30")),
+        llm_cache_backend=getenv("LLM_CACHE_BACKEND", "memory"),
+        llm_cache_path=getenv("LLM_CACHE_PATH", "data/llm_cache.sqlite3"),
+        llm_cache_size=int(getenv("LLM_CACHE_SIZE", "10000")),
+        llm_cache_ttl=float(getenv("LLM_CACHE_TTL", "604800")),
+        llm_cache_max_temperature=float(getenv("LLM_CACHE_MAX_TEMPERATURE", "0.3")),
+        llm_price_per_1k_tokens=float(getenv("LLM_PRICE_PER_1K_TOKENS", "0")),
+        classify_batch_tokens=int(getenv("CLASSIFY_BATCH_TOKENS", "6000")),
+        classify_batch_size=int(getenv("CLASSIFY_BATCH_SIZE", "20")),
+        classify_concurrency=int(getenv("CLASSIFY_CONCURRENCY", "4")),
+        dedup_max_distance=int(getenv("DEDUP_MAX_DISTANCE", "6")),
+        dedup_window_days=int(getenv("DEDUP_WINDOW_DAYS", "7")),
+        dedup_index_size=int(getenv("DEDUP_INDEX_SIZE", "100000")),
+        channel_parse_concurrency=int(getenv("CHANNEL_PARSE_CONCURRENCY", "8")),
+        channel_fetch_pages=int(getenv("CHANNEL_FETCH_PAGES", "5")),
+        channel_idle_max_skip=int(getenv("CHANNEL_IDLE_MAX_SKIP", "8")),
+        monitor_interval=int(getenv("MONITOR_INTERVAL", "300")),
+        monitor_batch_limit=int(getenv("MONITOR_BATCH_LIMIT", "500")),
+        compose_history_tokens=int(getenv("COMPOSE_HISTORY_TOKENS", "4000")),
+        compose_history_keep_last=int(getenv("COMPOSE_HISTORY_KEEP_LAST", "4")),
+        stream_edit_interval=float(getenv("STREAM_EDIT_INTERVAL", "1.0")),
         default_broadcast_limit=int(getenv("DEFAULT_BROADCAST_LIMIT", "5")),
         default_min_delay=int(getenv("DEFAULT_MIN_DELAY", "30")),
         default_max_delay=int(getenv("DEFAULT_MAX_DELAY", "120")),
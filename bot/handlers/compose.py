@@ -17,6 +17,7 @@ from bot.keyboards.compose import (
     get_vacancy_chat_keyboard,
 )
 from bot.states.compose import ComposeState
+from bot.streaming import MessageStreamer
 from services.composer import ComposerService
 
 router = Router(name="compose")
@@ -46,7 +47,7 @@ async def _cleanup(message: Message, state: FSMContext) -> None:
 async def show_compose_menu(callback: CallbackQuery, user: dict, state: FSMContext) -> None:
     """Показывает меню модуля «Составить текст»."""
     await state.clear()
-    templates = _service.get_templates(user["id"])
+    templates = await _service.get_templates(user["id"])
     await callback.message.edit_text(
         "<b>Составить текст</b>\n\n"
         "Генерирую продающие сообщения и отклики на вакансии с помощью ИИ.\n"
@@ -62,7 +63,7 @@ async def show_compose_menu(callback: CallbackQuery, user: dict, state: FSMConte
 async def back_to_compose(callback: CallbackQuery, user: dict, state: FSMContext) -> None:
     """Возврат в меню составления текста."""
     await state.clear()
-    templates = _service.get_templates(user["id"])
+    templates = await _service.get_templates(user["id"])
     await callback.message.edit_text(
         "<b>Составить текст</b>\n\n"
         "Генерирую продающие сообщения и отклики на вакансии с помощью ИИ.\n"
@@ -132,10 +133,12 @@ async def generate_from_profile(callback: CallbackQuery, user: dict, state: FSMC
     await callback.answer()
 
     try:
-        result, chat_history = await _service.generate_broadcast_from_profile(
-            user_id=user["id"],
-            length=length,
-        )
+        async with MessageStreamer(callback.message, "<b>Сообщение для рассылки</b>") as streamer:
+            result, chat_history = await _service.generate_broadcast_from_profile(
+                user_id=user["id"],
+                length=length,
+                on_delta=streamer.feed,
+            )
     except Exception as e:
         logger.exception("Failed to generate from profile")
         await callback.message.edit_text(
@@ -182,11 +185,13 @@ async def broadcast_text_input(message: Message, user: dict, state: FSMContext)
     )
 
     try:
-        result = await _service.generate_broadcast(
-            user_id=user["id"],
-            chat_history=chat_history,
-            length=length,
-        )
+        async with MessageStreamer(loading_msg, "<b>Сообщение для рассылки</b>") as streamer:
+            result = await _service.generate_broadcast(
+                user_id=user["id"],
+                chat_history=chat_history,
+                length=length,
+                on_delta=streamer.feed,
+            )
     except Exception as e:
         logger.exception("Failed to generate broadcast")
         await loading_msg.edit_text(
@@ -309,10 +314,12 @@ async def generate_vacancy(callback: CallbackQuery, user: dict, state: FSMContex
     await callback.answer()
 
     try:
-        result = await _service.generate_vacancy_response(
-            user_id=user["id"],
-            chat_history=chat_history,
-        )
+        async with MessageStreamer(callback.message, "<b>Отклик на вакансию</b>") as streamer:
+            result = await _service.generate_vacancy_response(
+                user_id=user["id"],
+                chat_history=chat_history,
+                on_delta=streamer.feed,
+            )
     except Exception as e:
         logger.exception("Failed to generate vacancy response")
         await callback.message.edit_text(
@@ -349,7 +356,7 @@ async def save_result(callback: CallbackQuery, user: dict, state: FSMContext) ->
         await callback.answer("Нечего сохранять", show_alert=True)
         return
 
-    _service.save_as_template(user["id"], last_result, msg_type=msg_type)
+    await _service.save_as_template(user["id"], last_result, msg_type=msg_type)
     await callback.answer("Сохранено как шаблон!")
 
 
@@ -373,12 +380,14 @@ async def regenerate(callback: CallbackQuery, user: dict, state: FSMContext) ->
     await callback.answer()
 
     try:
-        result = await _service.refine(
-            user_id=user["id"],
-            chat_history=chat_history,
-            msg_type=msg_type,
-            length=length,
-        )
+        async with MessageStreamer(callback.message, "<b>Результат</b>") as streamer:
+            result = await _service.refine(
+                user_id=user["id"],
+                chat_history=chat_history,
+                msg_type=msg_type,
+                length=length,
+                on_delta=streamer.feed,
+            )
     except Exception as e:
         logger.exception("Failed to regenerate")
         await callback.message.edit_text(
@@ -420,12 +429,14 @@ async def quick_refine(callback: CallbackQuery, user: dict, state: FSMContext) -
     await callback.answer()
 
     try:
-        result = await _service.refine(
-            user_id=user["id"],
-            chat_history=chat_history,
-            msg_type=msg_type,
-            length=length,
-        )
+        async with MessageStreamer(callback.message, "<b>Результат</b>") as streamer:
+            result = await _service.refine(
+                user_id=user["id"],
+                chat_history=chat_history,
+                msg_type=msg_type,
+                length=length,
+                on_delta=streamer.feed,
+            )
     except Exception as e:
         logger.exception("Failed to refine")
         # Убираем неудавшийся запрос из истории
@@ -464,12 +475,14 @@ async def text_refine(message: Message, user: dict, state: FSMContext) -> None:
     loading_msg = await message.answer("<b>Дорабатываю...</b>")
 
     try:
-        result = await _service.refine(
-            user_id=user["id"],
-            chat_history=chat_history,
-            msg_type=msg_type,
-            length=length,
-        )
+        async with MessageStreamer(loading_msg, "<b>Результат</b>") as streamer:
+            result = await _service.refine(
+                user_id=user["id"],
+                chat_history=chat_history,
+                msg_type=msg_type,
+                length=length,
+                on_delta=streamer.feed,
+            )
     except Exception as e:
         logger.exception("Failed to refine via text")
         chat_history.pop()
@@ -500,7 +513,7 @@ async def show_templates(callback: CallbackQuery, user: dict, state: FSMContext)
     parts = callback.data.split(":")
     page = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else 0
 
-    templates = _service.get_templates(user["id"])
+    templates = await _service.get_templates(user["id"])
     if not templates:
         await callback.message.edit_text(
             "<b>Мои шаблоны</b>\n\n"
@@ -527,7 +540,7 @@ async def show_template_detail(callback: CallbackQuery, state: FSMContext) -> No
 
     from db.repositories.messages import MessageRepository
     msg_repo = MessageRepository()
-    template = msg_repo.get_by_id(template_id)
+    template = await msg_repo.get_by_id(template_id)
 
     if not template:
         await callback.answer("Шаблон не найден", show_alert=True)
@@ -546,11 +559,11 @@ async def show_template_detail(callback: CallbackQuery, state: FSMContext) -> No
 async def delete_template(callback: CallbackQuery, user: dict, state: FSMContext) -> None:
     """Удаляет шаблон."""
     template_id = callback.data.split(":")[2]
-    _service.delete_template(template_id)
+    await _service.delete_template(template_id)
     await callback.answer("Шаблон удалён")
 
     # Возвращаемся к списку
-    templates = _service.get_templates(user["id"])
+    templates = await _service.get_templates(user["id"])
     if not templates:
         await callback.message.edit_text(
             "<b>Мои шаблоны</b>\n\n"
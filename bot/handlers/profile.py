@@ -85,7 +85,7 @@ def _format_profile_text(user: dict, search_profile: dict | None) -> str:
 async def show_profile(callback: CallbackQuery, user: dict, state: FSMContext) -> None:
     """Показывает профиль пользователя."""
     await state.clear()
-    search_profile = _search_repo.get_active(user["id"])
+    search_profile = await _search_repo.get_active(user["id"])
     text = _format_profile_text(user, search_profile)
     await callback.message.edit_text(text, reply_markup=get_profile_keyboard())
     await callback.answer()
@@ -98,10 +98,10 @@ async def back_to_profile(callback: CallbackQuery, user: dict, state: FSMContext
     """Возврат в профиль после редактирования."""
     await state.clear()
     # Перечитываем пользователя из БД — данные могли измениться
-    fresh_user = _user_repo.get_by_telegram_id(user["telegram_id"])
+    fresh_user = await _user_repo.get_by_telegram_id(user["telegram_id"])
     if fresh_user is None:
         fresh_user = user
-    search_profile = _search_repo.get_active(fresh_user["id"])
+    search_profile = await _search_repo.get_active(fresh_user["id"])
     text = _format_profile_text(fresh_user, search_profile)
     await callback.message.edit_text(text, reply_markup=get_profile_keyboard())
     await callback.answer()
@@ -147,10 +147,10 @@ async def edit_specializations_toggle(callback: CallbackQuery, state: FSMContext
         if not user_id:
             await callback.answer("Ошибка. Попробуй ещё раз.", show_alert=True)
             return
-        _user_repo.update(user_id, specializations=selected)
+        await _user_repo.update(user_id, specializations=selected)
         await state.clear()
-        fresh_user = _user_repo.get_by_telegram_id(callback.from_user.id)
-        search_profile = _search_repo.get_active(user_id)
+        fresh_user = await _user_repo.get_by_telegram_id(callback.from_user.id)
+        search_profile = await _search_repo.get_active(user_id)
         text = _format_profile_text(fresh_user, search_profile)
         await callback.message.edit_text(
             text + "\n\n\u2705 Специализации обновлены!",
@@ -252,11 +252,11 @@ async def edit_services_input(message: Message, user: dict, state: FSMContext) -
 
     await _cleanup(message, state)
 
-    _user_repo.update(user["id"], services_description=text)
+    await _user_repo.update(user["id"], services_description=text)
     await state.clear()
 
-    fresh_user = _user_repo.get_by_telegram_id(user["telegram_id"])
-    search_profile = _search_repo.get_active(user["id"])
+    fresh_user = await _user_repo.get_by_telegram_id(user["telegram_id"])
+    search_profile = await _search_repo.get_active(user["id"])
     text_profile = _format_profile_text(fresh_user, search_profile)
     await message.answer(
         text_profile + "\n\n\u2705 Описание обновлено!",
@@ -269,7 +269,7 @@ async def edit_services_input(message: Message, user: dict, state: FSMContext) -
 @router.callback_query(F.data == "prof:edit:search", StateFilter("*"))
 async def edit_search_start(callback: CallbackQuery, user: dict, state: FSMContext) -> None:
     """Начинаем редактирование параметров поиска — ключевые слова."""
-    search_profile = _search_repo.get_active(user["id"])
+    search_profile = await _search_repo.get_active(user["id"])
     profile_id = search_profile["id"] if search_profile else None
     await state.set_state(ProfileEditState.editing_keywords)
     await state.update_data(
@@ -348,14 +348,14 @@ async def edit_format_toggle(callback: CallbackQuery, user: dict, state: FSMCont
         min_budget = data.get("min_budget")
 
         if profile_id:
-            _search_repo.update(
+            await _search_repo.update(
                 profile_id,
                 keywords=keywords,
                 min_budget=min_budget,
                 work_format=selected,
             )
         else:
-            _search_repo.create(
+            await _search_repo.create(
                 user_id=user["id"],
                 keywords=keywords,
                 min_budget=min_budget,
@@ -363,8 +363,8 @@ async def edit_format_toggle(callback: CallbackQuery, user: dict, state: FSMCont
             )
 
         await state.clear()
-        fresh_user = _user_repo.get_by_telegram_id(user["telegram_id"])
-        search_profile = _search_repo.get_active(user["id"])
+        fresh_user = await _user_repo.get_by_telegram_id(user["telegram_id"])
+        search_profile = await _search_repo.get_active(user["id"])
         text = _format_profile_text(fresh_user, search_profile)
         await callback.message.edit_text(
             text + "\n\n\u2705 Параметры поиска обновлены!",
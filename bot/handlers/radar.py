@@ -49,15 +49,15 @@ async def _cleanup(message: Message, state: FSMContext) -> None:
 
 # ==================== Точка входа ====================
 
-def _has_profile_keywords(user_id: str) -> bool:
+async def _has_profile_keywords(user_id: str) -> bool:
     """Проверяет, есть ли у пользователя ключевые слова в профиле."""
-    profile = _search_repo.get_active(user_id)
+    profile = await _search_repo.get_active(user_id)
     return bool(profile and profile.get("keywords"))
 
 
-def _get_profile_keywords(user_id: str) -> list[str]:
+async def _get_profile_keywords(user_id: str) -> list[str]:
     """Возвращает ключевые слова из профиля поиска пользователя."""
-    profile = _search_repo.get_active(user_id)
+    profile = await _search_repo.get_active(user_id)
     if profile:
         return profile.get("keywords") or []
     return []
@@ -67,7 +67,7 @@ def _get_profile_keywords(user_id: str) -> list[str]:
 async def show_radar(callback: CallbackQuery, user: dict, state: FSMContext) -> None:
     """Показывает меню радара."""
     await state.clear()
-    channels = _service.get_user_channels(user["id"])
+    channels = await _service.get_user_channels(user["id"])
     count = len(channels)
     text = (
         "<b>Радар</b>\n\n"
@@ -78,7 +78,7 @@ async def show_radar(callback: CallbackQuery, user: dict, state: FSMContext) ->
         text,
         reply_markup=get_radar_menu_keyboard(
             has_channels=count > 0,
-            has_profile_keywords=_has_profile_keywords(user["id"]),
+            has_profile_keywords=await _has_profile_keywords(user["id"]),
         ),
     )
     await callback.answer()
@@ -90,7 +90,7 @@ async def show_radar(callback: CallbackQuery, user: dict, state: FSMContext) ->
 async def back_to_radar(callback: CallbackQuery, user: dict, state: FSMContext) -> None:
     """Возврат в меню радара."""
     await state.clear()
-    channels = _service.get_user_channels(user["id"])
+    channels = await _service.get_user_channels(user["id"])
     count = len(channels)
     text = (
         "<b>Радар</b>\n\n"
@@ -101,7 +101,7 @@ async def back_to_radar(callback: CallbackQuery, user: dict, state: FSMContext)
         text,
         reply_markup=get_radar_menu_keyboard(
             has_channels=count > 0,
-            has_profile_keywords=_has_profile_keywords(user["id"]),
+            has_profile_keywords=await _has_profile_keywords(user["id"]),
         ),
     )
     await callback.answer()
@@ -126,7 +126,7 @@ async def search_start(callback: CallbackQuery, state: FSMContext) -> None:
 @router.callback_query(F.data == "rad:profile:", StateFilter("*"))
 async def search_by_profile(callback: CallbackQuery, user: dict, state: FSMContext) -> None:
     """Поиск каналов по ключевым словам из профиля."""
-    keywords = _get_profile_keywords(user["id"])
+    keywords = await _get_profile_keywords(user["id"])
     if not keywords:
         await callback.answer("В профиле нет ключевых слов", show_alert=True)
         return
@@ -138,7 +138,7 @@ async def search_by_profile(callback: CallbackQuery, user: dict, state: FSMConte
         f"Ищу каналы по профилю: <i>{query}</i>..."
     )
 
-    channels = await _service.search_channels(query)
+    channels = await _service.search_channels(query, user_id=user["id"])
 
     if not channels:
         await callback.message.edit_text(
@@ -175,7 +175,7 @@ async def search_input(message: Message, user: dict, state: FSMContext) -> None:
         f"Ищу каналы по запросу: <i>{query}</i>..."
     )
 
-    channels = await _service.search_channels(query)
+    channels = await _service.search_channels(query, user_id=user["id"])
 
     if not channels:
         await loading_msg.edit_text(
@@ -249,7 +249,7 @@ async def link_channel(callback: CallbackQuery, user: dict, state: FSMContext) -
     channel_id = parts[2]
     purpose = parts[3]
 
-    _service.link_channel(user["id"], channel_id, purpose)
+    await _service.link_channel(user["id"], channel_id, purpose)
     purpose_label = _PURPOSE_LABELS.get(purpose, purpose)
     await callback.answer(f"Канал подключён: {purpose_label}")
 
@@ -293,7 +293,7 @@ async def show_channels_list(callback: CallbackQuery, user: dict, state: FSMCont
     parts = callback.data.split(":")
     page = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else 0
 
-    channels = _service.get_user_channels(user["id"])
+    channels = await _service.get_user_channels(user["id"])
     if not channels:
         await callback.message.edit_text(
             "<b>Мои каналы</b>\n\n"
@@ -320,7 +320,7 @@ async def show_channel_details(callback: CallbackQuery, user: dict, state: FSMCo
     parts = callback.data.split(":")
     user_channel_id = parts[2] if len(parts) > 2 else ""
 
-    channels = _service.get_user_channels(user["id"])
+    channels = await _service.get_user_channels(user["id"])
     # Ищем нужную связь
     uc = next((c for c in channels if c["id"] == user_channel_id), None)
     if not uc:
@@ -363,12 +363,12 @@ async def change_purpose(callback: CallbackQuery, user: dict, state: FSMContext)
     user_channel_id = parts[2]
     new_purpose = parts[3]
 
-    _service.update_channel_purpose(user_channel_id, new_purpose)
+    await _service.update_channel_purpose(user_channel_id, new_purpose)
     purpose_label = _PURPOSE_LABELS.get(new_purpose, new_purpose)
     await callback.answer(f"Назначение изменено: {purpose_label}")
 
     # Возвращаемся к списку каналов
-    channels = _service.get_user_channels(user["id"])
+    channels = await _service.get_user_channels(user["id"])
     await callback.message.edit_text(
         f"<b>Мои каналы</b> ({len(channels)})",
         reply_markup=get_user_channels_keyboard(channels, page=0),
@@ -383,11 +383,11 @@ async def unlink_channel(callback: CallbackQuery, user: dict, state: FSMContext)
     parts = callback.data.split(":")
     channel_id = parts[2] if len(parts) > 2 else ""
 
-    _service.unlink_channel(user["id"], channel_id)
+    await _service.unlink_channel(user["id"], channel_id)
     await callback.answer("Канал отключён")
 
     # Возвращаемся к списку
-    channels = _service.get_user_channels(user["id"])
+    channels = await _service.get_user_channels(user["id"])
     if not channels:
         await callback.message.edit_text(
             "<b>Мои каналы</b>\n\n"
@@ -65,9 +65,9 @@ def _parse_time(text: str) -> tuple[int, int] | None:
 async def show_settings(callback: CallbackQuery, user: dict, state: FSMContext) -> None:
     """Показывает настройки пользователя."""
     await state.clear()
-    settings = _settings_repo.get_by_user_id(user["id"])
+    settings = await _settings_repo.get_by_user_id(user["id"])
     if not settings:
-        settings = _settings_repo.create_default(user["id"])
+        settings = await _settings_repo.create_default(user["id"])
     text = _format_settings_text(settings)
     await callback.message.edit_text(text, reply_markup=get_settings_keyboard())
     await callback.answer()
@@ -79,9 +79,9 @@ async def show_settings(callback: CallbackQuery, user: dict, state: FSMContext)
 async def back_to_settings(callback: CallbackQuery, user: dict, state: FSMContext) -> None:
     """Возврат в настройки."""
     await state.clear()
-    settings = _settings_repo.get_by_user_id(user["id"])
+    settings = await _settings_repo.get_by_user_id(user["id"])
     if not settings:
-        settings = _settings_repo.create_default(user["id"])
+        settings = await _settings_repo.create_default(user["id"])
     text = _format_settings_text(settings)
     await callback.message.edit_text(text, reply_markup=get_settings_keyboard())
     await callback.answer()
@@ -93,7 +93,7 @@ async def back_to_settings(callback: CallbackQuery, user: dict, state: FSMContex
 async def edit_limit_start(callback: CallbackQuery, user: dict, state: FSMContext) -> None:
     """Начинаем редактирование лимита рассылки."""
     await state.clear()
-    settings = _settings_repo.get_by_user_id(user["id"])
+    settings = await _settings_repo.get_by_user_id(user["id"])
     current = settings.get("broadcast_limit_per_hour", 5) if settings else 5
     await callback.message.edit_text(
         "<b>Лимит рассылки</b>\n\n"
@@ -114,8 +114,8 @@ async def edit_limit_select(callback: CallbackQuery, user: dict, state: FSMConte
         await callback.answer("Ошибка", show_alert=True)
         return
 
-    _settings_repo.update(user["id"], broadcast_limit_per_hour=new_limit)
-    settings = _settings_repo.get_by_user_id(user["id"])
+    await _settings_repo.update(user["id"], broadcast_limit_per_hour=new_limit)
+    settings = await _settings_repo.get_by_user_id(user["id"])
     text = _format_settings_text(settings)
     await callback.message.edit_text(
         text + "\n\n\u2705 Лимит обновлён!",
@@ -129,7 +129,7 @@ async def edit_limit_select(callback: CallbackQuery, user: dict, state: FSMConte
 @router.callback_query(F.data == "sett:edit:quiet", StateFilter("*"))
 async def edit_quiet_start(callback: CallbackQuery, user: dict, state: FSMContext) -> None:
     """Начинаем редактирование тихих часов."""
-    settings = _settings_repo.get_by_user_id(user["id"])
+    settings = await _settings_repo.get_by_user_id(user["id"])
     quiet_start = str(settings.get("quiet_hours_start", "23:00:00"))[:5] if settings else "23:00"
     quiet_end = str(settings.get("quiet_hours_end", "08:00:00"))[:5] if settings else "08:00"
 
@@ -183,14 +183,14 @@ async def edit_quiet_input(message: Message, user: dict, state: FSMContext) -> N
     quiet_start = f"{start_parsed[0]:02d}:{start_parsed[1]:02d}"
     quiet_end = f"{end_parsed[0]:02d}:{end_parsed[1]:02d}"
 
-    _settings_repo.update(
+    await _settings_repo.update(
         user["id"],
         quiet_hours_start=quiet_start,
         quiet_hours_end=quiet_end,
     )
     await state.clear()
 
-    settings = _settings_repo.get_by_user_id(user["id"])
+    settings = await _settings_repo.get_by_user_id(user["id"])
     text_settings = _format_settings_text(settings)
     await message.answer(
         text_settings + "\n\n\u2705 Тихие часы обновлены!",
@@ -203,7 +203,7 @@ async def edit_quiet_input(message: Message, user: dict, state: FSMContext) -> N
 @router.callback_query(F.data == "sett:edit:delays", StateFilter("*"))
 async def edit_delays_start(callback: CallbackQuery, user: dict, state: FSMContext) -> None:
     """Начинаем редактирование задержек между сообщениями."""
-    settings = _settings_repo.get_by_user_id(user["id"])
+    settings = await _settings_repo.get_by_user_id(user["id"])
     min_d = settings.get("min_delay_seconds", 30) if settings else 30
     max_d = settings.get("max_delay_seconds", 120) if settings else 120
 
@@ -257,14 +257,14 @@ async def edit_delays_input(message: Message, user: dict, state: FSMContext) ->
     except Exception:
         pass
 
-    _settings_repo.update(
+    await _settings_repo.update(
         user["id"],
         min_delay_seconds=min_delay,
         max_delay_seconds=max_delay,
     )
     await state.clear()
 
-    settings = _settings_repo.get_by_user_id(user["id"])
+    settings = await _settings_repo.get_by_user_id(user["id"])
     text_settings = _format_settings_text(settings)
     await message.answer(
         text_settings + "\n\n\u2705 Задержки обновлены!",
@@ -322,16 +322,16 @@ async def onb_disclaimer(
     disclaimer_accepted = callback_data.value == "accept"
 
     # Сохраняем профиль пользователя
-    _user_repo.update(
+    await _user_repo.update(
         user_id,
         specializations=data.get("specializations", []),
         services_description=data.get("services_description", ""),
         disclaimer_accepted=disclaimer_accepted,
     )
-    _user_repo.complete_onboarding(user_id)
+    await _user_repo.complete_onboarding(user_id)
 
     # Создаём профиль поиска
-    _search_repo.create(
+    await _search_repo.create(
         user_id=user_id,
         keywords=data.get("keywords", []),
         min_budget=data.get("min_budget"),
@@ -1,4 +1,7 @@
-"""Мидлварь авторизации — регистрирует пользователя и кладёт его в data."""
+"""Мидлварь авторизации — регистрирует пользователя и кладёт его в data.
+
+Пользователь читается из кэша в памяти; в БД идём только при промахе.
+"""
 
 import logging
 from typing import Any, Awaitable, Callable
@@ -8,16 +11,19 @@ from aiogram.types import TelegramObject, User
 
 from db.repositories.settings import SettingsRepository
 from db.repositories.users import UserRepository
+from db.user_cache import get_user_cache
+from llm.metrics import llm_user
 
 logger = logging.getLogger(__name__)
 
 
 class AuthMiddleware(BaseMiddleware):
-    """При каждом обновлении находит или создаёт пользователя в БД."""
+    """При каждом обновлении находит (в кэше или БД) или создаёт пользователя."""
 
     def __init__(self) -> None:
         self._user_repo = UserRepository()
         self._settings_repo = SettingsRepository()
+        self._cache = get_user_cache()
 
     async def __call__(
         self,
@@ -31,19 +37,34 @@ class AuthMiddleware(BaseMiddleware):
         if tg_user is None or tg_user.is_bot:
             return await handler(event, data)
 
-        # Ищем пользователя в БД
-        user = self._user_repo.get_by_telegram_id(tg_user.id)
-
+        user = self._cache.get(tg_user.id)
         if user is None:
-            # Регистрируем нового пользователя
-            logger.info("New user registered: telegram_id=%d, username=%s", tg_user.id, tg_user.username)
-            user = self._user_repo.create(
-                telegram_id=tg_user.id,
-                username=tg_user.username,
-                first_name=tg_user.first_name,
-            )
-            # Создаём дефолтные настройки
-            self._settings_repo.create_default(user_id=user["id"])
+            # Промах кэша — идём в БД; если за время чтения пользователя изменили,
+            # строка не кладётся в кэш
+            version = self._cache.version()
+            user = await self._get_or_register(tg_user)
+            self._cache.put(user, version)
 
         data["user"] = user
-        return await handler(event, data)
+        # Запросы к LLM из хендлера учитываются в метриках на этого пользователя
+        with llm_user(str(user["id"])):
+            return await handler(event, data)
+
+    async def _get_or_register(self, tg_user: User) -> dict:
+        """Находит пользователя в БД или регистрирует нового."""
+        user = await self._user_repo.get_by_telegram_id(tg_user.id)
+        if user is not None:
+            return user
+
+        # Регистрируем нового пользователя
+        logger.info(
+            "New user registered: telegram_id=%d, username=%s", tg_user.id, tg_user.username,
+        )
+        user = await self._user_repo.create(
+            telegram_id=tg_user.id,
+            username=tg_user.username,
+            first_name=tg_user.first_name,
+        )
+        # Создаём дефолтные настройки
+        await self._settings_repo.create_default(user_id=user["id"])
+        return user
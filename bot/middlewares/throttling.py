@@ -1,18 +1,60 @@
-"""Мидлварь антифлуда — не более 1 сообщения в секунду от пользователя."""
+"""Мидлварь антифлуда — token bucket на пользователя и тип события.
+
+Для каждого типа апдейта (message, callback_query, ...) задаётся своя политика:
+ёмкость корзины (сколько событий можно прислать пачкой) и скорость её
+пополнения. Состояние хранится в ограниченном LRU-словаре: корзины, которые
+успели пополниться до конца, ничем не отличаются от новых и удаляются.
+"""
 
 import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Any, Awaitable, Callable
 
 from aiogram import BaseMiddleware
-from aiogram.types import TelegramObject, User
+from aiogram.types import TelegramObject, Update, User
+
+
+@dataclass(frozen=True)
+class RatePolicy:
+    """Политика token bucket: capacity — размер пачки, refill_rate — токенов в секунду."""
+
+    capacity: float
+    refill_rate: float
+
+    @property
+    def idle_ttl(self) -> float:
+        """Через сколько секунд простоя корзина снова полная."""
+        return self.capacity / self.refill_rate
+
+
+# Сообщения — как раньше, не чаще раза в секунду.
+# Инлайн-кнопки жмут быстрее: разрешаем короткую серию нажатий.
+DEFAULT_POLICIES: dict[str, RatePolicy] = {
+    "message": RatePolicy(capacity=1, refill_rate=1.0),
+    "callback_query": RatePolicy(capacity=5, refill_rate=2.0),
+}
 
 
 class ThrottlingMiddleware(BaseMiddleware):
-    """Игнорирует обновления, если пользователь шлёт чаще раза в секунду."""
+    """Игнорирует обновления, если у пользователя закончились токены."""
 
-    def __init__(self, rate_limit: float = 1.0) -> None:
-        self._rate_limit = rate_limit
-        self._last_time: dict[int, float] = {}
+    def __init__(
+        self,
+        policies: dict[str, RatePolicy] | None = None,
+        default_policy: RatePolicy | None = None,
+        max_entries: int = 100_000,
+    ) -> None:
+        self._policies = policies if policies is not None else DEFAULT_POLICIES
+        self._default = default_policy or self._policies.get(
+            "message", RatePolicy(capacity=1, refill_rate=1.0),
+        )
+        self._max_entries = max_entries
+        self._idle_ttl = max(
+            p.idle_ttl for p in (*self._policies.values(), self._default)
+        )
+        # (telegram_id, тип события) -> [токены, время последнего обновления]
+        self._buckets: OrderedDict[tuple[int, str], list[float]] = OrderedDict()
 
     async def __call__(
         self,
@@ -25,11 +67,49 @@ class ThrottlingMiddleware(BaseMiddleware):
             return await handler(event, data)
 
         now = time.monotonic()
-        last = self._last_time.get(tg_user.id, 0.0)
+        self._prune(now)
 
-        if now - last < self._rate_limit:
+        if not self._consume(tg_user.id, self._event_type(event), now):
             # Слишком быстро — игнорируем
             return None
 
-        self._last_time[tg_user.id] = now
         return await handler(event, data)
+
+    def _consume(self, user_id: int, event_type: str, now: float) -> bool:
+        """Списывает токен из корзины. False — если токенов не хватает."""
+        policy = self._policies.get(event_type, self._default)
+        key = (user_id, event_type)
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [policy.capacity, now]
+            self._buckets[key] = bucket
+        else:
+            elapsed = now - bucket[1]
+            bucket[0] = min(policy.capacity, bucket[0] + elapsed * policy.refill_rate)
+            bucket[1] = now
+            self._buckets.move_to_end(key)
+
+        if bucket[0] < 1.0:
+            return False
+        bucket[0] -= 1.0
+        return True
+
+    def _prune(self, now: float) -> None:
+        """Удаляет простаивающие корзины и держит размер в пределах max_entries."""
+        buckets = self._buckets
+        while buckets:
+            key, (_, updated_at) = next(iter(buckets.items()))
+            if now - updated_at < self._idle_ttl and len(buckets) < self._max_entries:
+                break
+            del buckets[key]
+
+    @staticmethod
+    def _event_type(event: TelegramObject) -> str:
+        """Тип апдейта (message, callback_query, ...) для выбора политики."""
+        if isinstance(event, Update):
+            try:
+                return event.event_type
+            except Exception:
+                pass
+        return "update"
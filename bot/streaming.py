@@ -0,0 +1,89 @@
+"""Постепенный вывод текста LLM в одно сообщение Telegram.
+
+Редактировать сообщение на каждый фрагмент ответа нельзя — Telegram
+ограничивает частоту edit_text и отвечает RetryAfter. MessageStreamer
+копит текст и правит сообщение не чаще раза в interval секунд, всегда
+последней версией текста. Первая правка уходит сразу, как только пришёл
+первый фрагмент.
+"""
+
+import asyncio
+import html
+import logging
+import time
+
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import Message
+
+from bot.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Лимит длины текста сообщения Telegram
+_MESSAGE_LIMIT = 4096
+_CURSOR = " ▌"
+
+
+class MessageStreamer:
+    """Склеивает частые обновления текста в редкие edit_text одного сообщения."""
+
+    def __init__(self, message: Message, header: str, interval: float | None = None) -> None:
+        self._message = message
+        self._header = header
+        self._interval = interval if interval is not None else settings.stream_edit_interval
+        self._text = ""
+        self._shown = ""
+        self._last_edit = 0.0
+        self._task: asyncio.Task | None = None
+        self._stopped = False
+
+    async def __aenter__(self) -> "MessageStreamer":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.finish()
+
+    def feed(self, delta: str) -> None:
+        """Добавляет фрагмент ответа. Не блокирует — правка уходит в фоне."""
+        self._text += delta
+        if not self._stopped and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._flush())
+
+    async def finish(self) -> None:
+        """Останавливает промежуточные правки (итоговый текст выводит вызывающий)."""
+        self._stopped = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _flush(self) -> None:
+        while not self._stopped and self._text != self._shown:
+            delay = self._last_edit + self._interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            text = self._text
+            try:
+                await self._message.edit_text(self._render(text))
+            except TelegramRetryAfter as e:
+                logger.debug("Stream edit throttled, retry after %ss", e.retry_after)
+                self._last_edit = time.monotonic() + e.retry_after
+                continue
+            except TelegramBadRequest as e:
+                if "message is not modified" not in str(e):
+                    # Сообщение удалено или текст не принят — дальше не стримим
+                    logger.debug("Stream edit failed: %s", e)
+                    self._stopped = True
+                    return
+            self._shown = text
+            self._last_edit = time.monotonic()
+
+    def _render(self, text: str) -> str:
+        """Промежуточный вид: заголовок и экранированный текст с курсором."""
+        room = _MESSAGE_LIMIT - len(self._header) - len(_CURSOR) - 2
+        if len(text) > room:
+            text = text[: room - 1] + "…"
+        return f"{self._header}\n\n{html.escape(text)}{_CURSOR}"
@@ -1,15 +1,93 @@
-"""Подключение к Supabase. Singleton-клиент для всего приложения."""
+"""Подключение к Supabase. Singleton async-клиент для всего приложения.
 
-from supabase import Client, create_client
+Все репозитории ходят в PostgREST через один httpx.AsyncClient с общим
+пулом соединений, поэтому запросы разных апдейтов не блокируют event loop
+и переиспользуют keep-alive соединения.
+"""
+
+import httpx
+from postgrest import AsyncPostgrestClient
+from supabase import AsyncClient, AsyncClientOptions
 
 from bot.config import settings
 
-_client: Client | None = None
+# Максимум строк в одном ответе PostgREST
+PAGE_SIZE = 1000
+# Значений в одном фильтре in_ — список уходит в URL запроса
+IN_CHUNK = 200
+
+
+def in_chunks(items: list[str]) -> list[list[str]]:
+    """Режет список значений для фильтра in_ на пачки по IN_CHUNK."""
+    return [items[start:start + IN_CHUNK] for start in range(0, len(items), IN_CHUNK)]
+
+
+class _PooledPostgrestClient(AsyncPostgrestClient):
+    """PostgREST-клиент с ограниченным пулом HTTP-соединений."""
+
+    def create_session(
+        self,
+        base_url: str,
+        headers: dict[str, str],
+        timeout: int | float | httpx.Timeout,
+        verify: bool = True,
+        proxy: str | None = None,
+    ) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            verify=verify,
+            proxy=proxy,
+            follow_redirects=True,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=settings.supabase_pool_size,
+                max_keepalive_connections=settings.supabase_pool_size,
+            ),
+        )
+
 
+class _PooledAsyncClient(AsyncClient):
+    """Async-клиент Supabase, создающий PostgREST-клиент с общим пулом."""
 
-def get_supabase_client() -> Client:
-    """Возвращает клиент Supabase (singleton)."""
+    @staticmethod
+    def _init_postgrest_client(
+        rest_url: str,
+        headers: dict[str, str],
+        schema: str,
+        timeout: int | float | httpx.Timeout = 120,
+        verify: bool = True,
+        proxy: str | None = None,
+    ) -> AsyncPostgrestClient:
+        return _PooledPostgrestClient(
+            rest_url,
+            headers=headers,
+            schema=schema,
+            timeout=timeout,
+            verify=verify,
+            proxy=proxy,
+        )
+
+
+_client: AsyncClient | None = None
+
+
+def get_supabase_client() -> AsyncClient:
+    """Возвращает async-клиент Supabase (singleton)."""
     global _client
     if _client is None:
-        _client = create_client(settings.supabase_url, settings.supabase_key)
+        _client = _PooledAsyncClient(
+            settings.supabase_url,
+            settings.supabase_key,
+            AsyncClientOptions(postgrest_client_timeout=settings.supabase_timeout),
+        )
     return _client
+
+
+async def close_supabase_client() -> None:
+    """Закрывает пул соединений (вызывается при остановке бота)."""
+    global _client
+    if _client is not None:
+        await _client.postgrest.aclose()
+        _client = None
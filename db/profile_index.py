@@ -0,0 +1,175 @@
+"""Индекс активных профилей поиска в памяти процесса.
+
+Чтобы найти пользователей, которым подходит вакансия, не перебирая все
+профили:
+
+- каждому профилю выдаётся номер бита (слот);
+- ключевое слово → битовая маска профилей с этим словом; слова ищутся
+  в тексте вакансии одним проходом KeywordFilter;
+- min_budget → маска, формат работы → маска; профили без ограничения
+  лежат в отдельных масках «подходит всё».
+
+Ответ — AND трёх масок; маски — целые числа Python, поэтому операции над
+100 тысячами профилей занимают микросекунды.
+
+Индекс заполняется из БД один раз (load) и дальше обновляется
+SearchProfileRepository при create/update.
+"""
+
+from collections.abc import Iterator
+
+from parsers.keyword_filter import KeywordFilter
+
+# (user_id, ключевые слова, min_budget, work_format)
+_Entry = tuple[str, tuple[str, ...], int, tuple[str, ...]]
+
+
+class ProfileIndex:
+    """Инвертированный индекс профилей: ключевые слова, бюджет и формат — битовые маски."""
+
+    def __init__(self) -> None:
+        self._slots: dict[str, int] = {}
+        self._entries: list[_Entry | None] = []
+        self._free: list[int] = []
+        # С маркерами вакансий — чтобы keyword_filter годился и как предфильтр постов
+        self._keywords = KeywordFilter()
+        self._keyword_bits: dict[str, int] = {}
+        self._any_keyword = 0
+        self._budget_bits: dict[int, int] = {}
+        self._format_bits: dict[str, int] = {}
+        self._any_format = 0
+        self.loaded = False
+        # Изменения, пришедшие до load: строки из БД могли быть прочитаны раньше
+        self._early: dict[str, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @property
+    def keyword_filter(self) -> KeywordFilter:
+        """Предфильтр постов по словам всех профилей и маркерам вакансий."""
+        return self._keywords
+
+    def load(self, profiles: list[dict]) -> None:
+        """Заполняет индекс активными профилями из БД."""
+        for profile in profiles:
+            self._add(profile)
+        self.loaded = True
+        for profile in self._early.values():
+            self.upsert(profile)
+        self._early.clear()
+
+    def upsert(self, profile: dict) -> None:
+        """Добавляет или обновляет профиль (неактивный — убирается из индекса)."""
+        if not self.loaded:
+            self._early[profile["id"]] = profile
+            return
+        self.remove(profile["id"])
+        if profile.get("is_active", True):
+            self._add(profile)
+
+    def remove(self, profile_id: str) -> None:
+        slot = self._slots.pop(profile_id, None)
+        if slot is None:
+            return
+        _, keywords, min_budget, formats = self._entries[slot]
+        mask = ~(1 << slot)
+        for keyword in keywords:
+            self._keyword_bits[keyword] &= mask
+            if not self._keyword_bits[keyword]:
+                del self._keyword_bits[keyword]
+                self._keywords.remove(keyword)
+        if not keywords:
+            self._any_keyword &= mask
+        self._budget_bits[min_budget] &= mask
+        if not self._budget_bits[min_budget]:
+            del self._budget_bits[min_budget]
+        for work_format in formats:
+            self._format_bits[work_format] &= mask
+            if not self._format_bits[work_format]:
+                del self._format_bits[work_format]
+        if not formats:
+            self._any_format &= mask
+        self._entries[slot] = None
+        self._free.append(slot)
+
+    def match(self, text: str, budget: int | None = None,
+              work_format: str | None = None) -> set[str]:
+        """user_id владельцев профилей, которым подходит вакансия.
+
+        Args:
+            text: текст вакансии (пост, название, навыки)
+            budget: бюджет в рублях; None — неизвестен и не фильтрует
+            work_format: oneoff/project/permanent; None — неизвестен и не фильтрует
+        """
+        bits = self._any_keyword
+        for keyword in self._keywords.match(text):
+            bits |= self._keyword_bits.get(keyword, 0)
+        if not bits:
+            return set()
+
+        if budget is not None:
+            allowed = 0
+            for min_budget, budget_bits in self._budget_bits.items():
+                if min_budget <= budget:
+                    allowed |= budget_bits
+            bits &= allowed
+        if work_format is not None:
+            bits &= self._any_format | self._format_bits.get(work_format, 0)
+
+        return {self._entries[slot][0] for slot in _slots_of(bits)}
+
+    def _add(self, profile: dict) -> None:
+        if profile["id"] in self._slots:
+            self.remove(profile["id"])
+        slot = self._free.pop() if self._free else len(self._entries)
+        if slot == len(self._entries):
+            self._entries.append(None)
+        keywords = tuple(dict.fromkeys(
+            keyword.strip().lower() for keyword in profile.get("keywords") or []
+            if keyword and keyword.strip()
+        ))
+        min_budget = profile.get("min_budget") or 0
+        formats = tuple(dict.fromkeys(profile.get("work_format") or []))
+        self._entries[slot] = (profile["user_id"], keywords, min_budget, formats)
+        self._slots[profile["id"]] = slot
+
+        bit = 1 << slot
+        for keyword in keywords:
+            if keyword not in self._keyword_bits:
+                self._keyword_bits[keyword] = 0
+                self._keywords.add(keyword, [keyword])
+            self._keyword_bits[keyword] |= bit
+        if not keywords:
+            self._any_keyword |= bit
+        self._budget_bits[min_budget] = self._budget_bits.get(min_budget, 0) | bit
+        for work_format in formats:
+            self._format_bits[work_format] = self._format_bits.get(work_format, 0) | bit
+        if not formats:
+            self._any_format |= bit
+
+
+def _slots_of(bits: int) -> Iterator[int]:
+    """Номера установленных битов маски.
+
+    Маска режется на 64-битные слова: пустые слова пропускаются целиком,
+    а сдвиги внутри слова работают с маленькими числами, а не со всей маской.
+    """
+    size = (bits.bit_length() + 63) // 64 * 8
+    words = memoryview(bits.to_bytes(size, "little")).cast("Q")
+    for i, word in enumerate(words):
+        while word:
+            low = word & -word
+            yield i * 64 + low.bit_length() - 1
+            word ^= low
+
+
+_index: ProfileIndex | None = None
+
+
+def get_profile_index() -> ProfileIndex:
+    """Возвращает индекс профилей поиска (singleton)."""
+    global _index
+    if _index is None:
+        _index = ProfileIndex()
+    return _index
@@ -1,6 +1,6 @@
 """Репозиторий для таблиц channels и user_channels."""
 
-from db.connection import get_supabase_client
+from db.connection import PAGE_SIZE, get_supabase_client
 
 
 class ChannelRepository:
@@ -11,10 +11,10 @@ class ChannelRepository:
         self._channels = self._client.table("channels")
         self._user_channels = self._client.table("user_channels")
 
-    def get_or_create(self, telegram_id: int, username: str | None = None,
+    async def get_or_create(self, telegram_id: int, username: str | None = None,
                       title: str | None = None, **kwargs) -> dict:
         """Возвращает канал по telegram_id или создаёт новый."""
-        response = (
+        response = await (
             self._channels.select("*")
             .eq("telegram_id", telegram_id)
             .limit(1)
@@ -29,22 +29,81 @@ class ChannelRepository:
         if title is not None:
             data["title"] = title
         data.update(kwargs)
-        response = self._channels.insert(data).execute()
+        response = await self._channels.insert(data).execute()
         return response.data[0]
 
-    def get_or_create_by_username(self, username: str, **kwargs) -> dict:
+    async def get_or_create_by_username(self, username: str, **kwargs) -> dict:
         """Возвращает канал по username или создаёт новый."""
-        existing = self.get_by_username(username)
+        existing = await self.get_by_username(username)
         if existing:
             return existing
         data: dict = {"username": username, "source": "tgstat"}
         data.update(kwargs)
-        response = self._channels.insert(data).execute()
+        response = await self._channels.insert(data).execute()
         return response.data[0]
 
-    def get_user_channel(self, user_id: str, channel_id: str) -> dict | None:
+    async def upsert_many_by_username(self, items: list[dict]) -> list[dict]:
+        """Возвращает каналы по списку username, создавая недостающие.
+
+        Одним SELECT находит существующие каналы, одним INSERT ... ON CONFLICT
+        (username) DO NOTHING добавляет остальные. Существующие строки не
+        перезаписываются. Результат — в порядке items, без повторов.
+
+        Args:
+            items: словари с ключом username и полями нового канала
+                (title, description, subscribers_count, category)
+        """
+        by_username: dict[str, dict] = {}
+        for item in items:
+            username = item.get("username")
+            if username and username not in by_username:
+                by_username[username] = item
+        if not by_username:
+            return []
+
+        usernames = list(by_username)
+        found = await self._select_by_usernames(usernames)
+
+        missing = [u for u in usernames if u not in found]
+        if missing:
+            rows = [
+                {
+                    "username": username,
+                    "source": "tgstat",
+                    "title": by_username[username].get("title"),
+                    "description": by_username[username].get("description"),
+                    "subscribers_count": by_username[username].get("subscribers_count"),
+                    "category": by_username[username].get("category"),
+                }
+                for username in missing
+            ]
+            response = await self._channels.upsert(
+                rows,
+                on_conflict="username",
+                ignore_duplicates=True,
+            ).execute()
+            for row in response.data:
+                found[row["username"]] = row
+
+            # Строки, которые параллельно вставил кто-то другой, INSERT не вернул
+            raced = [u for u in missing if u not in found]
+            if raced:
+                found.update(await self._select_by_usernames(raced))
+
+        return [found[u] for u in usernames if u in found]
+
+    async def _select_by_usernames(self, usernames: list[str]) -> dict[str, dict]:
+        """Находит каналы по списку username. Возвращает {username: channel}."""
+        response = await (
+            self._channels.select("*")
+            .in_("username", usernames)
+            .execute()
+        )
+        return {row["username"]: row for row in response.data}
+
+    async def get_user_channel(self, user_id: str, channel_id: str) -> dict | None:
         """Возвращает связь пользователя с каналом."""
-        response = (
+        response = await (
             self._user_channels.select("*")
             .eq("user_id", user_id)
             .eq("channel_id", channel_id)
@@ -53,9 +112,9 @@ class ChannelRepository:
         )
         return response.data[0] if response.data else None
 
-    def get_by_id(self, channel_id: str) -> dict | None:
+    async def get_by_id(self, channel_id: str) -> dict | None:
         """Находит канал по id."""
-        response = (
+        response = await (
             self._channels.select("*")
             .eq("id", channel_id)
             .limit(1)
@@ -63,9 +122,9 @@ class ChannelRepository:
         )
         return response.data[0] if response.data else None
 
-    def get_by_username(self, username: str) -> dict | None:
+    async def get_by_username(self, username: str) -> dict | None:
         """Находит канал по username."""
-        response = (
+        response = await (
             self._channels.select("*")
             .eq("username", username)
             .limit(1)
@@ -73,25 +132,46 @@ class ChannelRepository:
         )
         return response.data[0] if response.data else None
 
-    def update(self, channel_id: str, **fields) -> dict:
+    async def get_by_ids(self, channel_ids: list[str]) -> list[dict]:
+        """Находит каналы по списку id."""
+        if not channel_ids:
+            return []
+        response = await self._channels.select("*").in_("id", channel_ids).execute()
+        return response.data
+
+    async def update_parse_marks(self, marks: list[dict]) -> None:
+        """Одним запросом сохраняет last_message_id и last_parsed_at нескольких каналов.
+
+        Args:
+            marks: [{"id": ..., "last_message_id": ..., "last_parsed_at": ...}]
+        """
+        if marks:
+            await self._channels.upsert(marks, on_conflict="id").execute()
+
+    async def update(self, channel_id: str, **fields) -> dict:
         """Обновляет поля канала."""
-        response = self._channels.update(fields).eq("id", channel_id).execute()
+        response = await self._channels.update(fields).eq("id", channel_id).execute()
         return response.data[0]
 
-    def link_to_user(self, user_id: str, channel_id: str, purpose: str) -> dict:
+    async def link_to_user(self, user_id: str, channel_id: str, purpose: str) -> dict:
         """Привязывает канал к пользователю (создаёт запись в user_channels)."""
-        response = self._user_channels.insert({
+        response = await self._user_channels.insert({
             "user_id": user_id,
             "channel_id": channel_id,
             "purpose": purpose,
         }).execute()
         return response.data[0]
 
-    def unlink_from_user(self, user_id: str, channel_id: str) -> None:
+    async def unlink_from_user(self, user_id: str, channel_id: str) -> None:
         """Отвязывает канал от пользователя."""
-        self._user_channels.delete().eq("user_id", user_id).eq("channel_id", channel_id).execute()
+        await (
+            self._user_channels.delete()
+            .eq("user_id", user_id)
+            .eq("channel_id", channel_id)
+            .execute()
+        )
 
-    def get_user_channels(self, user_id: str, purpose: str | None = None) -> list[dict]:
+    async def get_user_channels(self, user_id: str, purpose: str | None = None) -> list[dict]:
         """Возвращает каналы пользователя, опционально фильтр по purpose."""
         query = (
             self._user_channels.select("*, channels(*)")
@@ -100,12 +180,32 @@ class ChannelRepository:
         )
         if purpose is not None:
             query = query.eq("purpose", purpose)
-        response = query.execute()
+        response = await query.execute()
         return response.data
 
-    def update_user_channel_purpose(self, user_channel_id: str, purpose: str) -> dict:
+    async def get_subscriptions(self, purposes: tuple[str, ...]) -> list[dict]:
+        """Все активные связи пользователей с каналами с указанными purpose.
+
+        Returns:
+            [{user_id, channel_id, purpose, channels: {...}}, ...]
+        """
+        rows: list[dict] = []
+        while True:
+            response = await (
+                self._user_channels.select("user_id, channel_id, purpose, channels(*)")
+                .eq("is_active", True)
+                .in_("purpose", list(purposes))
+                .order("id")
+                .range(len(rows), len(rows) + PAGE_SIZE - 1)
+                .execute()
+            )
+            rows.extend(response.data)
+            if len(response.data) < PAGE_SIZE:
+                return rows
+
+    async def update_user_channel_purpose(self, user_channel_id: str, purpose: str) -> dict:
         """Обновляет назначение связи пользователя с каналом."""
-        response = (
+        response = await (
             self._user_channels.update({"purpose": purpose})
             .eq("id", user_channel_id)
             .execute()
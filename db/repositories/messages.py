@@ -10,7 +10,7 @@ class MessageRepository:
         self._client = get_supabase_client()
         self._table = self._client.table("messages")
 
-    def create(self, user_id: str, type: str, content: str,
+    async def create(self, user_id: str, type: str, content: str,
                is_template: bool = False, metadata: dict | None = None) -> dict:
         """Создаёт новое сообщение."""
         data: dict = {
@@ -21,12 +21,12 @@ class MessageRepository:
         }
         if metadata is not None:
             data["metadata"] = metadata
-        response = self._table.insert(data).execute()
+        response = await self._table.insert(data).execute()
         return response.data[0]
 
-    def get_by_id(self, message_id: str) -> dict | None:
+    async def get_by_id(self, message_id: str) -> dict | None:
         """Получает сообщение по id."""
-        response = (
+        response = await (
             self._table.select("*")
             .eq("id", message_id)
             .limit(1)
@@ -34,9 +34,9 @@ class MessageRepository:
         )
         return response.data[0] if response.data else None
 
-    def get_user_templates(self, user_id: str) -> list[dict]:
+    async def get_user_templates(self, user_id: str) -> list[dict]:
         """Возвращает шаблоны пользователя."""
-        response = (
+        response = await (
             self._table.select("*")
             .eq("user_id", user_id)
             .eq("is_template", True)
@@ -45,15 +45,15 @@ class MessageRepository:
         )
         return response.data
 
-    def update_content(self, message_id: str, content: str) -> dict:
+    async def update_content(self, message_id: str, content: str) -> dict:
         """Обновляет текст сообщения."""
-        response = (
+        response = await (
             self._table.update({"content": content})
             .eq("id", message_id)
             .execute()
         )
         return response.data[0]
 
-    def delete(self, message_id: str) -> None:
+    async def delete(self, message_id: str) -> None:
         """Удаляет сообщение."""
-        self._table.delete().eq("id", message_id).execute()
+        await self._table.delete().eq("id", message_id).execute()
@@ -1,6 +1,7 @@
 """Репозиторий для таблицы search_profiles."""
 
-from db.connection import get_supabase_client
+from db.connection import PAGE_SIZE, get_supabase_client
+from db.profile_index import ProfileIndex, get_profile_index
 
 
 class SearchProfileRepository:
@@ -9,11 +10,12 @@ class SearchProfileRepository:
     def __init__(self) -> None:
         self._client = get_supabase_client()
         self._table = self._client.table("search_profiles")
+        self._index = get_profile_index()
 
-    def create(self, user_id: str, keywords: list[str],
+    async def create(self, user_id: str, keywords: list[str],
                min_budget: int | None = None,
                work_format: list[str] | None = None) -> dict:
-        """Создаёт новый профиль поиска."""
+        """Создаёт новый профиль поиска и добавляет его в индекс профилей."""
         data: dict = {
             "user_id": user_id,
             "keywords": keywords,
@@ -22,12 +24,13 @@ class SearchProfileRepository:
             data["min_budget"] = min_budget
         if work_format is not None:
             data["work_format"] = work_format
-        response = self._table.insert(data).execute()
+        response = await self._table.insert(data).execute()
+        self._index.upsert(response.data[0])
         return response.data[0]
 
-    def get_active(self, user_id: str) -> dict | None:
+    async def get_active(self, user_id: str) -> dict | None:
         """Возвращает активный профиль поиска пользователя."""
-        response = (
+        response = await (
             self._table.select("*")
             .eq("user_id", user_id)
             .eq("is_active", True)
@@ -37,7 +40,29 @@ class SearchProfileRepository:
         )
         return response.data[0] if response.data else None
 
-    def update(self, profile_id: str, **fields) -> dict:
-        """Обновляет поля профиля поиска."""
-        response = self._table.update(fields).eq("id", profile_id).execute()
+    async def get_all_active(self) -> list[dict]:
+        """Все активные профили поиска (для заполнения индекса профилей)."""
+        rows: list[dict] = []
+        while True:
+            response = await (
+                self._table.select("id, user_id, keywords, min_budget, work_format")
+                .eq("is_active", True)
+                .order("id")
+                .range(len(rows), len(rows) + PAGE_SIZE - 1)
+                .execute()
+            )
+            rows.extend(response.data)
+            if len(response.data) < PAGE_SIZE:
+                return rows
+
+    async def get_index(self) -> ProfileIndex:
+        """Индекс активных профилей; при первом обращении заполняется из БД."""
+        if not self._index.loaded:
+            self._index.load(await self.get_all_active())
+        return self._index
+
+    async def update(self, profile_id: str, **fields) -> dict:
+        """Обновляет поля профиля поиска (и его запись в индексе профилей)."""
+        response = await self._table.update(fields).eq("id", profile_id).execute()
+        self._index.upsert(response.data[0])
         return response.data[0]
@@ -10,9 +10,9 @@ class SettingsRepository:
         self._client = get_supabase_client()
         self._table = self._client.table("settings")
 
-    def get_by_user_id(self, user_id: str) -> dict | None:
+    async def get_by_user_id(self, user_id: str) -> dict | None:
         """Получает настройки пользователя."""
-        response = (
+        response = await (
             self._table.select("*")
             .eq("user_id", user_id)
             .limit(1)
@@ -20,13 +20,13 @@ class SettingsRepository:
         )
         return response.data[0] if response.data else None
 
-    def create_default(self, user_id: str) -> dict:
+    async def create_default(self, user_id: str) -> dict:
         """Создаёт запись с дефолтными значениями."""
-        response = self._table.insert({"user_id": user_id}).execute()
+        response = await self._table.insert({"user_id": user_id}).execute()
         return response.data[0]
 
-    def update(self, user_id: str, **fields) -> dict:
+    async def update(self, user_id: str, **fields) -> dict:
         """Обновляет настройки пользователя."""
         fields["updated_at"] = "now()"
-        response = self._table.update(fields).eq("user_id", user_id).execute()
+        response = await self._table.update(fields).eq("user_id", user_id).execute()
         return response.data[0]
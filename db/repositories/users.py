@@ -1,6 +1,7 @@
 """Репозиторий для таблицы users."""
 
-from db.connection import get_supabase_client
+from db.connection import get_supabase_client, in_chunks
+from db.user_cache import get_user_cache
 
 
 class UserRepository:
@@ -9,10 +10,11 @@ class UserRepository:
     def __init__(self) -> None:
         self._client = get_supabase_client()
         self._table = self._client.table("users")
+        self._cache = get_user_cache()
 
-    def get_by_telegram_id(self, telegram_id: int) -> dict | None:
+    async def get_by_telegram_id(self, telegram_id: int) -> dict | None:
         """Находит пользователя по telegram_id."""
-        response = (
+        response = await (
             self._table.select("*")
             .eq("telegram_id", telegram_id)
             .limit(1)
@@ -20,12 +22,12 @@ class UserRepository:
         )
         return response.data[0] if response.data else None
 
-    def get_by_telegram_id_or_id(self, identifier: str | int) -> dict | None:
+    async def get_by_telegram_id_or_id(self, identifier: str | int) -> dict | None:
         """Находит пользователя по UUID (id) или telegram_id."""
         if isinstance(identifier, int):
-            return self.get_by_telegram_id(identifier)
+            return await self.get_by_telegram_id(identifier)
         # UUID — ищем по id
-        response = (
+        response = await (
             self._table.select("*")
             .eq("id", identifier)
             .limit(1)
@@ -33,26 +35,38 @@ class UserRepository:
         )
         return response.data[0] if response.data else None
 
-    def create(self, telegram_id: int, username: str | None = None, first_name: str | None = None) -> dict:
+    async def get_by_ids(self, user_ids: list[str]) -> list[dict]:
+        """Находит пользователей по списку id (пачками — список уходит в URL)."""
+        rows: list[dict] = []
+        for chunk in in_chunks(user_ids):
+            response = await self._table.select("*").in_("id", chunk).execute()
+            rows.extend(response.data)
+        return rows
+
+    async def create(self, telegram_id: int, username: str | None = None,
+                     first_name: str | None = None) -> dict:
         """Создаёт нового пользователя."""
         data: dict = {"telegram_id": telegram_id}
         if username is not None:
             data["username"] = username
         if first_name is not None:
             data["first_name"] = first_name
-        response = self._table.insert(data).execute()
+        response = await self._table.insert(data).execute()
         return response.data[0]
 
-    def update(self, user_id: str, **fields) -> dict:
-        """Обновляет поля пользователя."""
+    async def update(self, user_id: str, **fields) -> dict:
+        """Обновляет поля пользователя и сбрасывает его запись в кэше."""
         fields["updated_at"] = "now()"
-        response = self._table.update(fields).eq("id", user_id).execute()
+        try:
+            response = await self._table.update(fields).eq("id", user_id).execute()
+        finally:
+            self._cache.invalidate(user_id)
         return response.data[0]
 
-    def complete_onboarding(self, user_id: str) -> None:
-        """Отмечает онбординг как пройденный."""
-        self.update(user_id, onboarding_completed=True)
+    async def complete_onboarding(self, user_id: str) -> None:
+        """Отмечает онбординг как пройденный (кэш сбрасывается в update)."""
+        await self.update(user_id, onboarding_completed=True)
 
-    def accept_disclaimer(self, user_id: str) -> None:
-        """Отмечает принятие дисклеймера."""
-        self.update(user_id, disclaimer_accepted=True)
+    async def accept_disclaimer(self, user_id: str) -> None:
+        """Отмечает принятие дисклеймера (кэш сбрасывается в update)."""
+        await self.update(user_id, disclaimer_accepted=True)
@@ -1,6 +1,10 @@
 """Репозиторий для таблиц channel_messages и saved_vacancies."""
 
-from db.connection import get_supabase_client
+from datetime import datetime, timezone
+from typing import Callable
+
+from db.connection import IN_CHUNK, PAGE_SIZE, get_supabase_client, in_chunks
+from parsers.simhash import fingerprint, to_signed
 
 
 class VacancyRepository:
@@ -11,56 +15,147 @@ class VacancyRepository:
         self._messages = self._client.table("channel_messages")
         self._saved = self._client.table("saved_vacancies")
 
-    def save_channel_messages(self, channel_id: str, messages: list[dict]) -> int:
+    async def save_channel_messages(self, channel_id: str, messages: list[dict]) -> int:
         """Bulk upsert сообщений канала. Возвращает количество обработанных."""
-        if not messages:
-            return 0
+        return await self.save_messages([{**msg, "channel_id": channel_id} for msg in messages])
+
+    async def save_messages(self, messages: list[dict]) -> int:
+        """Bulk upsert сообщений нескольких каналов (у каждого — свой channel_id).
 
+        Пишется пачками по PAGE_SIZE строк. Возвращает количество обработанных.
+        """
         rows = [
             {
-                "channel_id": channel_id,
+                "channel_id": msg["channel_id"],
                 "telegram_message_id": msg["telegram_message_id"],
                 "text": msg.get("text"),
                 "date": msg.get("date"),
+                "simhash": to_signed(fingerprint(msg["text"])) if msg.get("text") else None,
             }
             for msg in messages
         ]
 
-        # Upsert по уникальному ключу (channel_id, telegram_message_id)
-        response = (
-            self._messages.upsert(
-                rows,
-                on_conflict="channel_id,telegram_message_id",
-            ).execute()
+        saved = 0
+        for start in range(0, len(rows), PAGE_SIZE):
+            # Upsert по уникальному ключу (channel_id, telegram_message_id)
+            response = await (
+                self._messages.upsert(
+                    rows[start:start + PAGE_SIZE],
+                    on_conflict="channel_id,telegram_message_id",
+                ).execute()
+            )
+            saved += len(response.data)
+        return saved
+
+    async def get_unfiltered(self, channel_ids: list[str], limit: int = 100,
+                             newest_first: bool = True) -> list[dict]:
+        """Возвращает сообщения, которые ещё не проверены (is_vacancy IS NULL).
+
+        Много каналов запрашиваются пачками по IN_CHUNK; результат — limit самых
+        свежих (newest_first=False — самых старых, чтобы очередь не голодала).
+        """
+        return await self._select_limited(
+            channel_ids, limit, newest_first,
+            lambda query: query.is_("is_vacancy", "null"),
         )
-        return len(response.data)
 
-    def get_unfiltered(self, channel_ids: list[str], limit: int = 100) -> list[dict]:
-        """Возвращает сообщения, которые ещё не проверены (is_vacancy IS NULL)."""
-        response = (
-            self._messages.select("*")
-            .in_("channel_id", channel_ids)
-            .is_("is_vacancy", "null")
-            .order("date", desc=True)
-            .limit(limit)
-            .execute()
+    async def get_unnotified(self, channel_ids: list[str], limit: int = 100) -> list[dict]:
+        """Вакансии, которые мониторинг ещё не разослал (notified_at IS NULL), от старых к новым."""
+        return await self._select_limited(
+            channel_ids, limit, False,
+            lambda query: query.eq("is_vacancy", True).is_("notified_at", "null"),
         )
-        return response.data
 
-    def mark_as_vacancy(self, message_id: str, vacancy_data: dict) -> None:
+    async def mark_notified(self, message_ids: list[str]) -> None:
+        """Отмечает сообщения как разосланные мониторингом."""
+        now = datetime.now(timezone.utc).isoformat()
+        for chunk in in_chunks(message_ids):
+            await self._messages.update({"notified_at": now}).in_("id", chunk).execute()
+
+    async def get_notified(self, message_ids: list[str]) -> list[dict]:
+        """Какие из сообщений мониторинг уже разослал.
+
+        Returns:
+            [{id, channel_id}, ...]
+        """
+        rows: list[dict] = []
+        for chunk in in_chunks(message_ids):
+            response = await (
+                self._messages.select("id, channel_id")
+                .in_("id", chunk)
+                .not_.is_("notified_at", "null")
+                .execute()
+            )
+            rows.extend(response.data)
+        return rows
+
+    async def _select_limited(self, channel_ids: list[str], limit: int, newest_first: bool,
+                              where: Callable) -> list[dict]:
+        """limit сообщений каналов по дате; каналы запрашиваются пачками по IN_CHUNK."""
+        rows: list[dict] = []
+        for chunk in in_chunks(channel_ids):
+            response = await (
+                where(self._messages.select("*").in_("channel_id", chunk))
+                .order("date", desc=newest_first)
+                .limit(limit)
+                .execute()
+            )
+            rows.extend(response.data)
+        if len(channel_ids) > IN_CHUNK:
+            rows.sort(key=lambda row: row.get("date") or "", reverse=newest_first)
+        return rows[:limit]
+
+    async def mark_as_vacancy(self, message_id: str, vacancy_data: dict) -> None:
         """Отмечает сообщение как вакансию с данными."""
-        self._messages.update({
+        await self._messages.update({
             "is_vacancy": True,
             "vacancy_data": vacancy_data,
         }).eq("id", message_id).execute()
 
-    def mark_as_not_vacancy(self, message_id: str) -> None:
+    async def mark_as_not_vacancy(self, message_id: str) -> None:
         """Отмечает сообщение как не-вакансию."""
-        self._messages.update({"is_vacancy": False}).eq("id", message_id).execute()
+        await self._messages.update({"is_vacancy": False}).eq("id", message_id).execute()
+
+    async def mark_many_as_not_vacancy(self, message_ids: list[str]) -> None:
+        """Отмечает пачку сообщений как не-вакансии одним запросом."""
+        for chunk in in_chunks(message_ids):
+            await self._messages.update({"is_vacancy": False}).in_("id", chunk).execute()
+
+    async def update_many(self, rows: list[dict]) -> None:
+        """Пачкой обновляет разные значения полей у многих сообщений (upsert по id).
+
+        Пишется пачками по PAGE_SIZE строк. В каждой строке — id, channel_id,
+        telegram_message_id (INSERT-часть upsert проверяет NOT NULL) и один
+        и тот же набор изменяемых полей; остальные колонки не трогаются.
+        """
+        for start in range(0, len(rows), PAGE_SIZE):
+            await self._messages.upsert(
+                rows[start:start + PAGE_SIZE], on_conflict="id",
+            ).execute()
+
+    async def get_fingerprints(self, since: str) -> list[dict]:
+        """Отпечатки сообщений не старше since (ISO) — для индекса копий.
+
+        Returns:
+            [{id, simhash, canonical_id, is_vacancy, vacancy_data}, ...] от старых к новым
+        """
+        rows: list[dict] = []
+        while True:
+            response = await (
+                self._messages.select("id, simhash, canonical_id, is_vacancy, vacancy_data")
+                .gte("date", since)
+                .not_.is_("simhash", "null")
+                .order("date")
+                .range(len(rows), len(rows) + PAGE_SIZE - 1)
+                .execute()
+            )
+            rows.extend(response.data)
+            if len(response.data) < PAGE_SIZE:
+                return rows
 
-    def get_vacancies(self, channel_ids: list[str], limit: int = 10) -> list[dict]:
+    async def get_vacancies(self, channel_ids: list[str], limit: int = 10) -> list[dict]:
         """Возвращает подтверждённые вакансии из указанных каналов."""
-        response = (
+        response = await (
             self._messages.select("*")
             .in_("channel_id", channel_ids)
             .eq("is_vacancy", True)
@@ -70,17 +165,17 @@ class VacancyRepository:
         )
         return response.data
 
-    def save_vacancy(self, user_id: str, channel_message_id: str) -> dict:
+    async def save_vacancy(self, user_id: str, channel_message_id: str) -> dict:
         """Сохраняет вакансию в избранное."""
-        response = self._saved.insert({
+        response = await self._saved.insert({
             "user_id": user_id,
             "channel_message_id": channel_message_id,
         }).execute()
         return response.data[0]
 
-    def get_saved(self, user_id: str) -> list[dict]:
+    async def get_saved(self, user_id: str) -> list[dict]:
         """Возвращает сохранённые вакансии пользователя."""
-        response = (
+        response = await (
             self._saved.select("*, channel_messages(*)")
             .eq("user_id", user_id)
             .order("created_at", desc=True)
@@ -88,10 +183,10 @@ class VacancyRepository:
         )
         return response.data
 
-    def update_saved_status(self, saved_id: str, status: str,
+    async def update_saved_status(self, saved_id: str, status: str,
                             response_text: str | None = None) -> None:
         """Обновляет статус сохранённой вакансии."""
         data: dict = {"status": status}
         if response_text is not None:
             data["response_text"] = response_text
-        self._saved.update(data).eq("id", saved_id).execute()
+        await self._saved.update(data).eq("id", saved_id).execute()
@@ -0,0 +1,128 @@
+"""Кэш пользователей в памяти процесса (TTL + LRU).
+
+AuthMiddleware читает пользователя на каждом апдейте — кэш убирает этот
+запрос к таблице users. UserRepository сбрасывает запись при любом изменении,
+поэтому в кэше не остаются устаревшие данные профиля.
+
+Чтение из БД при промахе и изменение пользователя могут пересечься: строка
+прочитана до update, а put случился уже после сброса. Поэтому у кэша есть
+счётчик версий: перед чтением берётся version(), каждый сброс помечает
+пользователя новой версией, и put с версией старше сброса не кладёт строку.
+"""
+
+import time
+from collections import OrderedDict
+
+from bot.config import settings
+
+
+class UserCache:
+    """LRU-кэш строк users по telegram_id с ограничением времени жизни."""
+
+    def __init__(self, max_size: int = 10_000, ttl: float = 300.0) -> None:
+        self._max_size = max_size
+        self._ttl = ttl
+        # telegram_id -> (expires_at, user)
+        self._items: OrderedDict[int, tuple[float, dict]] = OrderedDict()
+        # users.id -> telegram_id, для сброса по UUID из UserRepository
+        self._ids: dict[str, int] = {}
+        # users.id -> версия последнего сброса; старые отметки вытесняются,
+        # их максимум остаётся в _floor
+        self._version = 0
+        self._invalidated: OrderedDict[str, int] = OrderedDict()
+        self._floor = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, telegram_id: int) -> dict | None:
+        """Возвращает пользователя из кэша или None (промах / истёк TTL)."""
+        entry = self._items.get(telegram_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            self._remove(telegram_id)
+            self.misses += 1
+            return None
+
+        self._items.move_to_end(telegram_id)
+        self.hits += 1
+        return user
+
+    def version(self) -> int:
+        """Текущая версия кэша — берётся перед чтением пользователя из БД для put."""
+        return self._version
+
+    def put(self, user: dict, version: int | None = None) -> None:
+        """Кладёт пользователя в кэш, вытесняя самые старые записи.
+
+        Args:
+            user: строка users
+            version: version() на момент начала чтения строки из БД; если после
+                него пользователя сбросили, строка могла устареть и не кладётся
+        """
+        if version is not None and (
+            version < self._floor or self._invalidated.get(user["id"], 0) > version
+        ):
+            return
+        telegram_id = user["telegram_id"]
+        self._items[telegram_id] = (time.monotonic() + self._ttl, user)
+        self._items.move_to_end(telegram_id)
+        self._ids[user["id"]] = telegram_id
+
+        while len(self._items) > self._max_size:
+            _, (_, evicted) = self._items.popitem(last=False)
+            self._ids.pop(evicted["id"], None)
+
+    def invalidate(self, user_id: str) -> None:
+        """Сбрасывает запись по users.id (вызывается после изменения пользователя)."""
+        self._version += 1
+        self._invalidated[user_id] = self._version
+        self._invalidated.move_to_end(user_id)
+        while len(self._invalidated) > self._max_size:
+            _, self._floor = self._invalidated.popitem(last=False)
+
+        telegram_id = self._ids.get(user_id)
+        if telegram_id is not None:
+            self._remove(telegram_id)
+
+    def invalidate_telegram_id(self, telegram_id: int) -> None:
+        """Сбрасывает запись по telegram_id."""
+        self._remove(telegram_id)
+
+    def clear(self) -> None:
+        """Полностью очищает кэш (счётчики не сбрасываются)."""
+        self._items.clear()
+        self._ids.clear()
+        self._version += 1
+        self._floor = self._version
+        self._invalidated.clear()
+
+    def stats(self) -> dict:
+        """Счётчики для подбора размера и TTL кэша."""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._items),
+            "max_size": self._max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def _remove(self, telegram_id: int) -> None:
+        entry = self._items.pop(telegram_id, None)
+        if entry is not None:
+            self._ids.pop(entry[1]["id"], None)
+
+
+_cache: UserCache | None = None
+
+
+def get_user_cache() -> UserCache:
+    """Возвращает кэш пользователей (singleton)."""
+    global _cache
+    if _cache is None:
+        _cache = UserCache(max_size=settings.user_cache_size, ttl=settings.user_cache_ttl)
+    return _cache
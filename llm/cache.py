@@ -0,0 +1,225 @@
+"""Кэш ответов LLM для детерминированных запросов.
+
+Классификация и JSON-запросы идут с низкой temperature, и одно и то же
+объявление часто перепощено в десятки каналов — ответ на него одинаковый.
+Ключ кэша — sha256 от модели, типа задачи (llm_task), сообщений, temperature
+и max_tokens, поэтому любое изменение промпта или маршрутизации даёт новый ключ.
+Запросы с temperature выше порога (генерация, рерайт) не кэшируются: там
+нужна разница между ответами.
+
+Хранилище подключаемое: память процесса (LRU) или файл sqlite, который
+переживает перезапуск бота.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from bot.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def make_key(model: str, task: str, messages: list[dict], temperature: float,
+             max_tokens: int) -> str:
+    """Ключ кэша: хэш всего, что влияет на ответ модели."""
+    payload = json.dumps(
+        [model, task, messages, round(temperature, 3), max_tokens],
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class CachedCompletion:
+    """Ответ модели и цена исходного запроса (для статистики экономии)."""
+
+    text: str
+    seconds: float
+    tokens: int
+
+
+class MemoryBackend:
+    """Хранилище в памяти процесса: LRU с ограничением размера."""
+
+    def __init__(self, max_size: int = 10_000) -> None:
+        self._max_size = max_size
+        # key -> (expires_at, запись)
+        self._items: OrderedDict[str, tuple[float, CachedCompletion]] = OrderedDict()
+
+    def get(self, key: str) -> CachedCompletion | None:
+        entry = self._items.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.time():
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: str, value: CachedCompletion, ttl: float) -> None:
+        self._items[key] = (time.time() + ttl, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self._max_size:
+            self._items.popitem(last=False)
+
+    def size(self) -> int:
+        return len(self._items)
+
+    def close(self) -> None:
+        self._items.clear()
+
+
+class SqliteBackend:
+    """Хранилище в файле sqlite — переживает перезапуск.
+
+    Запросы синхронные: локальный файл отвечает за доли миллисекунды,
+    это дешевле, чем уводить их в поток.
+    """
+
+    # Как часто (в записях) проверять размер и чистить устаревшее
+    _PRUNE_EVERY = 100
+
+    def __init__(self, path: str, max_size: int = 10_000) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._max_size = max_size
+        self._writes = 0
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            " key TEXT PRIMARY KEY,"
+            " text TEXT NOT NULL,"
+            " seconds REAL NOT NULL,"
+            " tokens INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " used_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_completions_used_at ON completions(used_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> CachedCompletion | None:
+        now = time.time()
+        row = self._conn.execute(
+            "SELECT text, seconds, tokens, expires_at FROM completions WHERE key = ?", (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        if row[3] < now:
+            self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+        self._conn.execute("UPDATE completions SET used_at = ? WHERE key = ?", (now, key))
+        self._conn.commit()
+        return CachedCompletion(row[0], row[1], row[2])
+
+    def set(self, key: str, value: CachedCompletion, ttl: float) -> None:
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO completions (key, text, seconds, tokens, expires_at, used_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (key, value.text, value.seconds, value.tokens, now + ttl, now),
+        )
+        self._writes += 1
+        if self._writes % self._PRUNE_EVERY == 0:
+            self._prune(now)
+        self._conn.commit()
+
+    def size(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _prune(self, now: float) -> None:
+        """Удаляет устаревшие записи и самые давно использованные сверх max_size."""
+        self._conn.execute("DELETE FROM completions WHERE expires_at < ?", (now,))
+        self._conn.execute(
+            "DELETE FROM completions WHERE key IN ("
+            " SELECT key FROM completions ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+            (self._max_size,),
+        )
+
+
+class CompletionCache:
+    """Кэш ответов LLM со статистикой сэкономленных запросов."""
+
+    def __init__(
+        self,
+        backend: MemoryBackend | SqliteBackend,
+        ttl: float = 7 * 24 * 3600.0,
+        max_temperature: float = 0.3,
+        price_per_1k_tokens: float = 0.0,
+    ) -> None:
+        self._backend = backend
+        self._ttl = ttl
+        self._max_temperature = max_temperature
+        self._price_per_1k_tokens = price_per_1k_tokens
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self.saved_tokens = 0
+
+    def accepts(self, temperature: float) -> bool:
+        """Кэшируются только (почти) детерминированные запросы."""
+        return temperature <= self._max_temperature
+
+    def get(self, key: str) -> str | None:
+        cached = self._backend.get(key)
+        if cached is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.saved_seconds += cached.seconds
+        self.saved_tokens += cached.tokens
+        return cached.text
+
+    def put(self, key: str, text: str, seconds: float = 0.0, tokens: int = 0) -> None:
+        """Сохраняет ответ; seconds и tokens — цена запроса для статистики."""
+        self._backend.set(key, CachedCompletion(text, seconds, tokens), self._ttl)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": self._backend.size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "saved_seconds": round(self.saved_seconds, 1),
+            "saved_tokens": self.saved_tokens,
+            "saved_cost": round(self.saved_tokens / 1000 * self._price_per_1k_tokens, 4),
+        }
+
+    def close(self) -> None:
+        self._backend.close()
+
+
+_cache: CompletionCache | None = None
+
+
+def get_completion_cache() -> CompletionCache | None:
+    """Возвращает кэш ответов LLM (singleton) или None, если кэш выключен."""
+    global _cache
+    if _cache is None and settings.llm_cache_backend != "off":
+        if settings.llm_cache_backend == "sqlite":
+            backend = SqliteBackend(settings.llm_cache_path, max_size=settings.llm_cache_size)
+        else:
+            backend = MemoryBackend(max_size=settings.llm_cache_size)
+        _cache = CompletionCache(
+            backend,
+            ttl=settings.llm_cache_ttl,
+            max_temperature=settings.llm_cache_max_temperature,
+            price_per_1k_tokens=settings.llm_price_per_1k_tokens,
+        )
+    return _cache
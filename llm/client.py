@@ -1,18 +1,41 @@
 """LLM-клиент. Единая точка для всех запросов к языковой модели.
 
 Использует OpenAI-совместимый API (NeuroAPI, OpenAI, и т.д.).
-Смена провайдера — замена base_url в .env.
+Смена провайдера — замена base_url в .env; несколько провайдеров
+с маршрутизацией по задачам — LLM_ENDPOINTS (см. llm/router.py).
 """
 
+import asyncio
+import json
 import logging
-from typing import Any
+import re
+import time
+from difflib import SequenceMatcher
+from typing import Any, AsyncIterator, Callable
 
-from openai import AsyncOpenAI, APIConnectionError, APITimeoutError, RateLimitError
+from openai import APIConnectionError, APITimeoutError, RateLimitError
 
 from bot.config import settings
+from llm.cache import get_completion_cache, make_key
+from llm.metrics import CallRecord, current_user, get_llm_metrics
+from llm.resilience import CircuitOpenError, current_priority
+from llm.router import (
+    Endpoint,
+    EndpointConfig,
+    EndpointRouter,
+    current_task,
+    load_endpoint_configs,
+)
+from llm.tokens import estimate_messages_tokens
 
 logger = logging.getLogger(__name__)
 
+_WHITESPACE = re.compile(r"\s+")
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+# Варианты, похожие сильнее этого порога, считаются дублями
+_DUPLICATE_RATIO = 0.9
+
 
 class LLMClient:
     """Асинхронный клиент для OpenAI-совместимого API."""
@@ -24,53 +47,53 @@ class LLMClient:
         model: str | None = None,
     ) -> None:
         self._api_key = api_key or settings.llm_api_key
-        self._base_url = base_url or settings.llm_base_url
-        self._model = model or settings.llm_model
-
         if not self._api_key:
             raise ValueError("LLM_API_KEY не задан. Заполни .env файл.")
 
-        self._client = AsyncOpenAI(
-            api_key=self._api_key,
-            base_url=self._base_url,
-            timeout=60.0,
+        if base_url or model or api_key:
+            configs = [EndpointConfig(
+                name="default",
+                base_url=base_url or settings.llm_base_url,
+                api_key=self._api_key,
+                model=model or settings.llm_model,
+                rpm=settings.llm_rpm,
+                tpm=settings.llm_tpm,
+            )]
+        else:
+            configs = load_endpoint_configs()
+        self._router = EndpointRouter(
+            [Endpoint(config) for config in configs],
+            hedge_after=settings.llm_hedge_after,
+            max_attempts=settings.llm_max_attempts,
         )
 
+        self._native_n = settings.llm_native_n
+        self._variant_concurrency = settings.llm_variant_concurrency
+        self._variant_timeout = settings.llm_variant_timeout
+        self._stream_usage = settings.llm_stream_usage
+        self._metrics = get_llm_metrics()
+
     async def generate(
         self,
         system_prompt: str,
         user_prompt: str,
         temperature: float = 0.7,
         max_tokens: int = 2000,
+        validate: Callable[[str], bool] | None = None,
     ) -> str:
-        """Один запрос к LLM. Возвращает текст ответа."""
-        try:
-            response = await self._client.chat.completions.create(
-                model=self._model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=temperature,
-                max_tokens=max_tokens,
-            )
-            content = response.choices[0].message.content
-            if not content:
-                raise ValueError("LLM returned empty response")
-            return content.strip()
+        """Один запрос к LLM. Возвращает текст ответа.
 
-        except APITimeoutError:
-            logger.error("LLM request timed out")
-            raise
-        except RateLimitError:
-            logger.error("LLM rate limit exceeded")
-            raise
-        except APIConnectionError:
-            logger.error("LLM connection error")
-            raise
-        except Exception:
-            logger.exception("LLM unexpected error")
-            raise
+        validate — проверка ответа перед записью в кэш (см. _complete).
+        """
+        return await self._complete(
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            validate=validate,
+        )
 
     async def generate_variants(
         self,
@@ -82,27 +105,75 @@ class LLMClient:
     ) -> list[str]:
         """Генерирует несколько вариантов текста.
 
-        Делает count отдельных запросов с повышенной temperature.
+        Если провайдер поддерживает n (LLM_NATIVE_N), варианты приходят одним
+        запросом. Недостающие варианты запрашиваются параллельно, не больше
+        LLM_VARIANT_CONCURRENCY одновременно, каждый со своим таймаутом.
+        Неудачные запросы пропускаются, почти одинаковые варианты схлопываются.
         """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
         variants: list[str] = []
-        for i in range(count):
+
+        if self._native_n and count > 1:
             try:
-                result = await self.generate(
-                    system_prompt=system_prompt,
-                    user_prompt=user_prompt,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
+                variants = await asyncio.wait_for(
+                    self._complete_choices(messages, count, temperature, max_tokens),
+                    timeout=self._variant_timeout,
                 )
+            except Exception as e:
+                logger.warning("Native n=%d request failed, falling back: %s", count, e)
+
+        missing = count - len(variants)
+        if missing > 0:
+            semaphore = asyncio.Semaphore(self._variant_concurrency)
+
+            async def one_variant() -> str:
+                async with semaphore:
+                    return await asyncio.wait_for(
+                        self.generate(
+                            system_prompt=system_prompt,
+                            user_prompt=user_prompt,
+                            temperature=temperature,
+                            max_tokens=max_tokens,
+                        ),
+                        timeout=self._variant_timeout,
+                    )
+
+            results = await asyncio.gather(
+                *(one_variant() for _ in range(missing)), return_exceptions=True,
+            )
+            for i, result in enumerate(results):
+                if isinstance(result, BaseException):
+                    logger.warning("Failed to generate variant %d/%d: %r", i + 1, missing, result)
+                    continue
                 variants.append(result)
-            except Exception:
-                logger.warning("Failed to generate variant %d/%d", i + 1, count)
-                # Продолжаем генерацию остальных вариантов
-                continue
 
         if not variants:
             raise RuntimeError("Не удалось сгенерировать ни одного варианта")
 
-        return variants
+        return _dedupe_variants(variants)
+
+    async def _complete_choices(
+        self,
+        messages: list[dict],
+        n: int,
+        temperature: float,
+        max_tokens: int,
+    ) -> list[str]:
+        """Один запрос с n вариантами ответа (choices)."""
+        _, response = await self._create(
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            n=n,
+        )
+        return [
+            choice.message.content.strip()
+            for choice in response.choices
+            if choice.message.content and choice.message.content.strip()
+        ]
 
     async def generate_chat(
         self,
@@ -120,9 +191,35 @@ class LLMClient:
         Returns:
             Текст ответа ассистента
         """
+        return await self._complete(messages, temperature, max_tokens)
+
+    async def _complete(
+        self,
+        messages: list[dict],
+        temperature: float,
+        max_tokens: int,
+        validate: Callable[[str], bool] | None = None,
+    ) -> str:
+        """Запрос к LLM через кэш ответов (для низкой temperature).
+
+        validate(text) -> bool решает, годится ли ответ для кэша: битый или
+        обрезанный JSON не должен неделю отдаваться на каждый повтор. Ответ,
+        не прошедший проверку, всё равно возвращается вызывающему — он сам
+        решает, что с ним делать. Такая же проверка применяется к ответу из кэша.
+        """
+        cache = get_completion_cache()
+        use_cache = cache is not None and cache.accepts(temperature)
+        task = current_task()
+        if use_cache:
+            # Модель, на которую задача уйдёт при здоровых endpoint'ах
+            model = self._router.candidates(task)[0].model
+            cached = cache.get(make_key(model, task, messages, temperature, max_tokens))
+            if cached is not None and _is_valid(validate, cached):
+                return cached
+
+        started = time.monotonic()
         try:
-            response = await self._client.chat.completions.create(
-                model=self._model,
+            endpoint, response = await self._create(
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens,
@@ -130,10 +227,140 @@ class LLMClient:
             content = response.choices[0].message.content
             if not content:
                 raise ValueError("LLM returned empty response")
-            return content.strip()
+            result = content.strip()
+
+        except APITimeoutError:
+            logger.error("LLM request timed out")
+            raise
+        except RateLimitError:
+            logger.error("LLM rate limit exceeded")
+            raise
+        except APIConnectionError:
+            logger.error("LLM connection error")
+            raise
+        except CircuitOpenError:
+            logger.warning("LLM circuit open, request rejected")
+            raise
+        except Exception:
+            logger.exception("LLM unexpected error")
+            raise
+
+        if use_cache and _is_valid(validate, result):
+            # Под моделью, которая действительно ответила (после failover / хеджирования)
+            key = make_key(endpoint.model, task, messages, temperature, max_tokens)
+            tokens = response.usage.total_tokens if response.usage else 0
+            cache.put(key, result, seconds=time.monotonic() - started, tokens=tokens)
+        return result
+
+    async def _create(self, **params: Any) -> tuple[Endpoint, Any]:
+        """chat.completions.create через маршрутизатор endpoint'ов (без stream).
+
+        Возвращает (endpoint, который ответил; ответ).
+        """
+        started = time.monotonic()
+        endpoint, response = await self._route(params)
+        self._record_call(endpoint, getattr(response, "usage", None), started)
+        return endpoint, response
+
+    async def _route(self, params: dict) -> tuple[Endpoint, Any]:
+        """Отправляет запрос через маршрутизатор; ошибку учитывает в метриках.
+
+        Учитываются приоритет (llm_priority) и тип задачи (llm_task) текущего контекста.
+        """
+        estimated = estimate_messages_tokens(params["messages"]) + params.get("max_tokens", 0)
+        try:
+            return await self._router.create(
+                params, estimated, current_priority(), current_task(),
+            )
+        except Exception as e:
+            self._metrics.record_error(current_task(), e)
+            raise
+
+    def _record_call(
+        self,
+        endpoint: Endpoint,
+        usage: Any,
+        started: float,
+        first_token_at: float | None = None,
+        status: str = "ok",
+    ) -> None:
+        """Пишет запрос в метрики; cached — prompt_tokens_details.cached_tokens."""
+        details = getattr(usage, "prompt_tokens_details", None)
+        self._metrics.record(CallRecord(
+            tag=current_task(),
+            model=endpoint.model,
+            endpoint=endpoint.name,
+            user_id=current_user(),
+            prompt_tokens=getattr(usage, "prompt_tokens", None) or 0,
+            cached_tokens=getattr(details, "cached_tokens", None) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", None) or 0,
+            duration=time.monotonic() - started,
+            ttft=first_token_at - started if first_token_at is not None else None,
+            status=status,
+        ))
+
+    def stats(self) -> dict:
+        """Задержки, доля ошибок и состояние предохранителя по endpoint'ам."""
+        return self._router.stats()
+
+    def usage_stats(self) -> dict:
+        """Суммарный расход токенов и доля prompt-токенов из кэша провайдера."""
+        return self._metrics.token_totals()
+
+    async def stream_chat(
+        self,
+        messages: list[dict],
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+    ) -> AsyncIterator[str]:
+        """Потоковый запрос к LLM: отдаёт фрагменты ответа по мере генерации.
+
+        Args:
+            messages: список сообщений [{"role": "system/user/assistant", "content": "..."}]
+            temperature: креативность
+            max_tokens: максимум токенов ответа
+
+        Yields:
+            Очередной фрагмент текста ответа
+        """
+        params: dict[str, Any] = {}
+        if self._stream_usage:
+            # usage приходит последним чанком (с пустым choices)
+            params["stream_options"] = {"include_usage": True}
+        started = time.monotonic()
+        try:
+            endpoint, stream = await self._route({
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "stream": True,
+                **params,
+            })
+            usage = None
+            first_token_at: float | None = None
+            status = "error"
+            try:
+                async with stream:
+                    async for chunk in stream:
+                        if getattr(chunk, "usage", None) is not None:
+                            usage = chunk.usage
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            if first_token_at is None:
+                                first_token_at = time.monotonic()
+                            yield delta
+                status = "ok"
+            except (GeneratorExit, asyncio.CancelledError):
+                # Потребитель перестал читать поток
+                status = "cancelled"
+                raise
+            finally:
+                self._record_call(endpoint, usage, started, first_token_at, status)
 
         except APITimeoutError:
-            logger.error("LLM chat request timed out")
+            logger.error("LLM stream timed out")
             raise
         except RateLimitError:
             logger.error("LLM rate limit exceeded")
@@ -141,6 +368,9 @@ class LLMClient:
         except APIConnectionError:
             logger.error("LLM connection error")
             raise
+        except CircuitOpenError:
+            logger.warning("LLM circuit open, request rejected")
+            raise
         except Exception:
             logger.exception("LLM unexpected error")
             raise
@@ -151,16 +381,56 @@ class LLMClient:
         user_prompt: str,
         temperature: float = 0.3,
         max_tokens: int = 1000,
+        validate: Callable[[str], bool] | None = None,
     ) -> str:
-        """Запрос с ожиданием JSON-ответа. Низкая temperature для стабильности."""
+        """Запрос с ожиданием JSON-ответа. Низкая temperature для стабильности.
+
+        validate — проверка разбора ответа; без неё кэшируется любой
+        JSON-подобный текст (валидный JSON — да, обрезанный — нет).
+        """
         return await self.generate(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
             temperature=temperature,
             max_tokens=max_tokens,
+            validate=validate or _is_json,
         )
 
 
+def _is_valid(validate: Callable[[str], bool] | None, text: str) -> bool:
+    """Проходит ли ответ проверку перед кэшем (исключение в проверке — не проходит)."""
+    if validate is None:
+        return True
+    try:
+        return bool(validate(text))
+    except Exception:
+        return False
+
+
+def _is_json(text: str) -> bool:
+    """Ответ — JSON, возможно в markdown-обёртке ```json."""
+    json.loads(_CODE_FENCE.sub("", text.strip()))
+    return True
+
+
+def _dedupe_variants(variants: list[str]) -> list[str]:
+    """Убирает почти одинаковые варианты, сохраняя порядок."""
+    unique: list[str] = []
+    normalized: list[str] = []
+    for variant in variants:
+        text = _WHITESPACE.sub(" ", variant).strip().casefold()
+        is_duplicate = False
+        for seen in normalized:
+            matcher = SequenceMatcher(None, seen, text, autojunk=False)
+            if matcher.quick_ratio() >= _DUPLICATE_RATIO and matcher.ratio() >= _DUPLICATE_RATIO:
+                is_duplicate = True
+                break
+        if not is_duplicate:
+            unique.append(variant)
+            normalized.append(text)
+    return unique
+
+
 # Singleton-экземпляр
 _client: LLMClient | None = None
 
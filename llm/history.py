@@ -0,0 +1,59 @@
+"""Сжатие истории чата по бюджету токенов.
+
+В режиме «Составить текст» каждая доработка добавляет в историю инструкцию
+и новый вариант текста, и вся история уходит в LLM при каждом запросе.
+compact_history держит её в пределах бюджета:
+
+- вводные сообщения до первого ответа модели (профиль, вакансия, резюме)
+  закреплены и не сжимаются;
+- последние keep_last сообщений остаются как есть;
+- из средней части остаются только инструкции пользователя — одной
+  заметкой, а промежуточные варианты текста выбрасываются.
+"""
+
+from llm.tokens import estimate_messages_tokens
+
+_SUMMARY_PREFIX = "Ранее в этом диалоге я просил:"
+# Сколько прошлых инструкций хранить в заметке и их максимальная длина
+_SUMMARY_MAX_ITEMS = 10
+_SUMMARY_ITEM_CHARS = 200
+
+
+def compact_history(history: list[dict], max_tokens: int, keep_last: int = 4) -> list[dict]:
+    """Возвращает историю, уложенную в max_tokens (оценка), или её же, если влезает."""
+    start = _context_length(history)
+    if estimate_messages_tokens(history) <= max_tokens or len(history) <= start + keep_last:
+        return history
+
+    pinned, middle, tail = history[:start], history[start:-keep_last], list(history[-keep_last:])
+
+    instructions: list[str] = []
+    for message in middle:
+        content = message.get("content") or ""
+        if content.startswith(_SUMMARY_PREFIX):
+            instructions.extend(
+                line[2:] for line in content.splitlines()[1:] if line.startswith("- ")
+            )
+        elif message.get("role") == "user":
+            instructions.append(" ".join(content.split())[:_SUMMARY_ITEM_CHARS])
+
+    compacted = list(pinned)
+    if instructions:
+        items = "\n".join(f"- {text}" for text in instructions[-_SUMMARY_MAX_ITEMS:])
+        compacted.append({"role": "user", "content": f"{_SUMMARY_PREFIX}\n{items}"})
+
+    # Если и так не влезает — отбрасываем старые сообщения хвоста, кроме двух последних
+    while len(tail) > 2 and estimate_messages_tokens(compacted + tail) > max_tokens:
+        tail.pop(0)
+
+    return compacted + tail
+
+
+def _context_length(history: list[dict]) -> int:
+    """Сколько вводных сообщений в начале истории: всё до первого ответа модели
+    или до заметки с прошлыми инструкциями."""
+    for i, message in enumerate(history):
+        content = message.get("content") or ""
+        if message.get("role") != "user" or content.startswith(_SUMMARY_PREFIX):
+            return i
+    return len(history)
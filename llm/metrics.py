@@ -0,0 +1,277 @@
+"""Метрики запросов к LLM: токены, задержки, кто и на что их тратит.
+
+Каждый запрос к провайдеру даёт одну запись CallRecord: prompt / cached /
+completion токены, полное время, время до первого токена (для потоковых),
+модель, endpoint, тег задачи (llm_task: compose — генерация и доработка
+текста, classify) и пользователь (llm_user — ставит AuthMiddleware).
+
+LLMMetrics копит записи в памяти процесса: счётчики и гистограммы по тегу
+и endpoint'у, расход токенов по пользователям (за интервал сводки, не больше
+_MAX_USERS записей — остальные в «other»). Наружу — текст в формате
+Prometheus (render_prometheus, /metrics при METRICS_PORT) и периодическая
+сводка в лог (run_summary_log).
+"""
+
+import asyncio
+import json
+import logging
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Iterator
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+_user_id: ContextVar[str | None] = ContextVar("llm_user", default=None)
+
+# Границы корзин гистограмм (секунды)
+_DURATION_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0)
+_TTFT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0)
+# Сколько самых «дорогих» пользователей показывать в сводке
+_TOP_USERS = 5
+# Предел записей расхода по пользователям: при переполнении остаётся половина
+# самых «дорогих», остальные суммируются в _OTHER_USERS
+_MAX_USERS = 10_000
+_OTHER_USERS = "other"
+
+
+@contextmanager
+def llm_user(user_id: str | None) -> Iterator[None]:
+    """Привязывает запросы к LLM внутри блока with к пользователю."""
+    token = _user_id.set(user_id)
+    try:
+        yield
+    finally:
+        _user_id.reset(token)
+
+
+def current_user() -> str | None:
+    return _user_id.get()
+
+
+@dataclass
+class CallRecord:
+    """Один запрос к провайдеру LLM."""
+
+    tag: str
+    model: str
+    endpoint: str
+    user_id: str | None
+    prompt_tokens: int
+    cached_tokens: int
+    completion_tokens: int
+    duration: float
+    ttft: float | None = None
+    status: str = "ok"
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами (накопительная, как в Prometheus)."""
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def merge(self, other: "Histogram") -> None:
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+        self.count += other.count
+
+    def quantile(self, q: float) -> float:
+        """Оценка q-квантиля сверху — граница корзины, куда он попадает."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def cumulative(self) -> Iterator[tuple[str, int]]:
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            yield f"{bound:g}", seen
+        yield "+Inf", self.count
+
+
+class LLMMetrics:
+    """Агрегаты по запросам к LLM в памяти процесса."""
+
+    def __init__(self) -> None:
+        # (tag, model, endpoint, status) -> число запросов
+        self.requests: Counter[tuple[str, str, str, str]] = Counter()
+        # (tag, model, endpoint, kind) -> токены; kind: prompt / cached / completion
+        self.tokens: Counter[tuple[str, str, str, str]] = Counter()
+        # (tag, endpoint) -> гистограмма
+        self.durations: defaultdict[tuple[str, str], Histogram] = defaultdict(
+            lambda: Histogram(_DURATION_BUCKETS),
+        )
+        self.ttft: defaultdict[tuple[str, str], Histogram] = defaultdict(
+            lambda: Histogram(_TTFT_BUCKETS),
+        )
+        # user_id -> prompt + completion токенов с последнего reset_users
+        self.user_tokens: Counter[str] = Counter()
+
+    def record(self, call: CallRecord) -> None:
+        labels = (call.tag, call.model, call.endpoint)
+        self.requests[(*labels, call.status)] += 1
+        self.tokens[(*labels, "prompt")] += call.prompt_tokens
+        self.tokens[(*labels, "cached")] += call.cached_tokens
+        self.tokens[(*labels, "completion")] += call.completion_tokens
+        self.durations[(call.tag, call.endpoint)].observe(call.duration)
+        if call.ttft is not None:
+            self.ttft[(call.tag, call.endpoint)].observe(call.ttft)
+        if call.user_id is not None:
+            if call.user_id not in self.user_tokens and len(self.user_tokens) >= _MAX_USERS:
+                self._compact_users()
+            self.user_tokens[call.user_id] += call.prompt_tokens + call.completion_tokens
+        logger.debug("LLM call %s", json.dumps(asdict(call), ensure_ascii=False))
+
+    def record_error(self, tag: str, error: BaseException) -> None:
+        """Запрос, который не дошёл до ответа ни на одном endpoint'е."""
+        self.requests[(tag, "", "", "error")] += 1
+        logger.debug("LLM call failed: tag=%s error=%s", tag, type(error).__name__)
+
+    def reset_users(self) -> None:
+        """Обнуляет расход по пользователям — начало нового интервала сводки."""
+        self.user_tokens.clear()
+
+    def _compact_users(self) -> None:
+        other = self.user_tokens.pop(_OTHER_USERS, 0)
+        top = self.user_tokens.most_common(_MAX_USERS // 2)
+        other += sum(self.user_tokens.values()) - sum(value for _, value in top)
+        self.user_tokens = Counter(dict(top))
+        self.user_tokens[_OTHER_USERS] = other
+
+    def token_totals(self) -> dict:
+        """Суммарный расход токенов и доля prompt-токенов из кэша провайдера."""
+        totals = Counter()
+        for (*_, kind), value in self.tokens.items():
+            totals[kind] += value
+        prompt = totals["prompt"]
+        return {
+            "requests": sum(self.requests.values()),
+            "prompt": prompt,
+            "cached": totals["cached"],
+            "completion": totals["completion"],
+            "cached_ratio": round(totals["cached"] / prompt, 3) if prompt else 0.0,
+        }
+
+    def summary(self) -> dict:
+        """Сводка по тегам: запросы, ошибки, токены, p50/p95 задержки."""
+        by_tag: dict[str, dict] = defaultdict(lambda: Counter())
+        for (tag, _, _, status), count in self.requests.items():
+            by_tag[tag]["requests"] += count
+            if status != "ok":
+                by_tag[tag][status] += count
+        for (tag, _, _, kind), value in self.tokens.items():
+            by_tag[tag][f"{kind}_tokens"] += value
+
+        result: dict[str, dict] = {}
+        for tag, counters in sorted(by_tag.items()):
+            durations = Histogram(_DURATION_BUCKETS)
+            for (hist_tag, _), histogram in self.durations.items():
+                if hist_tag == tag:
+                    durations.merge(histogram)
+            result[tag] = {
+                **counters,
+                "p50": durations.quantile(0.5),
+                "p95": durations.quantile(0.95),
+            }
+        return {
+            "tags": result,
+            "top_users": self.user_tokens.most_common(_TOP_USERS),
+        }
+
+    def render_prometheus(self) -> str:
+        """Все метрики в текстовом формате Prometheus."""
+        lines = [
+            "# HELP llm_requests_total Запросы к LLM.",
+            "# TYPE llm_requests_total counter",
+        ]
+        for (tag, model, endpoint, status), count in sorted(self.requests.items()):
+            labels = _labels(tag=tag, model=model, endpoint=endpoint, status=status)
+            lines.append(f"llm_requests_total{labels} {count}")
+
+        lines += [
+            "# HELP llm_tokens_total Токены запросов к LLM (cached — часть prompt).",
+            "# TYPE llm_tokens_total counter",
+        ]
+        for (tag, model, endpoint, kind), value in sorted(self.tokens.items()):
+            labels = _labels(tag=tag, model=model, endpoint=endpoint, kind=kind)
+            lines.append(f"llm_tokens_total{labels} {value}")
+
+        for name, help_text, histograms in (
+            ("llm_request_duration_seconds", "Полное время запроса к LLM.", self.durations),
+            ("llm_time_to_first_token_seconds", "Время до первого токена.", self.ttft),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (tag, endpoint), histogram in sorted(histograms.items()):
+                for bound, count in histogram.cumulative():
+                    labels = _labels(tag=tag, endpoint=endpoint, le=bound)
+                    lines.append(f"{name}_bucket{labels} {count}")
+                labels = _labels(tag=tag, endpoint=endpoint)
+                lines.append(f"{name}_sum{labels} {histogram.total:.3f}")
+                lines.append(f"{name}_count{labels} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+async def run_summary_log(metrics: LLMMetrics, interval: float) -> None:
+    """Раз в interval секунд пишет сводку метрик LLM в лог (если были запросы).
+
+    top_users в сводке — за прошедший интервал: расход по пользователям
+    обнуляется после каждой сводки.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        if metrics.requests:
+            logger.info("LLM metrics: %s", json.dumps(metrics.summary(), ensure_ascii=False))
+        metrics.reset_users()
+
+
+async def start_metrics_server(metrics: LLMMetrics, port: int) -> web.AppRunner:
+    """Поднимает HTTP-сервер с /metrics для Prometheus. Возвращает runner для cleanup()."""
+    async def handle(request: web.Request) -> web.Response:
+        return web.Response(text=metrics.render_prometheus(), content_type="text/plain")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, port=port).start()
+    logger.info("Metrics server listening on :%d/metrics", port)
+    return runner
+
+
+_metrics: LLMMetrics | None = None
+
+
+def get_llm_metrics() -> LLMMetrics:
+    """Возвращает singleton метрик LLM."""
+    global _metrics
+    if _metrics is None:
+        _metrics = LLMMetrics()
+    return _metrics
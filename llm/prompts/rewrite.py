@@ -4,6 +4,21 @@
 было уникальным и не выглядело как спам.
 """
 
+# Неизменный system-промпт — общий префикс всех запросов рерайта
+_SYSTEM_PROMPT = (
+    "Ты — копирайтер-рерайтер. Твоя задача — переписать текст так, "
+    "чтобы он сохранил смысл и посыл, но отличался по формулировкам.\n\n"
+    "ПРАВИЛА:\n"
+    "1. Сохрани основной смысл и призыв к действию.\n"
+    "2. Измени порядок предложений, замени синонимами, перефразируй.\n"
+    "3. Сохрани длину — не делай текст значительно длиннее или короче.\n"
+    "4. Сохрани тон и стиль оригинала.\n"
+    "5. НЕ добавляй новую информацию, которой нет в оригинале.\n"
+    "6. НЕ удаляй ключевую информацию (контакты, навыки, предложение).\n"
+    "7. Результат должен выглядеть как новое сообщение, а не как правка старого.\n"
+    "8. Отвечай ТОЛЬКО текстом переписанного сообщения, без пояснений."
+)
+
 
 def build_prompt(
     original_text: str,
@@ -18,19 +33,7 @@ def build_prompt(
     Returns:
         (system_prompt, user_prompt)
     """
-    system_prompt = (
-        "Ты — копирайтер-рерайтер. Твоя задача — переписать текст так, "
-        "чтобы он сохранил смысл и посыл, но отличался по формулировкам.\n\n"
-        "ПРАВИЛА:\n"
-        "1. Сохрани основной смысл и призыв к действию.\n"
-        "2. Измени порядок предложений, замени синонимами, перефразируй.\n"
-        "3. Сохрани длину — не делай текст значительно длиннее или короче.\n"
-        "4. Сохрани тон и стиль оригинала.\n"
-        "5. НЕ добавляй новую информацию, которой нет в оригинале.\n"
-        "6. НЕ удаляй ключевую информацию (контакты, навыки, предложение).\n"
-        "7. Результат должен выглядеть как новое сообщение, а не как правка старого.\n"
-        "8. Отвечай ТОЛЬКО текстом переписанного сообщения, без пояснений."
-    )
+    system_prompt = _SYSTEM_PROMPT
 
     user_parts = [
         "ОРИГИНАЛЬНЫЙ ТЕКСТ:",
@@ -1,9 +1,61 @@
 """Промпт для классификации сообщения как вакансии.
 
 Определяет, является ли сообщение из канала вакансией,
-и извлекает структурированные данные.
+и извлекает структурированные данные. build_batch_prompt
+классифицирует сразу несколько пронумерованных сообщений за один запрос.
 """
 
+_RULES = (
+    "ПРАВИЛА КЛАССИФИКАЦИИ:\n"
+    "1. Вакансия — это сообщение, где ИЩУТ исполнителя (фрилансера, подрядчика, специалиста).\n"
+    "2. НЕ вакансия: реклама, новости, обсуждения, предложения услуг "
+    "(кто-то ПРЕДЛАГАЕТ свои услуги).\n"
+    "3. НЕ вакансия: сообщения про вакансии в штат (нужна полная занятость, офис).\n"
+    "4. Учитывай ключевые слова пользователя — если вакансия совпадает по тематике, "
+    "она более релевантна.\n\n"
+)
+
+_FIELDS = (
+    '"is_vacancy": true/false, "title": "краткое название задачи", '
+    '"budget": "бюджет если указан или null", "skills": ["навык1", "навык2"], '
+    '"work_format": "oneoff/project/permanent или null", "relevance_score": 0.0-1.0'
+)
+
+_FIELDS_NOTES = (
+    "Поле relevance_score: 0.0 — совсем не подходит, 1.0 — идеально подходит "
+    "под ключевые слова пользователя.\n"
+    "Поле work_format: oneoff — разовая задача, project — проект на несколько недель, "
+    "permanent — постоянное сотрудничество; null — если непонятно.\n"
+    "Если is_vacancy = false, остальные поля заполни null/пустыми.\n"
+)
+
+# System-промпты не зависят от запроса — собираются один раз на процесс
+_SYSTEM_PROMPT = (
+    "Ты — классификатор вакансий для фрилансеров. "
+    "Твоя задача — определить, является ли сообщение из Telegram-канала вакансией "
+    "или предложением о работе для фрилансера.\n\n"
+    + _RULES
+    + "ФОРМАТ ОТВЕТА — строго JSON без markdown-обёртки:\n"
+    "{" + _FIELDS + "}\n\n"
+    + _FIELDS_NOTES
+    + "Отвечай ТОЛЬКО JSON, без пояснений."
+)
+
+
+_BATCH_SYSTEM_PROMPT = (
+    "Ты — классификатор вакансий для фрилансеров. "
+    "Тебе приходит несколько пронумерованных сообщений из Telegram-каналов. "
+    "Для КАЖДОГО определи, является ли оно вакансией "
+    "или предложением о работе для фрилансера.\n\n"
+    + _RULES
+    + "ФОРМАТ ОТВЕТА — строго JSON-массив без markdown-обёртки, "
+    "по одному объекту на каждое сообщение, в том же порядке:\n"
+    '[{"id": номер сообщения, ' + _FIELDS + "}, ...]\n\n"
+    + _FIELDS_NOTES
+    + "Сообщения независимы — не переноси данные из одного в другое.\n"
+    "Отвечай ТОЛЬКО JSON, без пояснений."
+)
+
 
 def build_prompt(
     message_text: str,
@@ -18,25 +70,7 @@ def build_prompt(
     Returns:
         (system_prompt, user_prompt)
     """
-    system_prompt = (
-        "Ты — классификатор вакансий для фрилансеров. "
-        "Твоя задача — определить, является ли сообщение из Telegram-канала вакансией "
-        "или предложением о работе для фрилансера.\n\n"
-        "ПРАВИЛА КЛАССИФИКАЦИИ:\n"
-        "1. Вакансия — это сообщение, где ИЩУТ исполнителя (фрилансера, подрядчика, специалиста).\n"
-        "2. НЕ вакансия: реклама, новости, обсуждения, предложения услуг (кто-то ПРЕДЛАГАЕТ свои услуги).\n"
-        "3. НЕ вакансия: сообщения про вакансии в штат (нужна полная занятость, офис).\n"
-        "4. Учитывай ключевые слова пользователя — если вакансия совпадает по тематике, "
-        "она более релевантна.\n\n"
-        "ФОРМАТ ОТВЕТА — строго JSON без markdown-обёртки:\n"
-        '{"is_vacancy": true/false, "title": "краткое название задачи", '
-        '"budget": "бюджет если указан или null", "skills": ["навык1", "навык2"], '
-        '"relevance_score": 0.0-1.0}\n\n'
-        "Поле relevance_score: 0.0 — совсем не подходит, 1.0 — идеально подходит "
-        "под ключевые слова пользователя.\n"
-        "Если is_vacancy = false, остальные поля заполни null/пустыми.\n"
-        "Отвечай ТОЛЬКО JSON, без пояснений."
-    )
+    system_prompt = _SYSTEM_PROMPT
 
     keywords_str = ", ".join(user_keywords) if user_keywords else "не заданы"
 
@@ -46,3 +80,34 @@ def build_prompt(
     )
 
     return system_prompt, user_prompt
+
+
+def build_batch_prompt(
+    messages: list[str],
+    user_keywords: list[str],
+) -> tuple[str, str]:
+    """Строит system + user промпт для классификации пачки сообщений.
+
+    Сообщения нумеруются с 1, в ответе ожидается JSON-массив объектов
+    с полем id — номером сообщения.
+
+    Args:
+        messages: тексты сообщений из каналов
+        user_keywords: ключевые слова из профиля поиска пользователя
+
+    Returns:
+        (system_prompt, user_prompt)
+    """
+    system_prompt = _BATCH_SYSTEM_PROMPT
+
+    keywords_str = ", ".join(user_keywords) if user_keywords else "не заданы"
+
+    items = "\n\n".join(
+        f"=== СООБЩЕНИЕ {i} ===\n{text.strip()}" for i, text in enumerate(messages, start=1)
+    )
+    user_prompt = (
+        f"Ключевые слова пользователя: {keywords_str}\n\n"
+        f"СООБЩЕНИЙ: {len(messages)}\n\n{items}"
+    )
+
+    return system_prompt, user_prompt
@@ -0,0 +1,231 @@
+"""Устойчивость запросов к LLM: лимиты, повторы и предохранитель.
+
+- RateLimiter — token bucket на запросы в минуту и токены в минуту.
+  Ожидающие обслуживаются по приоритету: интерактивные запросы
+  («Составить текст») раньше фоновых (классификация вакансий).
+- RetryPolicy — повтор при 429 / таймауте / обрыве / 5xx с экспоненциальной
+  задержкой и джиттером; Retry-After от провайдера имеет приоритет.
+- CircuitBreaker — после серии неудач подряд запросы какое-то время сразу
+  отклоняются, чтобы не держать пользователей в ожидании заведомо
+  неработающего провайдера; затем пропускается один пробный запрос.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+
+logger = logging.getLogger(__name__)
+
+# Приоритеты запросов: меньше — раньше
+INTERACTIVE = 0
+BACKGROUND = 1
+
+_priority: ContextVar[int] = ContextVar("llm_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def llm_priority(priority: int) -> Iterator[None]:
+    """Задаёт приоритет всех запросов к LLM внутри блока with."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+class CircuitOpenError(RuntimeError):
+    """Провайдер LLM временно считается недоступным."""
+
+    def __init__(self) -> None:
+        super().__init__("ИИ временно недоступен. Попробуй через минуту.")
+
+
+class _Bucket:
+    """Token bucket: capacity единиц, пополнение capacity за минуту."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def delay(self, amount: float) -> float:
+        """Сколько ждать, пока в корзине наберётся amount."""
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+
+class RateLimiter:
+    """Лимит запросов и токенов в минуту с очередью по приоритету.
+
+    rpm или tpm = 0 — соответствующий лимит выключен.
+    """
+
+    def __init__(self, rpm: float = 0, tpm: float = 0) -> None:
+        self._requests = _Bucket(rpm) if rpm > 0 else None
+        self._tokens = _Bucket(tpm) if tpm > 0 else None
+        # Куча ожидающих: [приоритет, порядковый номер]
+        self._queue: list[list[int]] = []
+        self._seq = itertools.count()
+        self._turn = asyncio.Event()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._queue)
+
+    async def acquire(self, tokens: int, priority: int = INTERACTIVE) -> None:
+        """Ждёт своей очереди и свободной ёмкости, затем списывает запрос и tokens."""
+        if self._requests is None and self._tokens is None:
+            return
+
+        entry = [priority, next(self._seq)]
+        heapq.heappush(self._queue, entry)
+        try:
+            while True:
+                if self._queue[0] is not entry:
+                    self._turn.clear()
+                    await self._turn.wait()
+                    continue
+
+                delay = self._delay(tokens)
+                if delay <= 0:
+                    self._consume(tokens)
+                    return
+                await asyncio.sleep(delay)
+        finally:
+            self._queue.remove(entry)
+            heapq.heapify(self._queue)
+            self._turn.set()
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Возвращает в корзину разницу между оценкой и фактическим расходом токенов."""
+        if self._tokens is not None and actual < estimated:
+            self._tokens.level = min(self._tokens.capacity, self._tokens.level + estimated - actual)
+
+    def _delay(self, tokens: int) -> float:
+        now = time.monotonic()
+        delay = 0.0
+        for bucket, amount in ((self._requests, 1), (self._tokens, tokens)):
+            if bucket is not None:
+                bucket.refill(now)
+                delay = max(delay, bucket.delay(amount))
+        return delay
+
+    def _consume(self, tokens: int) -> None:
+        if self._requests is not None:
+            self._requests.level -= 1
+        if self._tokens is not None:
+            self._tokens.level -= min(tokens, self._tokens.capacity)
+
+
+class RetryPolicy:
+    """Повторы с экспоненциальной задержкой (full jitter) и учётом Retry-After."""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 1.0,
+                 max_delay: float = 30.0) -> None:
+        self.max_attempts = max_attempts
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+
+    @staticmethod
+    def is_retryable(exc: BaseException) -> bool:
+        if isinstance(exc, (RateLimitError, APITimeoutError, APIConnectionError)):
+            return True
+        return isinstance(exc, APIStatusError) and exc.status_code >= 500
+
+    def delay(self, attempt: int, exc: BaseException) -> float:
+        """Пауза перед попыткой attempt + 1 (attempt считается с 1)."""
+        retry_after = self._retry_after(exc)
+        if retry_after is not None:
+            return min(retry_after, self._max_delay)
+        return random.uniform(0, min(self._max_delay, self._base_delay * 2 ** (attempt - 1)))
+
+    @staticmethod
+    def _retry_after(exc: BaseException) -> float | None:
+        response = getattr(exc, "response", None)
+        if response is None:
+            return None
+        headers = response.headers
+        try:
+            if "retry-after-ms" in headers:
+                return float(headers["retry-after-ms"]) / 1000
+            if "retry-after" in headers:
+                return float(headers["retry-after"])
+        except ValueError:
+            pass
+        return None
+
+
+class CircuitBreaker:
+    """Размыкается после failure_threshold неудач подряд на reset_timeout секунд."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self._threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self._reset_timeout:
+            return "open"
+        return "half_open"
+
+    def before_call(self) -> bool:
+        """CircuitOpenError, если запрос сейчас пускать нельзя.
+
+        Returns:
+            True, если запрос пробный: вызывающий обязан затем вызвать
+            release_probe (в finally), чем бы запрос ни закончился
+        """
+        state = self.state
+        if state == "open" or (state == "half_open" and self._probe_in_flight):
+            raise CircuitOpenError()
+        if state == "half_open":
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """Снимает отметку пробного запроса.
+
+        Нужна, когда проба закончилась без вердикта — отменена (хеджирование,
+        таймаут, пользователь) или упала с ошибкой, которая ничего не говорит
+        о доступности провайдера (400, слишком длинный контекст). Иначе
+        предохранитель навсегда остался бы в half_open с «висящей» пробой.
+        """
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info("LLM circuit closed")
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_in_flight = False
+        if self._opened_at is not None or self._failures >= self._threshold:
+            if self._opened_at is None:
+                logger.warning("LLM circuit opened after %d failures", self._failures)
+            self._opened_at = time.monotonic()
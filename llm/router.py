@@ -0,0 +1,295 @@
+"""Маршрутизация запросов LLM между несколькими OpenAI-совместимыми провайдерами.
+
+Каждый endpoint — свой base_url, ключ, модель, лимиты и предохранитель.
+Для каждого копится скользящая статистика: p50/p95 задержки и доля ошибок.
+
+- Запрос уходит на самый здоровый endpoint из подходящих задаче
+  (см. llm_task: например, дешёвая модель для classify, сильная для compose).
+- Если ответ не пришёл за hedge_after секунд (или за p95 endpoint'а,
+  если он больше), тот же запрос дублируется на следующий endpoint —
+  берётся первый успешный ответ, второй отменяется.
+- При ошибке endpoint'а запрос переходит к следующему.
+
+Один endpoint (по умолчанию — LLM_BASE_URL / LLM_MODEL) работает как раньше.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+from openai import AsyncOpenAI
+
+from bot.config import settings
+from llm.resilience import CircuitBreaker, CircuitOpenError, RateLimiter, RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+_task: ContextVar[str] = ContextVar("llm_task", default="default")
+
+
+@contextmanager
+def llm_task(task: str) -> Iterator[None]:
+    """Задаёт тип задачи (compose, classify, ...) для выбора endpoint'а внутри блока with."""
+    token = _task.set(task)
+    try:
+        yield
+    finally:
+        _task.reset(token)
+
+
+def current_task() -> str:
+    return _task.get()
+
+
+class LatencyStats:
+    """Скользящее окно последних запросов (по числу и по времени): задержки и ошибки.
+
+    Старые записи забываются, поэтому endpoint, который когда-то сбоил,
+    со временем снова становится первым кандидатом.
+    """
+
+    def __init__(self, window: int = 100, max_age: float = 300.0) -> None:
+        self._max_age = max_age
+        # (время, задержка, успех)
+        self._samples: deque[tuple[float, float, bool]] = deque(maxlen=window)
+
+    def record(self, latency: float, ok: bool) -> None:
+        self._samples.append((time.monotonic(), latency, ok))
+
+    def percentile(self, q: float) -> float:
+        """q-квантиль задержки успешных запросов (0.0, если данных нет)."""
+        ordered = sorted(latency for _, latency, ok in self._recent() if ok)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    @property
+    def error_rate(self) -> float:
+        samples = self._recent()
+        return sum(not ok for _, _, ok in samples) / len(samples) if samples else 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "p50": round(self.percentile(0.5), 2),
+            "p95": round(self.percentile(0.95), 2),
+            "error_rate": round(self.error_rate, 3),
+            "samples": len(self._recent()),
+        }
+
+    def _recent(self) -> list[tuple[float, float, bool]]:
+        deadline = time.monotonic() - self._max_age
+        while self._samples and self._samples[0][0] < deadline:
+            self._samples.popleft()
+        return list(self._samples)
+
+
+@dataclass
+class EndpointConfig:
+    """Настройки одного провайдера (элемент LLM_ENDPOINTS)."""
+
+    name: str
+    base_url: str
+    api_key: str
+    model: str
+    tasks: tuple[str, ...] = ()
+    rpm: int = 0
+    tpm: int = 0
+
+
+class Endpoint:
+    """Провайдер LLM со своим клиентом, лимитами, предохранителем и статистикой."""
+
+    def __init__(self, config: EndpointConfig) -> None:
+        self.name = config.name
+        self.model = config.model
+        self.tasks = frozenset(config.tasks)
+        self.client = AsyncOpenAI(
+            api_key=config.api_key,
+            base_url=config.base_url,
+            timeout=60.0,
+            # Повторы делает RetryPolicy — встроенные повторы SDK выключены
+            max_retries=0,
+        )
+        self.limiter = RateLimiter(rpm=config.rpm, tpm=config.tpm)
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.llm_breaker_threshold,
+            reset_timeout=settings.llm_breaker_reset,
+        )
+        self.stats = LatencyStats()
+
+    def serves(self, task: str) -> bool:
+        return not self.tasks or task in self.tasks
+
+
+class EndpointRouter:
+    """Выбор endpoint'а по здоровью, хеджирование медленных и переход при ошибке."""
+
+    def __init__(self, endpoints: list[Endpoint], hedge_after: float = 0.0,
+                 max_attempts: int = 3) -> None:
+        if not endpoints:
+            raise ValueError("Нужен хотя бы один LLM endpoint")
+        self._endpoints = endpoints
+        self._hedge_after = hedge_after
+        self._retry = RetryPolicy(max_attempts=max_attempts)
+
+    def candidates(self, task: str) -> list[Endpoint]:
+        """Endpoint'ы задачи, от самого здорового; с разомкнутым предохранителем — в конце."""
+        matching = [ep for ep in self._endpoints if ep.serves(task)] or self._endpoints
+        return sorted(
+            matching,
+            key=lambda ep: (
+                ep.breaker.state == "open",
+                round(ep.stats.error_rate, 1),
+                ep.stats.percentile(0.5),
+            ),
+        )
+
+    async def create(self, params: dict, estimated: int, priority: int,
+                     task: str) -> tuple[Endpoint, Any]:
+        """chat.completions.create на лучшем endpoint'е задачи с хеджированием и fallback.
+
+        Возвращает (endpoint, который ответил; ответ).
+        """
+        endpoints = self.candidates(task)
+        if params.get("stream") or self._hedge_after <= 0 or len(endpoints) == 1:
+            return await self._failover(endpoints, params, estimated, priority)
+        return await self._hedged(endpoints, params, estimated, priority)
+
+    def stats(self) -> dict:
+        return {
+            ep.name: {**ep.stats.snapshot(), "circuit": ep.breaker.state}
+            for ep in self._endpoints
+        }
+
+    async def _failover(self, endpoints: list[Endpoint], params: dict, estimated: int,
+                        priority: int) -> tuple[Endpoint, Any]:
+        """Пробует endpoint'ы по очереди, пока один не ответит."""
+        last_error: BaseException | None = None
+        for i, endpoint in enumerate(endpoints):
+            # Все попытки — только у последнего; остальным одна, дальше — следующий endpoint
+            attempts = self._retry.max_attempts if i == len(endpoints) - 1 else 1
+            try:
+                return await self._call(endpoint, params, estimated, priority, attempts)
+            except Exception as e:
+                if not (self._retry.is_retryable(e) or isinstance(e, CircuitOpenError)):
+                    raise
+                last_error = e
+                if i < len(endpoints) - 1:
+                    logger.warning("LLM endpoint %s failed (%s), trying next",
+                                   endpoint.name, type(e).__name__)
+        assert last_error is not None
+        raise last_error
+
+    async def _hedged(self, endpoints: list[Endpoint], params: dict, estimated: int,
+                      priority: int) -> tuple[Endpoint, Any]:
+        """Основной запрос; если он медлит — дублирующий на остальные endpoint'ы."""
+        primary, rest = endpoints[0], endpoints[1:]
+        first = asyncio.create_task(
+            self._call(primary, params, estimated, priority, attempts=1),
+        )
+        hedge_after = max(self._hedge_after, primary.stats.percentile(0.95))
+        done, _ = await asyncio.wait({first}, timeout=hedge_after)
+
+        if done:
+            error = first.exception()
+            if error is None:
+                return first.result()
+            if not (self._retry.is_retryable(error) or isinstance(error, CircuitOpenError)):
+                raise error
+
+        second = asyncio.create_task(self._failover(rest, params, estimated, priority))
+        if not done:
+            logger.info("LLM endpoint %s slow (>%.1fs), hedging", primary.name, hedge_after)
+        pending = {first, second} if not done else {second}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.exception():
+                        return task.result()
+            # Оба упали — отдаём ошибку резервного пути
+            return second.result()
+        finally:
+            for task in (first, second):
+                task.cancel()
+
+    async def _call(self, endpoint: Endpoint, params: dict, estimated: int, priority: int,
+                    attempts: int) -> tuple[Endpoint, Any]:
+        """Запрос к одному endpoint'у через его лимитер и предохранитель, с повторами."""
+        attempt = 0
+        while True:
+            attempt += 1
+            probe = endpoint.breaker.before_call()
+            try:
+                return await self._attempt(endpoint, params, estimated, priority)
+            except Exception as e:
+                if not self._retry.is_retryable(e) or attempt >= attempts:
+                    raise
+                delay = self._retry.delay(attempt, e)
+                logger.warning(
+                    "LLM request to %s failed (%s), retry %d/%d in %.1fs",
+                    endpoint.name, type(e).__name__, attempt, attempts - 1, delay,
+                )
+            finally:
+                # Проба, закончившаяся отменой или не-сетевой ошибкой, не должна
+                # оставлять предохранитель в half_open навсегда
+                if probe:
+                    endpoint.breaker.release_probe()
+            await asyncio.sleep(delay)
+
+    async def _attempt(self, endpoint: Endpoint, params: dict, estimated: int,
+                       priority: int) -> tuple[Endpoint, Any]:
+        """Одна попытка: лимитер, запрос, статистика и вердикт предохранителю."""
+        await endpoint.limiter.acquire(estimated, priority)
+        started = time.monotonic()
+        # Отменённая попытка (проиграла хеджирование) в статистику не пишется:
+        # она не успешна и её задержка неизвестна — иначе исказились бы p50/p95,
+        # по которым само хеджирование и выбирает порог
+        try:
+            response = await endpoint.client.chat.completions.create(
+                model=endpoint.model, **params,
+            )
+        except Exception as e:
+            if self._retry.is_retryable(e):
+                endpoint.stats.record(time.monotonic() - started, ok=False)
+                endpoint.breaker.record_failure()
+            raise
+
+        endpoint.stats.record(time.monotonic() - started, ok=True)
+        endpoint.breaker.record_success()
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            endpoint.limiter.settle(estimated, usage.total_tokens)
+        return endpoint, response
+
+
+def load_endpoint_configs() -> list[EndpointConfig]:
+    """Endpoint'ы из LLM_ENDPOINTS (JSON-список) или один — из LLM_BASE_URL / LLM_MODEL."""
+    if not settings.llm_endpoints:
+        return [EndpointConfig(
+            name="default",
+            base_url=settings.llm_base_url,
+            api_key=settings.llm_api_key,
+            model=settings.llm_model,
+            rpm=settings.llm_rpm,
+            tpm=settings.llm_tpm,
+        )]
+
+    configs = []
+    for i, item in enumerate(json.loads(settings.llm_endpoints)):
+        configs.append(EndpointConfig(
+            name=item.get("name") or f"endpoint{i + 1}",
+            base_url=item.get("base_url") or settings.llm_base_url,
+            api_key=item.get("api_key") or settings.llm_api_key,
+            model=item.get("model") or settings.llm_model,
+            tasks=tuple(item.get("tasks") or ()),
+            rpm=int(item.get("rpm", 0)),
+            tpm=int(item.get("tpm", 0)),
+        ))
+    return configs
@@ -0,0 +1,24 @@
+"""Грубая оценка числа токенов без токенизатора.
+
+Точный подсчёт зависит от модели и провайдера. Для нарезки запросов
+по бюджету хватает консервативной оценки: кириллица в BPE-токенизаторах
+занимает заметно больше токенов на символ, чем латиница.
+"""
+
+# Символов на токен (с запасом): латиница ~4, кириллица ~2.5
+_CHARS_PER_TOKEN_LATIN = 4.0
+_CHARS_PER_TOKEN_CYRILLIC = 2.5
+
+
+def estimate_tokens(text: str) -> int:
+    """Оценка сверху числа токенов в тексте."""
+    if not text:
+        return 0
+    cyrillic = sum(1 for ch in text if "Ѐ" <= ch <= "ӿ")
+    other = len(text) - cyrillic
+    return int(cyrillic / _CHARS_PER_TOKEN_CYRILLIC + other / _CHARS_PER_TOKEN_LATIN) + 1
+
+
+def estimate_messages_tokens(messages: list[dict]) -> int:
+    """Оценка для списка сообщений чата (+ служебные токены на сообщение)."""
+    return sum(estimate_tokens(m.get("content") or "") + 4 for m in messages)
@@ -0,0 +1,9 @@
+-- Миграция 005: уникальный индекс channels.username
+-- Нужен для bulk upsert каналов по username (ON CONFLICT (username)).
+-- NULL-значения (каналы, добавленные по telegram_id) индексу не мешают.
+--
+-- Перед применением проверить, что дублей нет:
+--   SELECT username, count(*) FROM channels
+--   WHERE username IS NOT NULL GROUP BY username HAVING count(*) > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_channels_username ON channels(username);
@@ -0,0 +1,13 @@
+-- Миграция 006: почти одинаковые сообщения каналов
+-- simhash — 64-битный отпечаток нормализованного текста (parsers/simhash.py).
+-- canonical_id — сообщение, копией которого является это; классификация
+-- делается один раз для оригинала и переносится на копии.
+
+ALTER TABLE channel_messages ADD COLUMN IF NOT EXISTS simhash BIGINT;
+ALTER TABLE channel_messages
+    ADD COLUMN IF NOT EXISTS canonical_id UUID REFERENCES channel_messages(id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS idx_channel_messages_canonical_id
+    ON channel_messages(canonical_id) WHERE canonical_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_channel_messages_simhash_date
+    ON channel_messages(date DESC) WHERE simhash IS NOT NULL;
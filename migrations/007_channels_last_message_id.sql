@@ -0,0 +1,5 @@
+-- Миграция 007: channels.last_message_id
+-- Последний загруженный telegram_message_id канала: при обходе каналов
+-- скачиваются только посты новее него (t.me/s/<username>?after=<id>).
+
+ALTER TABLE channels ADD COLUMN IF NOT EXISTS last_message_id BIGINT;
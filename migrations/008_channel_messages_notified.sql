@@ -0,0 +1,13 @@
+-- Миграция 008: channel_messages.notified_at
+-- Когда фоновый мониторинг разослал вакансию подписчикам. Прогресс рассылки
+-- хранится отдельно от классификации (is_vacancy): вакансию, которую уже
+-- разобрал ручной поиск, мониторинг всё равно разошлёт.
+
+ALTER TABLE channel_messages ADD COLUMN IF NOT EXISTS notified_at TIMESTAMPTZ;
+
+-- Уже разобранные до миграции сообщения не рассылаются задним числом
+UPDATE channel_messages SET notified_at = now()
+    WHERE is_vacancy IS NOT NULL AND notified_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_channel_messages_unnotified
+    ON channel_messages(date) WHERE is_vacancy = true AND notified_at IS NULL;
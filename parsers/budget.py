@@ -0,0 +1,35 @@
+"""Разбор бюджета вакансии из свободного текста.
+
+Классификатор возвращает бюджет строкой как в посте: «от 30 000 ₽»,
+«40-60к», «до 100 тыс. руб». Для сравнения с min_budget профиля нужна
+сумма в рублях — берётся наибольшее число («40-60к» подходит тому,
+кто ищет от 50к). Бюджет в другой валюте считается неизвестным.
+"""
+
+import re
+
+# Разделители разрядов: пробел, неразрывный и узкий неразрывный
+_SPACES = re.compile(r"[\u00a0\u202f ]")
+_NUMBER = re.compile(
+    r"(?<![\d.,])(\d+(?:[\u00a0\u202f ]\d{3})*(?:[.,]\d+)?)(?!\d|[.,]\d)"
+    r"(?:\s*(к|k|тыс|тысяч|т\.р|млн|миллион)(?![a-zа-яё]))?",
+    re.IGNORECASE,
+)
+_FOREIGN = re.compile(r"[$€£]|\b(?:usd|eur|usdt|долл\w*|евро)\b", re.IGNORECASE)
+_MULTIPLIERS = {"к": 1_000, "k": 1_000, "т": 1_000, "м": 1_000_000}
+
+
+def parse_budget(text: str | int | float | None) -> int | None:
+    """Наибольшая сумма из текста бюджета в рублях (None — не указана или не в рублях)."""
+    if isinstance(text, (int, float)):
+        # LLM иногда отдаёт бюджет числом
+        return int(text)
+    if not text or _FOREIGN.search(text):
+        return None
+    amounts = []
+    for number, suffix in _NUMBER.findall(text):
+        value = float(_SPACES.sub("", number).replace(",", "."))
+        if suffix:
+            value *= _MULTIPLIERS[suffix[0].lower()]
+        amounts.append(int(value))
+    return max(amounts) if amounts else None
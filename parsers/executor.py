@@ -0,0 +1,150 @@
+"""Выделенный пул потоков и ограничитель параллелизма для парсеров.
+
+DDG и tgstat — синхронные библиотеки, поэтому запросы к ним уходят в потоки.
+Раньше они делили дефолтный executor event loop со всем остальным; теперь
+у парсеров свой пул фиксированного размера, а семафоры ограничивают число
+одновременных запросов глобально и на одного пользователя. Очередь ожидания
+и время ожидания видны в stats().
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from bot.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Ожидание дольше этого порога логируется — признак насыщения пула
+_SLOW_WAIT_SECONDS = 1.0
+
+
+class ParserExecutor:
+    """Пул потоков для I/O парсеров с глобальным и пользовательским лимитом."""
+
+    def __init__(self, max_workers: int = 8, max_in_flight: int = 8, per_user: int = 2) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="parser")
+        self._global = asyncio.Semaphore(max_in_flight)
+        self._per_user_limit = per_user
+        # user_id -> [семафор, число держателей и ожидающих]
+        self._user_slots: dict[str, list] = {}
+
+        self._waiting = 0
+        self._in_flight = 0
+        self._calls = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    async def run(self, fn: Callable[..., T], *args: Any, user_id: str | None = None) -> T:
+        """Выполняет fn(*args) в пуле парсеров, соблюдая лимиты параллелизма.
+
+        Слот освобождается, когда завершился поток, а не ожидающая корутина:
+        поток отменить нельзя, и после отмены вызова (режим «first» поиска
+        каналов) он продолжает занимать пул.
+        """
+        started = time.monotonic()
+        self._waiting += 1
+        try:
+            slot = await self._acquire(user_id)
+        finally:
+            self._waiting -= 1
+        self._record_wait(time.monotonic() - started)
+
+        self._in_flight += 1
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._pool.submit(fn, *args)
+        except BaseException:
+            self._release(user_id, slot)
+            raise
+        future.add_done_callback(
+            lambda _: _call_soon(loop, self._release, user_id, slot),
+        )
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        """Метрики насыщения: глубина очереди, занятость и время ожидания."""
+        return {
+            "waiting": self._waiting,
+            "in_flight": self._in_flight,
+            "calls": self._calls,
+            "wait_avg": self._wait_total / self._calls if self._calls else 0.0,
+            "wait_max": self._wait_max,
+        }
+
+    def shutdown(self) -> None:
+        """Останавливает пул, не дожидаясь зависших запросов."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _record_wait(self, wait: float) -> None:
+        self._calls += 1
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
+        if wait > _SLOW_WAIT_SECONDS:
+            logger.info(
+                "Parser queue wait %.2fs (waiting=%d, in_flight=%d)",
+                wait, self._waiting, self._in_flight,
+            )
+
+    async def _acquire(self, user_id: str | None) -> list | None:
+        """Занимает слот пользователя, затем глобальный; возвращает слот пользователя."""
+        slot = None
+        if user_id is not None:
+            slot = self._user_slots.get(user_id)
+            if slot is None:
+                slot = [asyncio.Semaphore(self._per_user_limit), 0]
+                self._user_slots[user_id] = slot
+            slot[1] += 1
+            try:
+                await slot[0].acquire()
+            except BaseException:
+                self._drop_user_slot(user_id, slot)
+                raise
+        try:
+            await self._global.acquire()
+        except BaseException:
+            if slot is not None:
+                slot[0].release()
+                self._drop_user_slot(user_id, slot)
+            raise
+        return slot
+
+    def _release(self, user_id: str | None, slot: list | None) -> None:
+        self._in_flight -= 1
+        self._global.release()
+        if slot is not None:
+            slot[0].release()
+            self._drop_user_slot(user_id, slot)
+
+    def _drop_user_slot(self, user_id: str, slot: list) -> None:
+        """Семафор пользователя удаляется, когда его никто не держит и не ждёт."""
+        slot[1] -= 1
+        if slot[1] == 0:
+            del self._user_slots[user_id]
+
+
+def _call_soon(loop: asyncio.AbstractEventLoop, callback: Callable, *args: Any) -> None:
+    """Вызов в потоке event loop из потока пула; закрытый loop уже не важен."""
+    try:
+        loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:
+        pass
+
+
+_executor: ParserExecutor | None = None
+
+
+def get_parser_executor() -> ParserExecutor:
+    """Возвращает общий executor парсеров (singleton)."""
+    global _executor
+    if _executor is None:
+        _executor = ParserExecutor(
+            max_workers=settings.parser_workers,
+            max_in_flight=settings.parser_max_in_flight,
+            per_user=settings.parser_per_user,
+        )
+    return _executor
@@ -0,0 +1,175 @@
+"""Быстрый предфильтр постов по ключевым словам — первый слой перед LLM.
+
+Встроенные маркеры вакансий («ищу», «требуется», «бюджет», ...) и ключевые
+слова всех пользователей собираются в один индекс основ слов. Пост
+разбивается на слова один раз, каждое слово приводится к основе лёгким
+стеммером и ищется в индексе словарём — без отдельного regex на каждого
+пользователя. Фразы из нескольких слов («telegram бот») проверяются
+по следующим словам поста.
+
+Основа длиной от _PREFIX_MIN символов совпадает как префикс («дизайн» —
+«дизайнера», «дизайнерский»), короткие — только точно («бот» — «бота»,
+но не «ботаника»).
+"""
+
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import Iterable, Mapping
+
+# Владелец встроенных маркеров вакансий
+MARKERS = ""
+
+# Встроенные маркеры вакансии (PLAN 9.1) и маркеры из поиска каналов
+BUILTIN_MARKERS = (
+    "ищу", "ищем", "требуется", "требуются", "вакансия", "нужен", "нужна", "нужны",
+    "задача", "проект", "бюджет", "оплата", "фриланс", "заказ", "подработка",
+    "удаленно", "удаленка", "тз", "исполнитель", "подрядчик", "тендер", "аутсорс",
+    "freelance", "freelancer", "hiring", "hire", "job", "remote", "outsource",
+)
+
+# Основы не короче этого совпадают как префикс слова
+_PREFIX_MIN = 4
+_MIN_STEM = 2
+
+_WORD = re.compile(r"\w+")
+
+# Окончания для лёгкого стемминга
+_ENDINGS = frozenset(
+    {
+        # прилагательные и причастия
+        "ого", "его", "ому", "ему", "ыми", "ими", "ая", "яя", "ое", "ее", "ие", "ые",
+        "ой", "ей", "ий", "ый", "ую", "юю", "ых", "их", "ым", "им",
+        # существительные
+        "иями", "ями", "ами", "ией", "иях", "иям", "ием", "ах", "ях", "ам", "ям", "ом", "ем",
+        "ов", "ев", "ей", "ию", "ью", "ия", "ья", "ие", "ье", "ии",
+        "а", "я", "о", "е", "у", "ю", "ы", "и", "ь",
+        # глаголы
+        "ться", "тся", "ешь", "ете", "ет", "ем", "ют", "ут", "ит", "ат", "ят", "ишь",
+        "ите", "ать", "ять", "ить", "еть", "ал", "ала", "али", "ило", "ил", "ила", "или",
+        "ся", "сь", "ть",
+    },
+)
+# Длины окончаний — от длинных к коротким
+_ENDING_LENGTHS = sorted({len(ending) for ending in _ENDINGS}, reverse=True)
+
+
+def normalize_word(word: str) -> str:
+    return word.lower().replace("ё", "е")
+
+
+@lru_cache(maxsize=100_000)
+def stem(word: str) -> str:
+    """Основа русского слова: без самого длинного подходящего окончания.
+
+    У латиницы срезается только -s; слова, от которых осталось бы
+    меньше _MIN_STEM + 1 символов, не изменяются.
+    """
+    word = normalize_word(word)
+    if not ("а" <= word[-1:] <= "я"):
+        # Латиница: только множественное число (jobs -> job)
+        return word[:-1] if word.endswith("s") and len(word) > 3 else word
+    for length in _ENDING_LENGTHS:
+        if len(word) - length > _MIN_STEM and word[-length:] in _ENDINGS:
+            return word[:-length]
+    return word
+
+
+class KeywordFilter:
+    """Индекс ключевых слов нескольких владельцев (пользователей / профилей).
+
+    KeywordFilter(keywords) — как в PLAN 9.1: маркеры + слова одного пользователя.
+    KeywordFilter.for_owners({...}) — общий индекс для всех профилей:
+    match(text) за один проход возвращает всех, чьи слова нашлись в посте.
+    """
+
+    def __init__(self, keywords: Iterable[str] | None = None,
+                 markers: Iterable[str] = BUILTIN_MARKERS) -> None:
+        # основа первого слова -> [(основы остальных слов фразы, владелец)]
+        self._exact: defaultdict[str, list[tuple[tuple[str, ...], str]]] = defaultdict(list)
+        self._prefix: defaultdict[str, list[tuple[tuple[str, ...], str]]] = defaultdict(list)
+        self._max_prefix = _PREFIX_MIN
+        self._owners: dict[str, list[tuple[str, ...]]] = {}
+        self.add(MARKERS, markers)
+        if keywords is not None:
+            self.add("user", keywords)
+
+    @classmethod
+    def for_owners(cls, keyword_sets: Mapping[str, Iterable[str]],
+                   markers: Iterable[str] = BUILTIN_MARKERS) -> "KeywordFilter":
+        keyword_filter = cls(markers=markers)
+        for owner, keywords in keyword_sets.items():
+            keyword_filter.add(owner, keywords)
+        return keyword_filter
+
+    @property
+    def owners(self) -> set[str]:
+        return {owner for owner in self._owners if owner != MARKERS}
+
+    def add(self, owner: str, keywords: Iterable[str]) -> None:
+        """Добавляет ключевые слова владельца (к уже имеющимся)."""
+        terms = self._owners.setdefault(owner, [])
+        for keyword in keywords:
+            term = tuple(stem(word) for word in _WORD.findall(keyword))
+            if not term or term in terms:
+                continue
+            terms.append(term)
+            self._index_for(term[0]).setdefault(term[0], []).append((term[1:], owner))
+            if len(term[0]) >= _PREFIX_MIN:
+                self._max_prefix = max(self._max_prefix, len(term[0]))
+
+    def remove(self, owner: str) -> None:
+        """Убирает все ключевые слова владельца."""
+        for term in self._owners.pop(owner, []):
+            index = self._index_for(term[0])
+            entries = [entry for entry in index[term[0]] if entry[1] != owner]
+            if entries:
+                index[term[0]] = entries
+            else:
+                del index[term[0]]
+
+    def match(self, text: str) -> set[str]:
+        """Владельцы, чьи слова есть в тексте; MARKERS — если нашёлся маркер вакансии."""
+        words = [normalize_word(word) for word in _WORD.findall(text)]
+        stems: list[str] | None = None
+        found: set[str] = set()
+        for i, word in enumerate(words):
+            for rest, owner in self._lookup(word):
+                if owner in found:
+                    continue
+                if rest:
+                    if stems is None:
+                        stems = [stem(w) for w in words]
+                    if not self._phrase_matches(rest, words, stems, i + 1):
+                        continue
+                found.add(owner)
+        return found
+
+    def is_potential_vacancy(self, text: str) -> bool:
+        """Есть ли в тексте маркер вакансии или ключевое слово."""
+        return bool(self.match(text))
+
+    def _index_for(self, first: str) -> defaultdict:
+        return self._prefix if len(first) >= _PREFIX_MIN else self._exact
+
+    def _lookup(self, word: str) -> Iterable[tuple[tuple[str, ...], str]]:
+        entries = self._exact.get(stem(word))
+        if entries:
+            yield from entries
+        for length in range(_PREFIX_MIN, min(len(word), self._max_prefix) + 1):
+            entries = self._prefix.get(word[:length])
+            if entries:
+                yield from entries
+
+    @staticmethod
+    def _phrase_matches(rest: tuple[str, ...], words: list[str], stems: list[str],
+                        start: int) -> bool:
+        if start + len(rest) > len(words):
+            return False
+        for expected, word, word_stem in zip(rest, words[start:], stems[start:]):
+            if len(expected) >= _PREFIX_MIN:
+                if not word.startswith(expected):
+                    return False
+            elif word_stem != expected:
+                return False
+        return True
@@ -0,0 +1,81 @@
+"""Нормализация результатов поиска каналов к общему виду.
+
+Все источники (DuckDuckGo, tgstat, будущие) отдают каналы словарём
+{username, title, description, subscribers_count, category}. Регулярки
+скомпилированы один раз на модуль, служебные пути t.me — во frozenset.
+"""
+
+import logging
+import re
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+# t.me/username или t.me/s/username
+_TME_USERNAME = re.compile(r"t\.me/(?:s/)?([a-zA-Z]\w{3,})")
+# "Telegram: Contact @username – " в начале заголовка
+_TITLE_PREFIX = re.compile(r"^Telegram:\s*(Contact|View|Join)\s*@\S+\s*[-–—]?\s*")
+# " - Telegram" в конце заголовка
+_TITLE_SUFFIX = re.compile(r"\s*[-–—]\s*Telegram\s*$")
+_NON_DIGIT = re.compile(r"[^\d\s]")
+
+# Служебные страницы t.me, которые не являются каналами
+SERVICE_PATHS = frozenset({"s", "addstickers", "joinchat", "addtheme", "proxy"})
+
+DESCRIPTION_MAX_LENGTH = 500
+
+
+def parse_ddg_result(item: dict) -> dict | None:
+    """Извлекает данные канала из результата DuckDuckGo (None — не канал)."""
+    try:
+        match = _TME_USERNAME.search(item.get("href", ""))
+        if not match:
+            return None
+
+        username = match.group(1)
+        if username.lower() in SERVICE_PATHS:
+            return None
+
+        title = _TITLE_PREFIX.sub("", item.get("title", "")).strip()
+        title = _TITLE_SUFFIX.sub("", title).strip()
+        body = item.get("body", "")
+
+        return {
+            "username": username,
+            "title": title or f"@{username}",
+            "description": body[:DESCRIPTION_MAX_LENGTH] if body else None,
+            "subscribers_count": None,
+            "category": None,
+        }
+    except Exception as e:
+        logger.debug("DDG: error parsing result: %s", e)
+        return None
+
+
+def normalize_many(results: Iterable[dict], limit: int | None = None) -> list[dict]:
+    """Нормализует пачку результатов DDG: отбрасывает не-каналы и дубли по username.
+
+    Останавливается, как только набрано limit каналов.
+    """
+    seen: set[str] = set()
+    channels: list[dict] = []
+    for item in results:
+        channel = parse_ddg_result(item)
+        if channel is None or channel["username"] in seen:
+            continue
+        seen.add(channel["username"])
+        channels.append(channel)
+        if limit is not None and len(channels) >= limit:
+            break
+    return channels
+
+
+def parse_count(text: str) -> int | None:
+    """Число из текста вида «12 345 подписчиков» (None, если цифр нет)."""
+    digits = _NON_DIGIT.sub("", text).replace(" ", "")
+    if not digits:
+        return None
+    try:
+        return int(digits)
+    except ValueError:
+        return None
@@ -0,0 +1,138 @@
+"""Кэш результатов поиска каналов перед TgstatParser.search.
+
+Пользователи часто повторяют одни и те же запросы, а каждый поиск — это
+скрейпинг DDG и, возможно, tgstat на несколько секунд. Кэш хранит результаты
+в памяти процесса по нормализованному запросу и limit:
+
+- свежие записи отдаются сразу;
+- устаревшие (в окне stale_ttl) тоже отдаются сразу, а в фоне запускается
+  обновление (stale-while-revalidate);
+- пустые результаты кэшируются на короткое время, чтобы не долбить
+  tgstat повторными запросами после «restricted»;
+- одинаковые одновременные промахи ждут один общий запрос к парсеру.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from parsers.tgstat import TgstatParser
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize_query(query: str) -> str:
+    """Приводит запрос к каноничному виду: регистр, ё→е, пробелы и пунктуация."""
+    text = query.casefold().replace("ё", "е")
+    return _NON_WORD.sub(" ", text).strip()
+
+
+@dataclass
+class _Entry:
+    results: list[dict]
+    fresh_until: float
+    stale_until: float
+
+
+class CachedChannelSearch:
+    """Обёртка над TgstatParser с кэшем результатов поиска (интерфейс тот же)."""
+
+    def __init__(
+        self,
+        parser: TgstatParser,
+        ttl: float = 1800.0,
+        stale_ttl: float = 6 * 3600.0,
+        negative_ttl: float = 120.0,
+        max_size: int = 1000,
+    ) -> None:
+        self._parser = parser
+        self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        self._negative_ttl = negative_ttl
+        self._max_size = max_size
+        self._entries: OrderedDict[tuple[str, int], _Entry] = OrderedDict()
+        self._inflight: dict[tuple[str, int], asyncio.Task] = {}
+        # Ссылки на фоновые обновления: иначе задачу может собрать GC
+        self._background: set[asyncio.Task] = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    async def search(self, query: str, limit: int = 20, user_id: str | None = None) -> list[dict]:
+        """Ищет каналы, отдавая результат из кэша, если он есть.
+
+        user_id передаётся парсеру для лимита параллельных запросов пользователя.
+        """
+        key = (normalize_query(query), limit)
+        now = time.monotonic()
+
+        entry = self._entries.get(key)
+        if entry is not None and now < entry.stale_until:
+            self._entries.move_to_end(key)
+            if now < entry.fresh_until:
+                self.hits += 1
+            else:
+                # Отдаём устаревшее сразу, обновляем в фоне
+                self.stale_hits += 1
+                self._refresh(key, query, limit, user_id)
+            return list(entry.results)
+
+        self.misses += 1
+        # shield: отмена одного ожидающего не должна отменять общий запрос
+        return list(await asyncio.shield(self._refresh(key, query, limit, user_id)))
+
+    def stats(self) -> dict:
+        """Счётчики попаданий для подбора TTL и размера."""
+        total = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.stale_hits) / total if total else 0.0,
+        }
+
+    def _refresh(self, key: tuple[str, int], query: str, limit: int,
+                 user_id: str | None) -> asyncio.Task:
+        """Запускает (или возвращает уже запущенный) запрос к парсеру по ключу."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, query, limit, user_id))
+            self._inflight[key] = task
+            self._background.add(task)
+            task.add_done_callback(self._on_done)
+        return task
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        """Логирует ошибку обновления: фоновый результат никто не ждёт."""
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Search cache refresh failed: %s", task.exception())
+
+    async def _fetch(self, key: tuple[str, int], query: str, limit: int,
+                     user_id: str | None) -> list[dict]:
+        try:
+            results = await self._parser.search(query, limit=limit, user_id=user_id)
+            self._store(key, results)
+            return results
+        finally:
+            self._inflight.pop(key, None)
+
+    def _store(self, key: tuple[str, int], results: list[dict]) -> None:
+        now = time.monotonic()
+        if results:
+            entry = _Entry(results, now + self._ttl, now + self._ttl + self._stale_ttl)
+        else:
+            # Пустой ответ (ничего не нашли или упёрлись в лимит) — держим недолго
+            entry = _Entry(results, now + self._negative_ttl, now + self._negative_ttl)
+
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+        logger.debug("Search cache: stored %d results for %r", len(results), key[0])
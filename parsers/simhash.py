@@ -0,0 +1,125 @@
+"""SimHash-отпечатки текстов для поиска почти одинаковых сообщений.
+
+Одна и та же вакансия перепощивается в десятки каналов — дословно или
+с мелкими правками (другой эмодзи, хэштег, подпись канала). У таких копий
+64-битные SimHash-отпечатки отличаются на несколько бит, у разных
+текстов — примерно на половину.
+
+SimHashIndex находит отпечаток на расстоянии Хэмминга не больше
+max_distance без перебора: 64 бита режутся на max_distance + 1 полос,
+и у близких отпечатков хотя бы одна полоса совпадает целиком.
+"""
+
+import hashlib
+import re
+from collections import OrderedDict, defaultdict
+from typing import Generic, Hashable, TypeVar
+
+_BITS = 64
+_MASK = (1 << _BITS) - 1
+# Слов в шингле
+_SHINGLE = 2
+
+_URL = re.compile(r"https?://\S+|t\.me/\S+")
+_WORD = re.compile(r"\w+")
+
+K = TypeVar("K", bound=Hashable)
+
+
+def normalize_text(text: str) -> list[str]:
+    """Слова текста без регистра, ссылок, пунктуации и эмодзи."""
+    text = _URL.sub(" ", text.lower().replace("ё", "е"))
+    return _WORD.findall(text)
+
+
+def fingerprint(text: str) -> int:
+    """64-битный SimHash по шинглам из _SHINGLE слов (0 — пустой текст)."""
+    words = normalize_text(text)
+    if not words:
+        return 0
+    if len(words) < _SHINGLE:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i:i + _SHINGLE]) for i in range(len(words) - _SHINGLE + 1)]
+
+    weights = [0] * _BITS
+    for shingle in shingles:
+        value = int.from_bytes(
+            hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big",
+        )
+        for bit in range(_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    result = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            result |= 1 << bit
+    return result
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def to_signed(value: int) -> int:
+    """Отпечаток для колонки BIGINT (знаковое 64-битное)."""
+    return value - (1 << _BITS) if value >= 1 << (_BITS - 1) else value
+
+
+def from_signed(value: int) -> int:
+    return value & _MASK
+
+
+class SimHashIndex(Generic[K]):
+    """Отпечатки с поиском ближайшего в пределах max_distance бит.
+
+    Хранит не больше max_size записей — самые старые вытесняются.
+    """
+
+    def __init__(self, max_distance: int = 3, max_size: int = 100_000) -> None:
+        self.max_distance = max_distance
+        self._max_size = max_size
+        bands = max_distance + 1
+        self._widths = [_BITS // bands + (1 if i < _BITS % bands else 0) for i in range(bands)]
+        # (номер полосы, значение полосы) -> ключи
+        self._bands: defaultdict[tuple[int, int], set[K]] = defaultdict(set)
+        self._items: OrderedDict[K, int] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, key: K, value: int) -> None:
+        if key in self._items:
+            return
+        self._items[key] = value
+        for band in self._split(value):
+            self._bands[band].add(key)
+        if len(self._items) > self._max_size:
+            self._remove(next(iter(self._items)))
+
+    def find(self, value: int) -> K | None:
+        """Ключ ближайшего отпечатка на расстоянии не больше max_distance."""
+        best: K | None = None
+        best_distance = self.max_distance + 1
+        for band in self._split(value):
+            for key in self._bands.get(band, ()):
+                distance = hamming(value, self._items[key])
+                if distance < best_distance:
+                    best, best_distance = key, distance
+        return best
+
+    def _remove(self, key: K) -> None:
+        value = self._items.pop(key)
+        for band in self._split(value):
+            keys = self._bands[band]
+            keys.discard(key)
+            if not keys:
+                del self._bands[band]
+
+    def _split(self, value: int) -> list[tuple[int, int]]:
+        bands = []
+        shift = 0
+        for i, width in enumerate(self._widths):
+            bands.append((i, value >> shift & ((1 << width) - 1)))
+            shift += width
+        return bands
@@ -0,0 +1,102 @@
+"""Посты публичных каналов из веб-превью t.me/s/<username>.
+
+Превью отдаёт до ~20 последних постов, а с параметром ?after=<id> — посты
+новее id. Поэтому при известном последнем id канала скачиваются только
+новые посты: для канала без новых постов это одна короткая страница.
+"""
+
+import logging
+import re
+
+import httpx
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+
+logger = logging.getLogger(__name__)
+
+try:
+    import lxml  # noqa: F401
+
+    _HTML_PARSER = "lxml"
+except ImportError:
+    _HTML_PARSER = "html.parser"
+
+TELEGRAM_WEB_URL = "https://t.me/s/{username}"
+
+_POSTS_ONLY = SoupStrainer(
+    "div", class_=lambda value: bool(value) and "tgme_widget_message" in value.split(),
+)
+_POST_ID = re.compile(r"/(\d+)$")
+_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+    ),
+    "Accept-Language": "ru,en;q=0.8",
+}
+
+
+def parse_posts(html: str) -> list[dict]:
+    """Посты со страницы t.me/s: [{telegram_message_id, text, date}] по возрастанию id."""
+    soup = BeautifulSoup(html, _HTML_PARSER, parse_only=_POSTS_ONLY)
+    posts: dict[int, dict] = {}
+    for node in soup.find_all("div", attrs={"data-post": True}):
+        match = _POST_ID.search(node["data-post"])
+        if not match:
+            continue
+        time_node = node.find("time", datetime=True)
+        message_id = int(match.group(1))
+        posts[message_id] = {
+            "telegram_message_id": message_id,
+            "text": _post_text(node.find("div", class_="tgme_widget_message_text")),
+            "date": time_node["datetime"] if isinstance(time_node, Tag) else None,
+        }
+    return [posts[message_id] for message_id in sorted(posts)]
+
+
+def _post_text(node: Tag | None) -> str | None:
+    """Текст поста с переносами строк на месте <br>."""
+    if not isinstance(node, Tag):
+        return None
+    for br in node.find_all("br"):
+        br.replace_with("\n")
+    return node.get_text().strip() or None
+
+
+class TelegramWebClient:
+    """Асинхронная загрузка постов каналов через t.me/s."""
+
+    def __init__(self, timeout: float = 15.0, max_pages: int = 5) -> None:
+        self._client = httpx.AsyncClient(
+            headers=_HEADERS, timeout=timeout, follow_redirects=True,
+        )
+        self._max_pages = max_pages
+
+    async def fetch_new_posts(self, username: str, after: int | None) -> list[dict]:
+        """Посты канала с id больше after (after=None — последняя страница).
+
+        Листает вперёд не больше max_pages страниц за вызов — остальное
+        догрузится при следующем обходе.
+        """
+        posts: list[dict] = []
+        cursor = after
+        for _ in range(self._max_pages):
+            params = {"after": cursor} if cursor is not None else None
+            response = await self._client.get(
+                TELEGRAM_WEB_URL.format(username=username), params=params,
+            )
+            response.raise_for_status()
+            page = [
+                post for post in parse_posts(response.text)
+                if cursor is None or post["telegram_message_id"] > cursor
+            ]
+            if not page:
+                break
+            posts.extend(page)
+            if after is None:
+                # Первый обход канала — хватает последней страницы
+                break
+            cursor = page[-1]["telegram_message_id"]
+        return posts
+
+    async def close(self) -> None:
+        await self._client.aclose()
@@ -1,37 +1,141 @@
-"""Парсер каналов Telegram — поиск через DuckDuckGo (основной) и tgstat.com (резерв)."""
+"""Парсер каналов Telegram — поиск через DuckDuckGo и tgstat.com.
+
+Режимы поиска (PARSER_SEARCH_MODE):
+- sequential — по умолчанию: сначала DDG, tgstat только если DDG ничего
+  не нашёл — так tgstat получает меньше запросов и реже ограничивает;
+- parallel — оба источника одновременно, результаты объединяются:
+  дубли по username убираются, карточки DDG дополняются подписчиками
+  и категорией из tgstat;
+- first — оба источника одновременно, но если один из них уже набрал
+  limit каналов, ответ возвращается сразу, не дожидаясь второго.
+
+parallel и first включаются явно: они отправляют в tgstat каждый поиск.
+"""
 
 import asyncio
 import logging
-import re
 
-import cloudscraper
-from bs4 import BeautifulSoup, Tag
+from bs4 import BeautifulSoup, SoupStrainer, Tag
 from ddgs import DDGS
 
+from bot.config import settings
+from parsers.executor import get_parser_executor
+from parsers.normalizer import normalize_many, parse_count
+from parsers.tgstat_sessions import TGSTAT_URL, get_tgstat_session_pool
+
 logger = logging.getLogger(__name__)
 
-_TGSTAT_URL = "https://tgstat.com/channels/search"
+SEARCH_MODES = ("sequential", "parallel", "first")
+
+# lxml на порядок быстрее встроенного html.parser; без него работаем как раньше
+try:
+    import lxml  # noqa: F401
+
+    _HTML_PARSER = "lxml"
+except ImportError:
+    _HTML_PARSER = "html.parser"
+
+# Из ответа tgstat нужны только карточки каналов. Во время разбора class ещё
+# не разбит на список, поэтому проверяем по словам вручную.
+_CARDS_ONLY = SoupStrainer(class_=lambda value: bool(value) and "peer-item-row" in value.split())
 
 
 class TgstatParser:
     """Парсит Telegram-каналы: DuckDuckGo site:t.me + tgstat.com AJAX."""
 
-    def __init__(self) -> None:
-        self._scraper: cloudscraper.CloudScraper | None = None
-        self._csrf_token: str | None = None
+    def __init__(self, mode: str | None = None) -> None:
+        self._mode = mode or settings.parser_search_mode
+        if self._mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {self._mode!r}")
+        self._sessions = get_tgstat_session_pool()
 
-    async def search(self, query: str, limit: int = 20) -> list[dict]:
+    async def search(self, query: str, limit: int = 20, user_id: str | None = None) -> list[dict]:
         """Ищет каналы по запросу. Возвращает список словарей с данными каналов.
 
+        Запрос выполняется в пуле парсеров с лимитом на пользователя user_id.
         Возвращает пустой список при любой ошибке.
         """
-        loop = asyncio.get_event_loop()
         try:
-            return await loop.run_in_executor(None, self._search_sync, query, limit)
+            if self._mode == "sequential":
+                executor = get_parser_executor()
+                return await executor.run(self._search_sync, query, limit, user_id=user_id)
+            return await self._search_concurrent(query, limit, user_id)
         except Exception as e:
             logger.warning("Channel search error: %s", e)
             return []
 
+    async def _search_concurrent(self, query: str, limit: int,
+                                 user_id: str | None) -> list[dict]:
+        """Запускает DDG и tgstat одновременно и объединяет результаты."""
+        executor = get_parser_executor()
+        ddg = asyncio.create_task(executor.run(self._search_ddg, query, limit, user_id=user_id))
+        tgstat = asyncio.create_task(
+            executor.run(self._search_tgstat, query, limit, user_id=user_id),
+        )
+
+        try:
+            if self._mode == "first":
+                done, _ = await asyncio.wait({ddg, tgstat}, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    results = self._task_result(task)
+                    if len(results) >= limit:
+                        logger.info("Channel search: first source returned %d", len(results))
+                        return results[:limit]
+
+            await asyncio.wait({ddg, tgstat})
+            return self._merge(self._task_result(ddg), self._task_result(tgstat), limit)
+        finally:
+            # Поток отменить нельзя, но ответ опоздавшего источника больше не нужен
+            ddg.cancel()
+            tgstat.cancel()
+
+    @staticmethod
+    def _task_result(task: asyncio.Task) -> list[dict]:
+        """Результат источника; ошибка одного источника не ломает поиск."""
+        if task.cancelled():
+            return []
+        exc = task.exception()
+        if exc is not None:
+            logger.warning("Channel search source error: %s", exc)
+            return []
+        return task.result()
+
+    @staticmethod
+    def _merge(ddg: list[dict], tgstat: list[dict], limit: int) -> list[dict]:
+        """Объединяет результаты: порядок DDG, затем новые каналы из tgstat.
+
+        Каналы из DDG дополняются подписчиками и категорией из tgstat.
+        """
+        by_username = {ch["username"].lower(): ch for ch in tgstat if ch.get("username")}
+
+        merged: list[dict] = []
+        seen: set[str] = set()
+        for channel in ddg:
+            key = channel["username"].lower()
+            if key in seen:
+                continue
+            seen.add(key)
+            extra = by_username.get(key)
+            if extra:
+                channel = {
+                    **channel,
+                    "subscribers_count": channel.get("subscribers_count")
+                    or extra.get("subscribers_count"),
+                    "category": channel.get("category") or extra.get("category"),
+                }
+            merged.append(channel)
+
+        for key, channel in by_username.items():
+            if key not in seen:
+                seen.add(key)
+                merged.append(channel)
+
+        logger.info(
+            "Channel search: merged %d channels (ddg=%d, tgstat=%d)",
+            len(merged), len(ddg), len(tgstat),
+        )
+        return merged[:limit]
+
     def _search_sync(self, query: str, limit: int) -> list[dict]:
         """Синхронный поиск: сначала DuckDuckGo, при неудаче — tgstat."""
         results = self._search_ddg(query, limit)
@@ -53,129 +157,51 @@ class TgstatParser:
             logger.warning("DDG search error: %s", e)
             return []
 
-        if not raw_results:
-            return []
-
-        seen: set[str] = set()
-        channels: list[dict] = []
-
-        for item in raw_results:
-            channel = self._parse_ddg_result(item)
-            if not channel:
-                continue
-            username = channel["username"]
-            if username in seen:
-                continue
-            seen.add(username)
-            channels.append(channel)
-            if len(channels) >= limit:
-                break
-
+        channels = normalize_many(raw_results, limit=limit)
         logger.info("DDG search: found %d unique channels", len(channels))
         return channels
 
-    @staticmethod
-    def _parse_ddg_result(item: dict) -> dict | None:
-        """Извлекает данные канала из результата DuckDuckGo."""
-        try:
-            href = item.get("href", "")
-            title = item.get("title", "")
-            body = item.get("body", "")
-
-            # Извлекаем username из URL: t.me/username или t.me/s/username
-            match = re.search(r"t\.me/(?:s/)?([a-zA-Z]\w{3,})", href)
-            if not match:
-                return None
-
-            username = match.group(1)
-
-            # Пропускаем служебные страницы
-            if username.lower() in ("s", "addstickers", "joinchat", "addtheme", "proxy"):
-                return None
-
-            # Очищаем заголовок от "Telegram: Contact/View @..."
-            clean_title = re.sub(
-                r"^Telegram:\s*(Contact|View|Join)\s*@\S+\s*[-–—]?\s*",
-                "",
-                title,
-            ).strip()
-            # Убираем " - Telegram" в конце
-            clean_title = re.sub(r"\s*[-–—]\s*Telegram\s*$", "", clean_title).strip()
-            if not clean_title:
-                clean_title = f"@{username}"
-
-            return {
-                "username": username,
-                "title": clean_title,
-                "description": body[:500] if body else None,
-                "subscribers_count": None,
-                "category": None,
-            }
-        except Exception as e:
-            logger.debug("DDG: error parsing result: %s", e)
-            return None
-
     # ==================== tgstat.com ====================
 
-    def _get_scraper(self) -> cloudscraper.CloudScraper:
-        """Ленивая инициализация cloudscraper."""
-        if self._scraper is None:
-            self._scraper = cloudscraper.create_scraper()
-        return self._scraper
-
-    def _ensure_tgstat_session(self) -> None:
-        """Получает CSRF-токен и cookies для tgstat.com."""
-        if self._csrf_token:
-            return
-        try:
-            scraper = self._get_scraper()
-            resp = scraper.get(_TGSTAT_URL, timeout=15)
-            if resp.status_code != 200:
-                return
-            soup = BeautifulSoup(resp.text, "html.parser")
-            meta = soup.select_one("meta[name=csrf-token]")
-            if meta:
-                self._csrf_token = meta.get("content", "")
-        except Exception as e:
-            logger.warning("tgstat: session init error: %s", e)
-
     def _search_tgstat(self, query: str, limit: int) -> list[dict]:
-        """Поиск через tgstat.com AJAX API."""
-        self._ensure_tgstat_session()
-        scraper = self._get_scraper()
-
-        headers = {
-            "X-Requested-With": "XMLHttpRequest",
-            "Referer": _TGSTAT_URL,
-        }
-        if self._csrf_token:
-            headers["X-CSRF-Token"] = self._csrf_token
+        """Поиск через tgstat.com AJAX API на сессии из пула."""
+        with self._sessions.acquire() as session:
+            headers = {
+                "X-Requested-With": "XMLHttpRequest",
+                "Referer": TGSTAT_URL,
+            }
+            if session.csrf_token:
+                headers["X-CSRF-Token"] = session.csrf_token
+
+            try:
+                resp = session.scraper.post(
+                    TGSTAT_URL,
+                    data={"q": query},
+                    headers=headers,
+                    timeout=15,
+                )
+            except Exception as e:
+                logger.warning("tgstat: request error: %s", e)
+                self._sessions.report_failure(session)
+                return []
 
-        try:
-            resp = scraper.post(
-                _TGSTAT_URL,
-                data={"q": query},
-                headers=headers,
-                timeout=15,
-            )
-        except Exception as e:
-            logger.warning("tgstat: request error: %s", e)
-            return []
+            if resp.status_code != 200:
+                # Протухли cookies или CSRF — меняем сессию
+                self._sessions.discard(session)
+                return []
 
-        if resp.status_code != 200:
-            self._csrf_token = None
-            return []
+            try:
+                data = resp.json()
+            except Exception:
+                self._sessions.report_failure(session)
+                return []
 
-        try:
-            data = resp.json()
-        except Exception:
-            return []
+            if data.get("status") == "restricted":
+                logger.warning("tgstat: rate limited, rotating session")
+                self._sessions.discard(session)
+                return []
 
-        if data.get("status") == "restricted":
-            logger.warning("tgstat: rate limited")
-            self._csrf_token = None
-            self._scraper = None
-            return []
+            self._sessions.report_success(session)
 
         html = data.get("html", "")
         if not html:
@@ -184,14 +210,18 @@ class TgstatParser:
         return self._parse_tgstat_html(html, limit)
 
     def _parse_tgstat_html(self, html: str, limit: int) -> list[dict]:
-        """Извлекает данные каналов из HTML ответа tgstat AJAX."""
-        soup = BeautifulSoup(html, "html.parser")
-        cards = soup.select(".peer-item-row")
+        """Извлекает данные каналов из HTML ответа tgstat AJAX.
+
+        Строится дерево только из карточек (.peer-item-row), остальная
+        разметка ответа пропускается парсером.
+        """
+        soup = BeautifulSoup(html, _HTML_PARSER, parse_only=_CARDS_ONLY)
+        cards = soup.find_all(class_="peer-item-row", limit=limit)
         if not cards:
             return []
 
         results: list[dict] = []
-        for card in cards[:limit]:
+        for card in cards:
             channel = self._parse_tgstat_card(card)
             if channel and channel.get("username"):
                 results.append(channel)
@@ -200,7 +230,13 @@ class TgstatParser:
         return results
 
     def _parse_tgstat_card(self, card: Tag) -> dict | None:
-        """Извлекает данные канала из карточки tgstat."""
+        """Извлекает данные канала из карточки tgstat за один обход её узлов.
+
+        Для каждого поля берётся первый подходящий элемент в порядке документа —
+        так же, как select_one по селекторам:
+        a[href*='/channel/@'], .font-16.text-dark, .font-14.text-dark,
+        .font-12.text-dark span.
+        """
         try:
             data: dict = {
                 "username": None,
@@ -209,8 +245,25 @@ class TgstatParser:
                 "subscribers_count": None,
                 "category": None,
             }
+            link = title_el = subs_el = cat_el = None
+
+            for el in card.descendants:
+                if not isinstance(el, Tag):
+                    continue
+                if link is None and el.name == "a" and "/channel/@" in el.get("href", ""):
+                    link = el
+                classes = el.get("class")
+                if not classes or "text-dark" not in classes:
+                    continue
+                if title_el is None and "font-16" in classes:
+                    title_el = el
+                if subs_el is None and "font-14" in classes:
+                    subs_el = el
+                if cat_el is None and "font-12" in classes:
+                    cat_el = el.find("span")
+                if link and title_el and subs_el and cat_el:
+                    break
 
-            link = card.select_one("a[href*='/channel/@']")
             if link:
                 href = str(link.get("href", ""))
                 for part in href.split("/"):
@@ -218,21 +271,12 @@ class TgstatParser:
                         data["username"] = part.lstrip("@")
                         break
 
-            title_el = card.select_one(".font-16.text-dark")
             if title_el:
                 data["title"] = title_el.get_text(strip=True)
 
-            subs_el = card.select_one(".font-14.text-dark")
             if subs_el:
-                subs_text = subs_el.get_text(strip=True)
-                digits = re.sub(r"[^\d\s]", "", subs_text).replace(" ", "")
-                if digits:
-                    try:
-                        data["subscribers_count"] = int(digits)
-                    except ValueError:
-                        pass
-
-            cat_el = card.select_one(".font-12.text-dark span")
+                data["subscribers_count"] = parse_count(subs_el.get_text(strip=True))
+
             if cat_el:
                 data["category"] = cat_el.get_text(strip=True)
 
@@ -0,0 +1,211 @@
+"""Пул HTTP-сессий tgstat.com.
+
+Каждая сессия — свой cloudscraper (cookies после Cloudflare-челленджа)
+и свой CSRF-токен. Сессия выдаётся одному потоку за раз, поэтому сессии
+не делятся между потоками executor'а. Пул:
+
+- прогревает сессии заранее (challenge и GET за CSRF — не на горячем пути);
+- в фоне пересоздаёт сессии, которые скоро устареют или без CSRF-токена;
+- выбрасывает сессию после «restricted» / не-200 ответа (ротация);
+- выбрасывает сессию после нескольких сетевых ошибок подряд.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator
+
+import cloudscraper
+from bs4 import BeautifulSoup
+
+from bot.config import settings
+from parsers.executor import get_parser_executor
+
+logger = logging.getLogger(__name__)
+
+TGSTAT_URL = "https://tgstat.com/channels/search"
+
+
+@dataclass
+class TgstatSession:
+    """Сессия tgstat: скрейпер с cookies и CSRF-токен."""
+
+    scraper: cloudscraper.CloudScraper
+    csrf_token: str | None
+    created_at: float = field(default_factory=time.monotonic)
+    failures: int = 0
+    discarded: bool = False
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.created_at
+
+
+class TgstatSessionPool:
+    """Потокобезопасный пул из size прогретых сессий tgstat."""
+
+    def __init__(
+        self,
+        size: int = 3,
+        max_age: float = 1800.0,
+        refresh_margin: float = 300.0,
+        max_failures: int = 3,
+    ) -> None:
+        self._size = size
+        self._max_age = max_age
+        self._refresh_margin = refresh_margin
+        self._max_failures = max_failures
+        self._idle: queue.Queue[TgstatSession] = queue.Queue()
+        self._lock = threading.Lock()
+        self._total = 0  # выданные + свободные сессии
+
+    @contextmanager
+    def acquire(self, timeout: float = 30.0) -> Iterator[TgstatSession]:
+        """Выдаёт сессию в монопольное пользование на время блока with."""
+        session = self._checkout(timeout)
+        try:
+            yield session
+        finally:
+            self._checkin(session)
+
+    def discard(self, session: TgstatSession) -> None:
+        """Помечает сессию как негодную — при возврате в пул она будет заменена."""
+        session.discarded = True
+
+    def report_failure(self, session: TgstatSession) -> None:
+        """Сетевая ошибка: после max_failures подряд сессия выбрасывается."""
+        session.failures += 1
+        if session.failures >= self._max_failures:
+            session.discarded = True
+
+    def report_success(self, session: TgstatSession) -> None:
+        session.failures = 0
+
+    def maintain(self) -> None:
+        """Проверка здоровья: пересоздаёт стареющие сессии и добирает пул до size.
+
+        Блокирующий вызов — выполняется в пуле парсеров.
+        """
+        for _ in range(self._idle.qsize()):
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if self._is_healthy(session, margin=self._refresh_margin):
+                self._idle.put(session)
+            else:
+                self._drop(session)
+
+        while self._reserve():
+            session = self._create_or_release()
+            if not self._is_healthy(session):
+                # tgstat недоступен — попробуем на следующем цикле
+                self._drop(session)
+                break
+            self._idle.put(session)
+
+    def stats(self) -> dict:
+        return {"size": self._size, "total": self._total, "idle": self._idle.qsize()}
+
+    def _checkout(self, timeout: float) -> TgstatSession:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                if self._reserve():
+                    return self._create_or_release()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("No free tgstat session")
+                try:
+                    session = self._idle.get(timeout=remaining)
+                except queue.Empty:
+                    raise TimeoutError("No free tgstat session") from None
+
+            if self._is_healthy(session):
+                return session
+            self._drop(session)
+
+    def _checkin(self, session: TgstatSession) -> None:
+        if session.discarded or not self._is_healthy(session):
+            self._drop(session)
+            return
+        self._idle.put(session)
+
+    def _is_healthy(self, session: TgstatSession, margin: float = 0.0) -> bool:
+        return (
+            not session.discarded
+            and session.csrf_token is not None
+            and session.age < self._max_age - margin
+        )
+
+    def _reserve(self) -> bool:
+        """Резервирует место под новую сессию, если пул ещё не заполнен."""
+        with self._lock:
+            if self._total >= self._size:
+                return False
+            self._total += 1
+            return True
+
+    def _drop(self, session: TgstatSession) -> None:
+        with self._lock:
+            self._total -= 1
+        try:
+            session.scraper.close()
+        except Exception:
+            pass
+
+    def _create_or_release(self) -> TgstatSession:
+        """Создаёт сессию под уже зарезервированное место."""
+        try:
+            return self._create()
+        except BaseException:
+            with self._lock:
+                self._total -= 1
+            raise
+
+    @staticmethod
+    def _create() -> TgstatSession:
+        """Проходит Cloudflare-челлендж и получает CSRF-токен."""
+        scraper = cloudscraper.create_scraper()
+        csrf_token: str | None = None
+        try:
+            resp = scraper.get(TGSTAT_URL, timeout=15)
+            if resp.status_code == 200:
+                soup = BeautifulSoup(resp.text, "html.parser")
+                meta = soup.select_one("meta[name=csrf-token]")
+                if meta:
+                    csrf_token = meta.get("content", "") or None
+        except Exception as e:
+            logger.warning("tgstat: session init error: %s", e)
+        return TgstatSession(scraper=scraper, csrf_token=csrf_token)
+
+
+async def run_maintenance(pool: TgstatSessionPool, interval: float = 60.0) -> None:
+    """Фоновая задача: прогрев и обновление сессий tgstat раз в interval секунд."""
+    executor = get_parser_executor()
+    while True:
+        try:
+            await executor.run(pool.maintain)
+        except Exception as e:
+            logger.warning("tgstat: session maintenance error: %s", e)
+        await asyncio.sleep(interval)
+
+
+_pool: TgstatSessionPool | None = None
+
+
+def get_tgstat_session_pool() -> TgstatSessionPool:
+    """Возвращает общий пул сессий tgstat (singleton)."""
+    global _pool
+    if _pool is None:
+        _pool = TgstatSessionPool(
+            size=settings.tgstat_sessions,
+            max_age=settings.tgstat_session_max_age,
+        )
+    return _pool
@@ -0,0 +1,116 @@
+"""Фоновые задачи APScheduler.
+
+- мониторинг вакансий: раз в MONITOR_INTERVAL секунд VacancyMonitor обходит
+  каналы всех подписчиков и присылает каждому подошедшие ему вакансии.
+"""
+
+import asyncio
+import html
+import logging
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramRetryAfter
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from bot.config import settings
+from db.repositories.users import UserRepository
+from services.vacancy_monitor import VacancyMonitor
+
+logger = logging.getLogger(__name__)
+
+# Вакансий в одном уведомлении; остальные — строкой «и ещё N»
+_NOTIFY_LIMIT = 5
+# Пауза между уведомлениями разным пользователям (лимит Bot API — ~30 сообщений/с)
+_SEND_DELAY = 0.05
+_TEXT_PREVIEW = 300
+
+_scheduler: AsyncIOScheduler | None = None
+_monitor: VacancyMonitor | None = None
+
+
+def get_scheduler() -> AsyncIOScheduler:
+    """Возвращает singleton планировщика."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = AsyncIOScheduler()
+    return _scheduler
+
+
+def start_vacancy_monitor(bot: Bot) -> None:
+    """Регистрирует interval-задачу мониторинга вакансий (MONITOR_INTERVAL=0 — выключено)."""
+    global _monitor
+    if settings.monitor_interval <= 0:
+        return
+    _monitor = VacancyMonitor()
+    get_scheduler().add_job(
+        monitor_vacancies,
+        "interval",
+        seconds=settings.monitor_interval,
+        args=[bot, _monitor],
+        id="vacancy_monitor",
+        max_instances=1,
+        coalesce=True,
+        replace_existing=True,
+    )
+
+
+async def stop_scheduler() -> None:
+    """Останавливает планировщик и закрывает клиенты мониторинга."""
+    if _scheduler is not None and _scheduler.running:
+        _scheduler.shutdown(wait=False)
+    if _monitor is not None:
+        await _monitor.close()
+
+
+async def monitor_vacancies(bot: Bot, monitor: VacancyMonitor) -> None:
+    """Один цикл мониторинга и рассылка уведомлений."""
+    try:
+        matches = await monitor.run_cycle()
+    except Exception:
+        logger.exception("Vacancy monitor cycle failed")
+        return
+    if not matches:
+        return
+
+    users = {user["id"]: user for user in await UserRepository().get_by_ids(list(matches))}
+    sent = 0
+    for user_id, vacancies in matches.items():
+        user = users.get(user_id)
+        if user is None:
+            continue
+        if await _send(bot, user["telegram_id"], format_notification(vacancies)):
+            sent += 1
+        await asyncio.sleep(_SEND_DELAY)
+    logger.info("Vacancy notifications sent: %d of %d users", sent, len(matches))
+
+
+def format_notification(vacancies: list[dict]) -> str:
+    """HTML-текст уведомления о новых вакансиях."""
+    lines = [f"<b>Новые вакансии по вашему профилю: {len(vacancies)}</b>"]
+    for vacancy in vacancies[:_NOTIFY_LIMIT]:
+        data = vacancy.get("vacancy_data") or {}
+        title = data.get("title") or (vacancy.get("text") or "")[:_TEXT_PREVIEW]
+        lines.append("")
+        lines.append(f"• <b>{html.escape(str(title))}</b>")
+        if data.get("budget"):
+            lines.append(f"Бюджет: {html.escape(str(data['budget']))}")
+        username = (vacancy.get("channels") or {}).get("username")
+        if username:
+            lines.append(f"https://t.me/{username}/{vacancy['telegram_message_id']}")
+    if len(vacancies) > _NOTIFY_LIMIT:
+        lines.append("")
+        lines.append(f"…и ещё {len(vacancies) - _NOTIFY_LIMIT}")
+    return "\n".join(lines)
+
+
+async def _send(bot: Bot, chat_id: int, text: str) -> bool:
+    try:
+        await bot.send_message(chat_id, text, disable_web_page_preview=True)
+    except TelegramRetryAfter as e:
+        await asyncio.sleep(e.retry_after)
+        return await _send(bot, chat_id, text)
+    except TelegramAPIError as e:
+        # Пользователь заблокировал бота, чат удалён и т.п.
+        logger.warning("Failed to notify %s: %s", chat_id, e)
+        return False
+    return True
@@ -0,0 +1,123 @@
+"""Сбор постов из каналов в channel_messages — инкрементально.
+
+Для каждого канала хранится последний загруженный telegram_message_id
+(channels.last_message_id); при обходе скачиваются только посты новее него.
+
+Обход пачки каналов:
+- каналы качаются параллельно (не больше CHANNEL_PARSE_CONCURRENCY);
+- новые посты всех каналов пишутся одним upsert'ом, отметки
+  last_message_id / last_parsed_at — ещё одним, и только для каналов,
+  где что-то появилось;
+- канал без новых постов пропускает следующие обходы: после k пустых
+  обходов подряд — 2^k - 1 обходов, но не больше CHANNEL_IDLE_MAX_SKIP.
+  Поэтому стоимость обхода растёт с количеством нового, а не каналов.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from bot.config import settings
+from db.repositories.channels import ChannelRepository
+from db.repositories.vacancies import VacancyRepository
+from parsers.telegram_web import TelegramWebClient
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelParserService:
+    """Загрузка новых постов каналов в channel_messages."""
+
+    def __init__(self) -> None:
+        self._channels = ChannelRepository()
+        self._vacancies = VacancyRepository()
+        self._web = TelegramWebClient(max_pages=settings.channel_fetch_pages)
+        self._semaphore = asyncio.Semaphore(settings.channel_parse_concurrency)
+        # channel_id -> [пустых обходов подряд, сколько обходов ещё пропустить]
+        self._idle: dict[str, list[int]] = {}
+
+    async def parse_channel(self, channel_id: str) -> int:
+        """Загружает новые посты одного канала. Возвращает количество новых."""
+        channel = await self._channels.get_by_id(channel_id)
+        if channel is None:
+            return 0
+        return await self.parse_channels([channel], force=True)
+
+    async def parse_user_channels(self, user_id: str, purpose: str = "vacancies") -> int:
+        """Загружает новые посты каналов пользователя с нужным purpose (и both)."""
+        links = await self._channels.get_user_channels(user_id)
+        channels = [
+            link["channels"] for link in links
+            if link["purpose"] in (purpose, "both") and link.get("channels")
+        ]
+        return await self.parse_channels(channels, force=True)
+
+    async def parse_channels(self, channels: list[dict], force: bool = False) -> int:
+        """Обход каналов: новые посты одним upsert'ом. Возвращает количество новых.
+
+        Args:
+            channels: строки channels (нужны id, username, last_message_id)
+            force: не пропускать «спящие» каналы (запрос пользователя)
+        """
+        due = [
+            channel for channel in channels
+            if channel.get("username") and (force or self._is_due(channel["id"]))
+        ]
+        fetched = await asyncio.gather(*(self._fetch(channel) for channel in due))
+
+        messages: list[dict] = []
+        marks: list[dict] = []
+        updated: list[dict] = []
+        now = datetime.now(timezone.utc).isoformat()
+        for channel, posts in zip(due, fetched):
+            self._track_idle(channel["id"], bool(posts))
+            if not posts:
+                continue
+            messages.extend({**post, "channel_id": channel["id"]} for post in posts)
+            marks.append({
+                "id": channel["id"],
+                "last_message_id": posts[-1]["telegram_message_id"],
+                "last_parsed_at": now,
+            })
+            updated.append(channel)
+
+        if messages:
+            await self._vacancies.save_messages(messages)
+            await self._channels.update_parse_marks(marks)
+            # Отметки — и в переданных строках: следующий обход с ними не скачает то же
+            for channel, mark in zip(updated, marks):
+                channel["last_message_id"] = mark["last_message_id"]
+
+        logger.info(
+            "Channel sweep: %d channels, %d fetched, %d with new posts, %d new messages",
+            len(channels), len(due), len(marks), len(messages),
+        )
+        return len(messages)
+
+    async def close(self) -> None:
+        await self._web.close()
+
+    async def _fetch(self, channel: dict) -> list[dict]:
+        async with self._semaphore:
+            try:
+                return await self._web.fetch_new_posts(
+                    channel["username"], channel.get("last_message_id"),
+                )
+            except Exception as e:
+                logger.warning("Failed to fetch @%s: %s", channel["username"], e)
+                return []
+
+    def _is_due(self, channel_id: str) -> bool:
+        state = self._idle.get(channel_id)
+        if state is None or state[1] <= 0:
+            return True
+        state[1] -= 1
+        return False
+
+    def _track_idle(self, channel_id: str, has_new: bool) -> None:
+        if has_new:
+            self._idle.pop(channel_id, None)
+            return
+        state = self._idle.setdefault(channel_id, [0, 0])
+        state[0] += 1
+        state[1] = min(2 ** state[0] - 1, settings.channel_idle_max_skip)
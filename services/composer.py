@@ -1,10 +1,13 @@
 """Сервис «Составить текст» — генерация сообщений через LLM в чат-режиме."""
 
 import logging
+from typing import Callable
 
+from bot.config import settings
 from db.repositories.messages import MessageRepository
 from db.repositories.users import UserRepository
 from llm.client import get_llm_client
+from llm.history import compact_history
 from llm.prompts.broadcast_message import (
     build_context_message as build_broadcast_context,
     build_system_prompt as build_broadcast_system,
@@ -13,9 +16,14 @@ from llm.prompts.vacancy_response import (
     build_context_message as build_vacancy_context,
     build_system_prompt as build_vacancy_system,
 )
+from llm.router import llm_task
+from llm.tokens import estimate_messages_tokens
 
 logger = logging.getLogger(__name__)
 
+# Получает очередной фрагмент ответа при потоковой генерации
+DeltaCallback = Callable[[str], None]
+
 
 class ComposerService:
     """Бизнес-логика генерации текстов через LLM (чат-режим)."""
@@ -29,22 +37,24 @@ class ComposerService:
         user_id: str,
         chat_history: list[dict],
         length: str = "medium",
+        on_delta: DeltaCallback | None = None,
     ) -> str:
         """Генерирует рассылочное сообщение с учётом истории диалога.
 
         Args:
             user_id: ID пользователя в БД
-            chat_history: история сообщений [{"role": ..., "content": ...}]
+            chat_history: история сообщений [{"role": ..., "content": ...}];
+                сжимается на месте, если не влезает в бюджет токенов
             length: длина сообщения (short / medium / long)
+            on_delta: если задан — ответ стримится, фрагменты передаются сюда
 
         Returns:
             Текст ответа ИИ
         """
         system_prompt = build_broadcast_system(length)
-        messages = [{"role": "system", "content": system_prompt}] + chat_history
+        messages = self._build_messages(system_prompt, chat_history)
 
-        client = get_llm_client()
-        result = await client.generate_chat(messages=messages)
+        result = await self._chat(messages, on_delta)
         logger.info("Generated broadcast for user=%s, history_len=%d", user_id, len(chat_history))
         return result
 
@@ -52,20 +62,21 @@ class ComposerService:
         self,
         user_id: str,
         length: str = "medium",
+        on_delta: DeltaCallback | None = None,
     ) -> tuple[str, list[dict]]:
         """Генерирует рассылку на основе профиля (без предварительного диалога).
 
         Returns:
             (текст ответа, начальная история чата)
         """
-        user = self._users.get_by_telegram_id_or_id(user_id)
+        user = await self._users.get_by_telegram_id_or_id(user_id)
         if not user:
             raise ValueError("Пользователь не найден")
 
         context_msg = build_broadcast_context(user)
         chat_history = [{"role": "user", "content": context_msg}]
 
-        result = await self.generate_broadcast(user_id, chat_history, length)
+        result = await self.generate_broadcast(user_id, chat_history, length, on_delta)
         chat_history.append({"role": "assistant", "content": result})
         return result, chat_history
 
@@ -73,21 +84,23 @@ class ComposerService:
         self,
         user_id: str,
         chat_history: list[dict],
+        on_delta: DeltaCallback | None = None,
     ) -> str:
         """Генерирует отклик на вакансию с учётом истории диалога.
 
         Args:
             user_id: ID пользователя в БД
-            chat_history: история сообщений
+            chat_history: история сообщений; сжимается на месте, если не влезает
+                в бюджет токенов
+            on_delta: если задан — ответ стримится, фрагменты передаются сюда
 
         Returns:
             Текст ответа ИИ
         """
         system_prompt = build_vacancy_system()
-        messages = [{"role": "system", "content": system_prompt}] + chat_history
+        messages = self._build_messages(system_prompt, chat_history)
 
-        client = get_llm_client()
-        result = await client.generate_chat(messages=messages)
+        result = await self._chat(messages, on_delta)
         logger.info("Generated vacancy response for user=%s", user_id)
         return result
 
@@ -97,7 +110,7 @@ class ComposerService:
         Returns:
             Начальная история с контекстом профиля
         """
-        user = self._users.get_by_telegram_id_or_id(user_id)
+        user = await self._users.get_by_telegram_id_or_id(user_id)
         if not user:
             raise ValueError("Пользователь не найден")
 
@@ -110,6 +123,7 @@ class ComposerService:
         chat_history: list[dict],
         msg_type: str = "broadcast",
         length: str = "medium",
+        on_delta: DeltaCallback | None = None,
     ) -> str:
         """Доработка: пользователь написал инструкцию → перегенерация.
 
@@ -118,28 +132,64 @@ class ComposerService:
             chat_history: полная история с последним сообщением пользователя
             msg_type: broadcast / vacancy
             length: длина (для broadcast)
+            on_delta: если задан — ответ стримится, фрагменты передаются сюда
 
         Returns:
             Текст доработанного ответа
         """
         if msg_type == "broadcast":
-            return await self.generate_broadcast(user_id, chat_history, length)
+            return await self.generate_broadcast(user_id, chat_history, length, on_delta)
         else:
-            return await self.generate_vacancy_response(user_id, chat_history)
+            return await self.generate_vacancy_response(user_id, chat_history, on_delta)
+
+    @staticmethod
+    def _build_messages(system_prompt: str, chat_history: list[dict]) -> list[dict]:
+        """Системный промпт + история, сжатая до COMPOSE_HISTORY_TOKENS.
+
+        История сжимается на месте: хендлеры сохраняют тот же список в FSM,
+        поэтому и состояние не растёт с каждой доработкой.
+        """
+        system = {"role": "system", "content": system_prompt}
+        budget = settings.compose_history_tokens - estimate_messages_tokens([system])
+        compacted = compact_history(
+            chat_history, budget, keep_last=settings.compose_history_keep_last,
+        )
+        if compacted is not chat_history:
+            logger.info("Compacted chat history: %d -> %d", len(chat_history), len(compacted))
+            chat_history[:] = compacted
+        return [system] + chat_history
+
+    @staticmethod
+    async def _chat(messages: list[dict], on_delta: DeltaCallback | None) -> str:
+        """Запрос к LLM: целиком или потоком, если передан on_delta."""
+        client = get_llm_client()
+        with llm_task("compose"):
+            if on_delta is None:
+                return await client.generate_chat(messages=messages)
+
+            parts: list[str] = []
+            async for delta in client.stream_chat(messages=messages):
+                parts.append(delta)
+                on_delta(delta)
+        result = "".join(parts).strip()
+        if not result:
+            raise ValueError("LLM returned empty response")
+        return result
 
-    def save_as_template(self, user_id: str, content: str, msg_type: str = "broadcast") -> dict:
+    async def save_as_template(self, user_id: str, content: str,
+                               msg_type: str = "broadcast") -> dict:
         """Сохраняет текст как шаблон."""
-        return self._messages.create(
+        return await self._messages.create(
             user_id=user_id,
             type=msg_type,
             content=content,
             is_template=True,
         )
 
-    def get_templates(self, user_id: str) -> list[dict]:
+    async def get_templates(self, user_id: str) -> list[dict]:
         """Возвращает шаблоны пользователя."""
-        return self._messages.get_user_templates(user_id)
+        return await self._messages.get_user_templates(user_id)
 
-    def delete_template(self, message_id: str) -> None:
+    async def delete_template(self, message_id: str) -> None:
         """Удаляет шаблон."""
-        self._messages.delete(message_id)
+        await self._messages.delete(message_id)
@@ -3,7 +3,9 @@
 import logging
 import re
 
+from bot.config import settings
 from db.repositories.channels import ChannelRepository
+from parsers.search_cache import CachedChannelSearch
 from parsers.tgstat import TgstatParser
 
 logger = logging.getLogger(__name__)
@@ -24,42 +26,46 @@ class RadarService:
     """Бизнес-логика поиска и подключения каналов."""
 
     def __init__(self) -> None:
-        self._parser = TgstatParser()
+        self._parser = CachedChannelSearch(
+            TgstatParser(),
+            ttl=settings.search_cache_ttl,
+            stale_ttl=settings.search_cache_stale_ttl,
+            negative_ttl=settings.search_cache_negative_ttl,
+            max_size=settings.search_cache_size,
+        )
         self._repo = ChannelRepository()
 
-    async def search_channels(self, query: str, limit: int = 20) -> list[dict]:
+    async def search_channels(self, query: str, limit: int = 20,
+                              user_id: str | None = None) -> list[dict]:
         """Ищет каналы с вакансиями/работой, сохраняет в БД, возвращает список.
 
         К запросу автоматически добавляются контекстные слова (вакансии, фриланс...).
         Результаты фильтруются по наличию маркеров релевантности в названии/описании.
+        user_id ограничивает число одновременных поисков одного пользователя.
         """
         # Добавляем контекст к запросу
         enriched_query = f"{query} {_SEARCH_CONTEXT}"
-        parsed = await self._parser.search(enriched_query, limit=limit * 3)
+        parsed = await self._parser.search(enriched_query, limit=limit * 3, user_id=user_id)
         if not parsed:
             return []
 
-        channels: list[dict] = []
+        # Фильтруем: оставляем только каналы с маркерами релевантности
+        relevant: list[dict] = []
+        seen: set[str] = set()
         for item in parsed:
             username = item.get("username")
-            if not username:
+            if not username or username in seen:
                 continue
-
-            # Фильтруем: оставляем только каналы с маркерами релевантности
             if not self._is_relevant(item):
                 continue
-
-            channel = self._repo.get_or_create_by_username(
-                username=username,
-                title=item.get("title"),
-                description=item.get("description"),
-                subscribers_count=item.get("subscribers_count"),
-                category=item.get("category"),
-            )
-            channels.append(channel)
-            if len(channels) >= limit:
+            seen.add(username)
+            relevant.append(item)
+            if len(relevant) >= limit:
                 break
 
+        # Одной пачкой находим/создаём каналы в БД (порядок парсера сохраняется)
+        channels = await self._repo.upsert_many_by_username(relevant)
+
         logger.info("Radar search: %d relevant channels for query=%r", len(channels), query)
         return channels
 
@@ -74,21 +80,21 @@ class RadarService:
         ]))
         return bool(_RELEVANCE_MARKERS.search(text))
 
-    def get_user_channels(self, user_id: str) -> list[dict]:
+    async def get_user_channels(self, user_id: str) -> list[dict]:
         """Возвращает подключённые каналы пользователя."""
-        return self._repo.get_user_channels(user_id)
+        return await self._repo.get_user_channels(user_id)
 
-    def link_channel(self, user_id: str, channel_id: str, purpose: str) -> dict | None:
+    async def link_channel(self, user_id: str, channel_id: str, purpose: str) -> dict | None:
         """Подключает канал к пользователю. Пропускает, если уже привязан."""
-        existing = self._repo.get_user_channel(user_id, channel_id)
+        existing = await self._repo.get_user_channel(user_id, channel_id)
         if existing:
             return existing
-        return self._repo.link_to_user(user_id, channel_id, purpose)
+        return await self._repo.link_to_user(user_id, channel_id, purpose)
 
-    def unlink_channel(self, user_id: str, channel_id: str) -> None:
+    async def unlink_channel(self, user_id: str, channel_id: str) -> None:
         """Отключает канал от пользователя."""
-        self._repo.unlink_from_user(user_id, channel_id)
+        await self._repo.unlink_from_user(user_id, channel_id)
 
-    def update_channel_purpose(self, user_channel_id: str, purpose: str) -> dict:
+    async def update_channel_purpose(self, user_channel_id: str, purpose: str) -> dict:
         """Изменяет назначение канала."""
-        return self._repo.update_user_channel_purpose(user_channel_id, purpose)
+        return await self._repo.update_user_channel_purpose(user_channel_id, purpose)
@@ -0,0 +1,223 @@
+"""Классификация сообщений каналов на вакансии через LLM — пачками.
+
+Одно сообщение на запрос — это тысячи запросов в час на всех каналах.
+VacancyClassifier упаковывает несколько пронумерованных сообщений в один
+запрос и разбирает JSON-массив ответов:
+
+- пачки режутся по оценке токенов (CLASSIFY_BATCH_TOKENS) и числу
+  сообщений (CLASSIFY_BATCH_SIZE);
+- одинаковые тексты (перепосты) классифицируются один раз;
+- из обрезанного ответа (упёрся в max_tokens) берутся объекты, которые
+  успели закрыться; недостающие сообщения отправляются новой пачкой,
+  а если пачка не дала ни одного ответа — по одному.
+"""
+
+import asyncio
+import json
+import logging
+import re
+
+from bot.config import settings
+from llm.client import get_llm_client
+from llm.prompts.vacancy_classify import build_batch_prompt, build_prompt
+from llm.resilience import BACKGROUND, llm_priority
+from llm.router import llm_task
+from llm.tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Длинные посты обрезаются — для классификации хватает начала
+_MAX_MESSAGE_CHARS = 3000
+# Запас токенов ответа на одно сообщение и на весь ответ: объект с русским
+# названием и списком навыков — 100–180 токенов по оценке llm.tokens
+_OUTPUT_TOKENS_PER_ITEM = 250
+_OUTPUT_TOKENS_BASE = 50
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def parse_classification(raw: str) -> dict:
+    """Разбирает ответ на одно сообщение. ValueError — если это не ожидаемый JSON."""
+    data = json.loads(_CODE_FENCE.sub("", raw.strip()))
+    if not isinstance(data, dict) or not isinstance(data.get("is_vacancy"), bool):
+        raise ValueError(f"Unexpected classification: {raw[:200]!r}")
+    return data
+
+
+def parse_batch_classification(raw: str, count: int) -> list[dict | None]:
+    """Разбирает ответ на пачку из count сообщений.
+
+    Возвращает список длины count; None — для сообщений, которых нет в ответе.
+    Обрезанный массив разбирается до последнего целого объекта.
+    ValueError — если ответ вообще не JSON-массив.
+    """
+    text = _CODE_FENCE.sub("", raw.strip())
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        data = _complete_items(text)
+    if isinstance(data, dict):
+        # Некоторые модели заворачивают массив в объект
+        data = next((v for v in data.values() if isinstance(v, list)), None)
+    if not isinstance(data, list):
+        raise ValueError(f"Unexpected batch classification: {raw[:200]!r}")
+
+    results: list[dict | None] = [None] * count
+    for position, item in enumerate(data):
+        if not isinstance(item, dict) or not isinstance(item.get("is_vacancy"), bool):
+            continue
+        item_id = item.pop("id", None)
+        index = item_id - 1 if isinstance(item_id, int) else position
+        if 0 <= index < count and results[index] is None:
+            results[index] = item
+    return results
+
+
+def _complete_items(text: str) -> list:
+    """Целые элементы из начала обрезанного JSON-массива. ValueError — если это не массив."""
+    decoder = json.JSONDecoder()
+    start = text.find("[")
+    if start < 0:
+        raise ValueError(f"Unexpected batch classification: {text[:200]!r}")
+    items = []
+    position = start + 1
+    while True:
+        while position < len(text) and text[position] in " \t\r\n,":
+            position += 1
+        try:
+            item, position = decoder.raw_decode(text, position)
+        except json.JSONDecodeError:
+            return items
+        items.append(item)
+
+
+def _is_classification(raw: str) -> bool:
+    """Ответ разбирается parse_classification — только такой попадает в кэш LLM."""
+    parse_classification(raw)
+    return True
+
+
+class VacancyClassifier:
+    """Классифицирует сообщения каналов пачками по несколько на запрос."""
+
+    def __init__(
+        self,
+        batch_tokens: int | None = None,
+        batch_size: int | None = None,
+        concurrency: int | None = None,
+    ) -> None:
+        self._batch_tokens = batch_tokens or settings.classify_batch_tokens
+        self._batch_size = batch_size or settings.classify_batch_size
+        self._semaphore = asyncio.Semaphore(concurrency or settings.classify_concurrency)
+        self.requests = 0
+        self.fallbacks = 0
+
+    async def classify(self, text: str, keywords: list[str]) -> dict | None:
+        """Классифицирует одно сообщение. None — если LLM не ответила разборчиво."""
+        system_prompt, user_prompt = build_prompt(text[:_MAX_MESSAGE_CHARS], keywords)
+        try:
+            self.requests += 1
+            raw = await get_llm_client().generate_json(
+                system_prompt, user_prompt, validate=_is_classification,
+            )
+            return parse_classification(raw)
+        except Exception as e:
+            logger.warning("Vacancy classification failed: %s", e)
+            return None
+
+    async def classify_many(self, texts: list[str], keywords: list[str]) -> list[dict | None]:
+        """Классифицирует список сообщений; результат в том же порядке, что и texts.
+
+        Запросы идут с фоновым приоритетом — интерактивные запросы их обгоняют.
+        """
+        with llm_priority(BACKGROUND), llm_task("classify"):
+            return await self._classify_many(texts, keywords)
+
+    async def _classify_many(self, texts: list[str], keywords: list[str]) -> list[dict | None]:
+        # Перепосты одного объявления классифицируем один раз
+        unique: list[str] = []
+        index_of: dict[str, int] = {}
+        positions: list[int] = []
+        for text in texts:
+            trimmed = text[:_MAX_MESSAGE_CHARS]
+            key = _WHITESPACE.sub(" ", trimmed).strip().casefold()
+            if key not in index_of:
+                index_of[key] = len(unique)
+                unique.append(trimmed)
+            positions.append(index_of[key])
+
+        batches = self._split(unique, keywords)
+        batch_results = await asyncio.gather(
+            *(self._classify_batch([unique[i] for i in batch], keywords) for batch in batches),
+        )
+
+        unique_results: list[dict | None] = [None] * len(unique)
+        for batch, results in zip(batches, batch_results):
+            for i, result in zip(batch, results):
+                unique_results[i] = result
+
+        logger.info(
+            "Classified %d messages (%d unique) in %d batches",
+            len(texts), len(unique), len(batches),
+        )
+        return [unique_results[i] for i in positions]
+
+    def _split(self, texts: list[str], keywords: list[str]) -> list[list[int]]:
+        """Режет сообщения на пачки по бюджету токенов и числу сообщений."""
+        overhead = sum(estimate_tokens(part) for part in build_batch_prompt([], keywords))
+        batches: list[list[int]] = []
+        current: list[int] = []
+        used = overhead + _OUTPUT_TOKENS_BASE
+        for i, text in enumerate(texts):
+            cost = estimate_tokens(text) + _OUTPUT_TOKENS_PER_ITEM + 10
+            if current and (used + cost > self._batch_tokens or len(current) >= self._batch_size):
+                batches.append(current)
+                current = []
+                used = overhead + _OUTPUT_TOKENS_BASE
+            current.append(i)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _classify_batch(self, texts: list[str], keywords: list[str]) -> list[dict | None]:
+        if len(texts) == 1:
+            async with self._semaphore:
+                return [await self.classify(texts[0], keywords)]
+
+        system_prompt, user_prompt = build_batch_prompt(texts, keywords)
+        max_tokens = _OUTPUT_TOKENS_BASE + _OUTPUT_TOKENS_PER_ITEM * len(texts)
+        async with self._semaphore:
+            try:
+                self.requests += 1
+                raw = await get_llm_client().generate_json(
+                    system_prompt, user_prompt, max_tokens=max_tokens,
+                    # В кэш — только ответ, где разобрались все сообщения пачки
+                    validate=lambda text: None not in parse_batch_classification(
+                        text, len(texts),
+                    ),
+                )
+                results = parse_batch_classification(raw, len(texts))
+            except Exception as e:
+                logger.warning("Batch classification of %d failed: %s", len(texts), e)
+                results = [None] * len(texts)
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+        self.fallbacks += len(missing)
+        logger.info("Batch classification: %d/%d fall back", len(missing), len(texts))
+        if len(missing) < len(texts):
+            # Часть ответа разобралась — недостающие одной пачкой поменьше
+            retry = await self._classify_batch([texts[i] for i in missing], keywords)
+        else:
+            # Пачка не дала ничего — по одному
+            retry = [
+                result for (result,) in await asyncio.gather(
+                    *(self._classify_batch([texts[i]], keywords) for i in missing),
+                )
+            ]
+        for i, result in zip(missing, retry):
+            results[i] = result
+        return results
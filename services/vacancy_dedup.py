@@ -0,0 +1,93 @@
+"""Поиск перепостов одной вакансии среди сообщений каналов.
+
+Каждое сообщение получает SimHash-отпечаток (считается при сохранении,
+колонка channel_messages.simhash). Первое сообщение с новым текстом
+становится оригиналом, следующие почти одинаковые — его копиями
+(canonical_id). Результат классификации хранится для оригинала и
+переносится на копии без запроса к LLM.
+
+Индекс оригиналов живёт в памяти процесса и при первом обращении
+заполняется из БД за последние DEDUP_WINDOW_DAYS дней.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from bot.config import settings
+from db.repositories.vacancies import VacancyRepository
+from parsers.simhash import SimHashIndex, fingerprint, from_signed
+
+logger = logging.getLogger(__name__)
+
+# (is_vacancy, vacancy_data)
+Verdict = tuple[bool, dict | None]
+
+
+class VacancyDeduplicator:
+    """Индекс оригиналов сообщений и их известных классификаций."""
+
+    def __init__(self) -> None:
+        self._repo = VacancyRepository()
+        self._index: SimHashIndex[str] = SimHashIndex(
+            max_distance=settings.dedup_max_distance,
+            max_size=settings.dedup_index_size,
+        )
+        self._verdicts: OrderedDict[str, Verdict] = OrderedDict()
+        self._warmed = False
+        self._lock = asyncio.Lock()
+
+    async def warm(self) -> None:
+        """Загружает отпечатки и классификации за окно DEDUP_WINDOW_DAYS (один раз)."""
+        async with self._lock:
+            if self._warmed:
+                return
+            since = datetime.now(timezone.utc) - timedelta(days=settings.dedup_window_days)
+            rows = await self._repo.get_fingerprints(since.isoformat())
+            for row in rows:
+                if row.get("canonical_id") is None:
+                    self._index.add(row["id"], from_signed(row["simhash"]))
+                    if row.get("is_vacancy") is not None:
+                        self.record(row["id"], row["is_vacancy"], row.get("vacancy_data"))
+            self._warmed = True
+            logger.info("Duplicate index warmed: %d originals", len(self._index))
+
+    def group(self, messages: list[dict]) -> dict[str, list[dict]]:
+        """Раскладывает сообщения по оригиналам: {id оригинала: [сообщения]}.
+
+        Сообщения без совпадений сами становятся оригиналами и попадают в индекс.
+        """
+        groups: dict[str, list[dict]] = {}
+        for message in messages:
+            canonical_id = message.get("canonical_id")
+            if canonical_id is None:
+                value = message.get("simhash")
+                value = from_signed(value) if value is not None else fingerprint(message["text"])
+                canonical_id = self._index.find(value)
+                if canonical_id is None:
+                    canonical_id = message["id"]
+                    self._index.add(canonical_id, value)
+            groups.setdefault(canonical_id, []).append(message)
+        return groups
+
+    def verdict(self, canonical_id: str) -> Verdict | None:
+        return self._verdicts.get(canonical_id)
+
+    def record(self, canonical_id: str, is_vacancy: bool, vacancy_data: dict | None) -> None:
+        """Запоминает классификацию оригинала."""
+        self._verdicts[canonical_id] = (is_vacancy, vacancy_data)
+        self._verdicts.move_to_end(canonical_id)
+        if len(self._verdicts) > settings.dedup_index_size:
+            self._verdicts.popitem(last=False)
+
+
+_deduplicator: VacancyDeduplicator | None = None
+
+
+def get_vacancy_deduplicator() -> VacancyDeduplicator:
+    """Возвращает singleton индекса копий."""
+    global _deduplicator
+    if _deduplicator is None:
+        _deduplicator = VacancyDeduplicator()
+    return _deduplicator
@@ -0,0 +1,157 @@
+"""Сервис «Найти заказы» — двухступенчатая фильтрация сообщений каналов.
+
+0. VacancyDeduplicator — перепосты одной вакансии сводятся к оригиналу,
+   дальше проверяется только он.
+1. KeywordFilter — дешёвый предфильтр: маркеры вакансий и ключевые слова
+   всех активных профилей поиска (db.profile_index). Сообщения без единого
+   совпадения сразу помечаются как не-вакансии — для всех: channel_messages
+   общие, поэтому предфильтр по словам одного пользователя спрятал бы пост
+   от остальных подписчиков канала.
+2. VacancyClassifier — LLM-классификация оставшихся пачками.
+"""
+
+import logging
+
+from db.repositories.channels import ChannelRepository
+from db.repositories.search_profiles import SearchProfileRepository
+from db.repositories.vacancies import VacancyRepository
+from parsers.keyword_filter import KeywordFilter
+from services.vacancy_classifier import VacancyClassifier
+from services.vacancy_dedup import get_vacancy_deduplicator
+
+logger = logging.getLogger(__name__)
+
+# Сколько непроверенных сообщений брать за один поиск
+_UNFILTERED_LIMIT = 200
+# Во сколько раз больше вакансий запрашивать, чтобы после схлопывания копий хватило на limit
+_DUPLICATES_HEADROOM = 3
+
+
+class VacancyFilterService:
+    """Поиск вакансий в каналах пользователя: предфильтр + LLM."""
+
+    def __init__(self) -> None:
+        self._channels = ChannelRepository()
+        self._profiles = SearchProfileRepository()
+        self._vacancies = VacancyRepository()
+        self._classifier = VacancyClassifier()
+        self._dedup = get_vacancy_deduplicator()
+
+    async def find_vacancies(self, user_id: str, limit: int = 10) -> list[dict]:
+        """Проверяет новые сообщения каналов пользователя и возвращает вакансии.
+
+        Returns:
+            Сообщения channel_messages с is_vacancy = true и vacancy_data
+        """
+        links = [
+            link for link in await self._channels.get_user_channels(user_id)
+            if link["purpose"] in ("vacancies", "both")
+        ]
+        channel_ids = [link["channel_id"] for link in links]
+        if not channel_ids:
+            return []
+
+        profile = await self._profiles.get_active(user_id)
+        keywords = (profile or {}).get("keywords") or []
+
+        messages = await self._vacancies.get_unfiltered(channel_ids, limit=_UNFILTERED_LIMIT)
+        await self.filter_messages(messages, keywords)
+
+        # Копии одной вакансии из разных каналов — одной карточкой
+        vacancies = await self._vacancies.get_vacancies(
+            channel_ids, limit=limit * _DUPLICATES_HEADROOM,
+        )
+        seen: set[str] = set()
+        unique: list[dict] = []
+        for vacancy in vacancies:
+            key = vacancy.get("canonical_id") or vacancy["id"]
+            if key not in seen:
+                seen.add(key)
+                unique.append(vacancy)
+        return unique[:limit]
+
+    async def filter_messages(self, messages: list[dict], keywords: list[str],
+                              keyword_filter: KeywordFilter | None = None) -> list[dict]:
+        """Прогоняет сообщения через оба слоя и сохраняет результат в БД.
+
+        Перепосты одной вакансии классифицируются один раз: копии
+        привязываются к оригиналу и получают его результат. Привязки копий,
+        вакансии и не-вакансии пишутся в БД пачками после разбора всех групп.
+
+        Args:
+            messages: строки channel_messages
+            keywords: ключевые слова для промпта классификатора
+            keyword_filter: предфильтр; по умолчанию — по словам всех активных
+                профилей. Его отказы сохраняются как is_vacancy = false для
+                всех, поэтому он не должен быть уже слов подписчиков канала
+
+        Returns:
+            Сообщения-вакансии с заполненным vacancy_data
+        """
+        await self._dedup.warm()
+        not_vacancies = [message["id"] for message in messages if not message.get("text")]
+        groups = self._dedup.group([message for message in messages if message.get("text")])
+
+        if keyword_filter is None:
+            keyword_filter = (await self._profiles.get_index()).keyword_filter
+        pending: list[tuple[str, list[dict]]] = []
+        found: list[dict] = []
+        links: list[dict] = []
+        for canonical_id, members in groups.items():
+            for member in members:
+                if member["id"] != canonical_id and member.get("canonical_id") != canonical_id:
+                    member["canonical_id"] = canonical_id
+                    links.append(_row(member, canonical_id=canonical_id))
+
+            verdict = self._dedup.verdict(canonical_id)
+            if verdict is None and not keyword_filter.is_potential_vacancy(members[0]["text"]):
+                not_vacancies.extend(m["id"] for m in members)
+            elif verdict is None:
+                pending.append((canonical_id, members))
+            else:
+                _apply(members, *verdict, not_vacancies, found)
+
+        results = await self._classifier.classify_many(
+            [members[0]["text"] for _, members in pending], keywords,
+        ) if pending else []
+        for (canonical_id, members), result in zip(pending, results):
+            if result is None:
+                # LLM не ответила — сообщения останутся непроверенными до следующего поиска
+                continue
+            is_vacancy = result.pop("is_vacancy")
+            self._dedup.record(canonical_id, is_vacancy, result if is_vacancy else None)
+            _apply(members, is_vacancy, result, not_vacancies, found)
+
+        await self._vacancies.update_many(links)
+        await self._vacancies.update_many([
+            _row(m, is_vacancy=True, vacancy_data=m["vacancy_data"]) for m in found
+        ])
+        await self._vacancies.mark_many_as_not_vacancy(not_vacancies)
+        logger.info(
+            "Filtered %d messages: %d unique, %d sent to LLM, %d vacancies",
+            len(messages), len(groups), len(pending), len(found),
+        )
+        return found
+
+
+def _apply(members: list[dict], is_vacancy: bool, vacancy_data: dict | None,
+           not_vacancies: list[str], found: list[dict]) -> None:
+    """Переносит результат оригинала на все сообщения группы (в памяти)."""
+    if not is_vacancy:
+        not_vacancies.extend(m["id"] for m in members)
+        return
+    vacancy_data = vacancy_data or {}
+    for member in members:
+        member["is_vacancy"] = True
+        member["vacancy_data"] = vacancy_data
+    found.extend(members)
+
+
+def _row(message: dict, **fields) -> dict:
+    """Строка для VacancyRepository.update_many: ключ сообщения и новые поля."""
+    return {
+        "id": message["id"],
+        "channel_id": message["channel_id"],
+        "telegram_message_id": message["telegram_message_id"],
+        **fields,
+    }
@@ -0,0 +1,128 @@
+"""Фоновый мониторинг вакансий — один проход по каналам на всех подписчиков.
+
+Популярный канал вакансий привязан у многих пользователей. Вместо обхода
+каналов каждого пользователя цикл работает от каналов:
+
+1. все активные связи user_channels с purpose vacancies/both →
+   различные каналы и их подписчики;
+2. каждый канал скачивается один раз (ChannelParserService.parse_channels);
+3. каждое новое сообщение классифицируется один раз — предфильтр собран
+   из ключевых слов всех профилей поиска; очередь разбирается от старых
+   сообщений к новым, по monitor_batch_limit за цикл;
+4. все ещё не разосланные вакансии (notified_at IS NULL) — в том числе
+   разобранные ручным поиском — раздаются подписчикам канала, чей профиль
+   подходит по ключевым словам, min_budget и work_format — через индекс
+   профилей (db.profile_index), без перебора всех профилей.
+   Неизвестные бюджет и формат фильтр не отсекают. Разосланные вакансии
+   отмечаются notified_at; копия уже разосланного оригинала не приходит
+   подписчикам канала оригинала — они получили его в прошлых циклах.
+"""
+
+import logging
+
+from bot.config import settings
+from db.repositories.channels import ChannelRepository
+from db.repositories.search_profiles import SearchProfileRepository
+from db.repositories.vacancies import VacancyRepository
+from parsers.budget import parse_budget
+from services.channel_parser import ChannelParserService
+from services.vacancy_filter import VacancyFilterService
+
+logger = logging.getLogger(__name__)
+
+_PURPOSES = ("vacancies", "both")
+
+
+class VacancyMonitor:
+    """Цикл мониторинга: каналы → новые сообщения → вакансии → подписчики."""
+
+    def __init__(self) -> None:
+        self._channels = ChannelRepository()
+        self._profiles = SearchProfileRepository()
+        self._vacancies = VacancyRepository()
+        self._parser = ChannelParserService()
+        self._filter = VacancyFilterService()
+
+    async def run_cycle(self) -> dict[str, list[dict]]:
+        """Один проход мониторинга.
+
+        Returns:
+            {user_id: [сообщения-вакансии]}; у сообщения есть vacancy_data
+            и channels — строка канала
+        """
+        channels: dict[str, dict] = {}
+        subscribers: dict[str, set[str]] = {}
+        for link in await self._channels.get_subscriptions(_PURPOSES):
+            if not link.get("channels"):
+                continue
+            channels.setdefault(link["channel_id"], link["channels"])
+            subscribers.setdefault(link["channel_id"], set()).add(link["user_id"])
+        if not channels:
+            return {}
+
+        await self._parser.parse_channels(list(channels.values()))
+        index = await self._profiles.get_index()
+        messages = await self._vacancies.get_unfiltered(
+            list(channels), limit=settings.monitor_batch_limit, newest_first=False,
+        )
+        if messages:
+            await self._filter.filter_messages(messages, [], index.keyword_filter)
+        vacancies = await self._vacancies.get_unnotified(
+            list(channels), limit=settings.monitor_batch_limit,
+        )
+        if not vacancies:
+            return {}
+
+        matches: dict[str, list[dict]] = {}
+        # Копии одной вакансии из разных каналов пользователь получает один раз
+        delivered = await self._already_delivered(vacancies, subscribers)
+        for vacancy in vacancies:
+            vacancy["channels"] = channels[vacancy["channel_id"]]
+            key = vacancy.get("canonical_id") or vacancy["id"]
+            data = vacancy.get("vacancy_data") or {}
+            interested = index.match(
+                _searchable_text(vacancy), parse_budget(data.get("budget")),
+                data.get("work_format"),
+            )
+            for user_id in interested & subscribers[vacancy["channel_id"]]:
+                if (user_id, key) not in delivered:
+                    delivered.add((user_id, key))
+                    matches.setdefault(user_id, []).append(vacancy)
+        await self._vacancies.mark_notified([vacancy["id"] for vacancy in vacancies])
+
+        logger.info(
+            "Monitor cycle: %d channels, %d profiles, %d new messages, "
+            "%d vacancies, %d users matched",
+            len(channels), len(index), len(messages), len(vacancies), len(matches),
+        )
+        return matches
+
+    async def _already_delivered(self, vacancies: list[dict],
+                                 subscribers: dict[str, set[str]]) -> set[tuple[str, str]]:
+        """(user_id, canonical_id) копий, чей оригинал разослан в прошлых циклах.
+
+        Оригинал получили подписчики его канала — а вакансия у копий та же,
+        поэтому копия им уже не нужна.
+        """
+        canonical_ids = list({
+            vacancy["canonical_id"] for vacancy in vacancies if vacancy.get("canonical_id")
+        })
+        if not canonical_ids:
+            return set()
+        return {
+            (user_id, original["id"])
+            for original in await self._vacancies.get_notified(canonical_ids)
+            for user_id in subscribers.get(original["channel_id"], ())
+        }
+
+    async def close(self) -> None:
+        await self._parser.close()
+
+
+def _searchable_text(vacancy: dict) -> str:
+    """Текст поста вместе с названием и навыками, которые выделила LLM."""
+    data = vacancy.get("vacancy_data") or {}
+    parts = [vacancy.get("text") or "", data.get("title") or ""]
+    parts.extend(skill for skill in data.get("skills") or [] if isinstance(skill, str))
+    return "\n".join(parts)
+
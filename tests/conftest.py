@@ -0,0 +1,8 @@
+"""Общие настройки тестов: bot.config требует переменные окружения при импорте."""
+
+import os
+
+os.environ.setdefault("BOT_TOKEN", "123456:test-token")
+os.environ.setdefault("SUPABASE_URL", "https://test.supabase.co")
+os.environ.setdefault("SUPABASE_KEY", "test.supabase.key")
+os.environ.setdefault("LLM_API_KEY", "sk-test")
@@ -0,0 +1,27 @@
+"""Разбор бюджета вакансии в рубли."""
+
+import pytest
+
+from parsers.budget import parse_budget
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("от 30 000 ₽", 30_000),
+        ("от 30 000 руб", 30_000),
+        ("40-60к", 60_000),
+        ("до 100 тыс. руб", 100_000),
+        ("1,5 млн", 1_500_000),
+        ("2.5k", 2_500),
+        (50_000, 50_000),
+        (12_000.0, 12_000),
+    ],
+)
+def test_largest_amount_in_rubles(text, expected):
+    assert parse_budget(text) == expected
+
+
+@pytest.mark.parametrize("text", [None, "", "договорная", "$500", "1000 USD", "300 евро"])
+def test_unknown_or_foreign_budget(text):
+    assert parse_budget(text) is None
@@ -0,0 +1,68 @@
+"""Пробный запрос полуоткрытого предохранителя должен освобождаться при любом исходе."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from llm.resilience import CircuitBreaker, CircuitOpenError
+from llm.router import Endpoint, EndpointConfig, EndpointRouter
+
+
+def _half_open(breaker: CircuitBreaker) -> None:
+    for _ in range(5):
+        breaker.record_failure()
+    breaker._opened_at = time.monotonic() - breaker._reset_timeout - 1
+    assert breaker.state == "half_open"
+
+
+def _endpoint(create) -> Endpoint:
+    endpoint = Endpoint(EndpointConfig(name="test", base_url="http://test", api_key="x",
+                                       model="test-model"))
+    endpoint.breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30.0)
+    endpoint.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=create,
+    )))
+    return endpoint
+
+
+def test_second_call_rejected_while_probe_in_flight():
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30.0)
+    _half_open(breaker)
+    assert breaker.before_call() is True
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_cancelled_probe_releases_breaker():
+    async def hang(**kwargs):
+        await asyncio.sleep(3600)
+
+    async def scenario():
+        endpoint = _endpoint(hang)
+        _half_open(endpoint.breaker)
+        router = EndpointRouter([endpoint])
+        probe = asyncio.create_task(router._call(endpoint, {}, 10, 0, attempts=1))
+        await asyncio.sleep(0)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        return endpoint
+
+    endpoint = asyncio.run(scenario())
+    assert endpoint.breaker.state == "half_open"
+    # Следующий запрос снова пропускается как проба, а не отклоняется
+    assert endpoint.breaker.before_call() is True
+
+
+def test_non_retryable_probe_error_releases_breaker():
+    async def bad_request(**kwargs):
+        raise ValueError("context length exceeded")
+
+    endpoint = _endpoint(bad_request)
+    _half_open(endpoint.breaker)
+    router = EndpointRouter([endpoint])
+    with pytest.raises(ValueError):
+        asyncio.run(router._call(endpoint, {}, 10, 0, attempts=3))
+    assert endpoint.breaker.before_call() is True
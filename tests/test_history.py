@@ -0,0 +1,56 @@
+"""Сжатие истории «Составить текст» по бюджету токенов."""
+
+from llm.history import _SUMMARY_PREFIX, compact_history
+
+
+def _vacancy_chat(refines: int) -> list[dict]:
+    """История отклика: профиль, вакансия, резюме, черновик и доработки."""
+    history = [
+        {"role": "user", "content": "Профиль: дизайнер интерфейсов. " * 20},
+        {"role": "user", "content": "Вакансия: ищем дизайнера в финтех-стартап. " * 60},
+        {"role": "user", "content": "Резюме: пять лет в продуктовых командах. " * 20},
+        {"role": "assistant", "content": "Черновик отклика. " * 150},
+    ]
+    for i in range(refines):
+        history.append({"role": "user", "content": f"Доработка {i}: сделай короче"})
+        history.append({"role": "assistant", "content": f"Вариант {i}. " * 150})
+    return history
+
+
+def test_vacancy_context_is_pinned():
+    history = _vacancy_chat(refines=4)
+
+    compacted = compact_history(history, max_tokens=3000, keep_last=2)
+
+    assert compacted[:3] == history[:3]
+    summary = compacted[3]["content"]
+    assert summary.startswith(_SUMMARY_PREFIX)
+    assert "Доработка 0" in summary and "Вакансия" not in summary
+    # Промежуточные черновики выброшены, последняя пара осталась
+    assert compacted[4:] == history[-2:]
+
+
+def test_repeated_compaction_merges_summary():
+    history = _vacancy_chat(refines=4)
+    compacted = compact_history(history, max_tokens=3000, keep_last=2)
+    compacted += _vacancy_chat(refines=6)[-4:]
+
+    again = compact_history(compacted, max_tokens=3000, keep_last=2)
+
+    assert again[:3] == history[:3]
+    summaries = [m for m in again if m["content"].startswith(_SUMMARY_PREFIX)]
+    assert len(summaries) == 1
+    assert "Доработка 0" in summaries[0]["content"]
+    assert "Доработка 4" in summaries[0]["content"]
+
+
+def test_history_within_budget_is_returned_as_is():
+    history = _vacancy_chat(refines=1)
+
+    assert compact_history(history, max_tokens=100_000) is history
+
+
+def test_context_without_answers_is_not_compacted():
+    history = _vacancy_chat(refines=0)[:3]
+
+    assert compact_history(history, max_tokens=10, keep_last=1) is history
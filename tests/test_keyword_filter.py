@@ -0,0 +1,49 @@
+"""Предфильтр постов: стемминг, префиксы, фразы и владельцы ключевых слов."""
+
+from parsers.keyword_filter import MARKERS, KeywordFilter, stem
+
+
+def test_stem_strips_russian_endings_and_latin_plural():
+    assert stem("Дизайнера") == "дизайнер"
+    assert stem("разработчиков") == "разработчик"
+    assert stem("боты") == "бот"
+    assert stem("jobs") == "job"
+    assert stem("Ёлки") == "елк"
+    # Короткие слова не обрезаются до одной-двух букв
+    assert stem("тз") == "тз"
+
+
+def test_long_stem_matches_as_prefix_short_only_exactly():
+    keyword_filter = KeywordFilter.for_owners({"design": ["дизайн"], "bots": ["бот"]}, markers=[])
+
+    assert keyword_filter.match("Нужен дизайнерский аудит") == {"design"}
+    assert keyword_filter.match("Пишу ботов на заказ") == {"bots"}
+    assert keyword_filter.match("Лекция по ботанике") == set()
+
+
+def test_phrase_needs_following_words():
+    keyword_filter = KeywordFilter.for_owners({"tg": ["telegram бот"]}, markers=[])
+
+    assert keyword_filter.match("Нужен Telegram бота для магазина") == {"tg"}
+    assert keyword_filter.match("telegram канал и бот") == set()
+
+
+def test_markers_and_user_keywords():
+    keyword_filter = KeywordFilter(["figma"])
+
+    assert keyword_filter.match("Ищу исполнителя") == {MARKERS}
+    assert keyword_filter.match("Макеты в Figma") == {"user"}
+    assert not keyword_filter.is_potential_vacancy("Сегодня хорошая погода")
+
+
+def test_remove_drops_only_that_owner():
+    keyword_filter = KeywordFilter.for_owners(
+        {"a": ["python"], "b": ["python", "django"]}, markers=[],
+    )
+
+    keyword_filter.remove("b")
+
+    assert keyword_filter.match("Python и Django") == {"a"}
+    assert keyword_filter.owners == {"a"}
+    keyword_filter.remove("a")
+    assert keyword_filter.match("Python") == set()
@@ -0,0 +1,74 @@
+"""Кэш ответов LLM хранит только ответы, прошедшие проверку вызывающего."""
+
+import asyncio
+from types import SimpleNamespace
+
+import llm.cache
+import llm.client
+from llm.cache import CompletionCache, MemoryBackend
+from llm.client import LLMClient
+from llm.router import EndpointConfig, llm_task
+from services.vacancy_classifier import VacancyClassifier
+
+
+def _response(text: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=text))], usage=None,
+    )
+
+
+def test_malformed_classification_is_not_cached(monkeypatch):
+    monkeypatch.setattr(llm.cache, "_cache", CompletionCache(MemoryBackend(), ttl=60))
+    client = LLMClient()
+    monkeypatch.setattr(llm.client, "_client", client)
+    answers = ['{"is_vacancy": tr', '{"is_vacancy": true, "title": "Бот"}']
+    calls = []
+
+    async def create(params, estimated, priority, task):
+        calls.append(params)
+        endpoint = client._router.candidates(task)[0]
+        return endpoint, _response(answers[min(len(calls), len(answers)) - 1])
+
+    monkeypatch.setattr(client._router, "create", create)
+    classifier = VacancyClassifier()
+
+    async def scenario():
+        return [await classifier.classify("Ищу разработчика бота", []) for _ in range(3)]
+
+    first, second, third = asyncio.run(scenario())
+    assert first is None
+    # Битый ответ не попал в кэш — второй раз запрос ушёл в LLM
+    assert second == third == {"is_vacancy": True, "title": "Бот"}
+    # Третий — из кэша
+    assert len(calls) == 2
+
+
+def test_cache_key_follows_task_routing(monkeypatch):
+    monkeypatch.setattr(llm.cache, "_cache", CompletionCache(MemoryBackend(), ttl=60))
+    monkeypatch.setattr(llm.client, "load_endpoint_configs", lambda: [
+        EndpointConfig(name="strong", base_url="http://a", api_key="x", model="strong-model",
+                       tasks=("compose",)),
+        EndpointConfig(name="cheap", base_url="http://b", api_key="x", model="cheap-model",
+                       tasks=("classify",)),
+    ])
+    client = LLMClient()
+    calls = []
+
+    async def create(params, estimated, priority, task):
+        calls.append(task)
+        return client._router.candidates(task)[0], _response(f"answer for {task}")
+
+    monkeypatch.setattr(client._router, "create", create)
+
+    async def ask(task: str) -> str:
+        with llm_task(task):
+            return await client.generate("system", "user", temperature=0.0)
+
+    async def scenario():
+        return [await ask("classify"), await ask("compose"), await ask("classify")]
+
+    assert asyncio.run(scenario()) == [
+        "answer for classify", "answer for compose", "answer for classify",
+    ]
+    # Одинаковые сообщения разных задач — разные записи; повтор classify — из кэша
+    assert calls == ["classify", "compose"]
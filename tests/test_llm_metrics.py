@@ -0,0 +1,32 @@
+"""Расход токенов по пользователям в LLMMetrics не растёт без предела."""
+
+import llm.metrics
+from llm.metrics import CallRecord, LLMMetrics
+
+
+def _call(user_id: str, tokens: int) -> CallRecord:
+    return CallRecord(
+        tag="compose", model="m", endpoint="e", user_id=user_id,
+        prompt_tokens=tokens, cached_tokens=0, completion_tokens=0, duration=0.1,
+    )
+
+
+def test_user_tokens_are_capped_into_other(monkeypatch):
+    monkeypatch.setattr(llm.metrics, "_MAX_USERS", 4)
+    metrics = LLMMetrics()
+    for i in range(10):
+        metrics.record(_call(f"u{i}", 100 + i))
+
+    assert len(metrics.user_tokens) <= 5
+    assert sum(metrics.user_tokens.values()) == sum(100 + i for i in range(10))
+    assert metrics.user_tokens["u9"] == 109
+    assert metrics.summary()["top_users"][0] == ("other", metrics.user_tokens["other"])
+
+
+def test_reset_users_starts_new_interval():
+    metrics = LLMMetrics()
+    metrics.record(_call("u1", 10))
+    metrics.reset_users()
+
+    assert metrics.summary()["top_users"] == []
+    assert metrics.token_totals()["prompt"] == 10
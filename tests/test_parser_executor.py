@@ -0,0 +1,37 @@
+"""ParserExecutor держит слот, пока работает поток, даже после отмены вызова."""
+
+import asyncio
+import threading
+
+from parsers.executor import ParserExecutor
+
+
+def test_cancelled_call_keeps_slot_until_thread_finishes():
+    async def scenario() -> None:
+        executor = ParserExecutor(max_workers=2, max_in_flight=1, per_user=1)
+        started, release = threading.Event(), threading.Event()
+
+        def blocking() -> str:
+            started.set()
+            release.wait(5)
+            return "slow"
+
+        first = asyncio.create_task(executor.run(blocking, user_id="u1"))
+        await asyncio.to_thread(started.wait, 5)
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+
+        # Поток ещё работает — слот занят, следующий вызов ждёт
+        second = asyncio.create_task(executor.run(lambda: "next", user_id="u1"))
+        await asyncio.sleep(0.05)
+        assert executor.stats()["in_flight"] == 1
+        assert executor.stats()["waiting"] == 1
+        assert not second.done()
+
+        release.set()
+        assert await asyncio.wait_for(second, 5) == "next"
+        assert executor.stats()["in_flight"] == 0
+        assert executor._user_slots == {}
+        executor.shutdown()
+
+    asyncio.run(scenario())
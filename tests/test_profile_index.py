@@ -0,0 +1,54 @@
+"""Индекс профилей поиска: маски ключевых слов, бюджета и формата."""
+
+from db.profile_index import ProfileIndex
+
+
+def _index() -> ProfileIndex:
+    index = ProfileIndex()
+    index.load([
+        {"id": "p1", "user_id": "u1", "keywords": ["Python"], "min_budget": 50_000,
+         "work_format": ["project"]},
+        {"id": "p2", "user_id": "u2", "keywords": []},
+        {"id": "p3", "user_id": "u3", "keywords": ["figma"]},
+    ])
+    return index
+
+
+def test_match_filters_by_keywords_budget_and_format():
+    index = _index()
+
+    assert index.match("Python проект", 60_000, "project") == {"u1", "u2"}
+    assert index.match("Python проект", 40_000) == {"u2"}
+    assert index.match("Python", None, "oneoff") == {"u2"}
+    # Неизвестные бюджет и формат не отсекают
+    assert index.match("Макет в Figma") == {"u2", "u3"}
+
+
+def test_remove_clears_bits_and_keywords():
+    index = _index()
+
+    index.remove("p1")
+
+    assert index.match("Python", 60_000, "project") == {"u2"}
+    assert "python" not in index.keyword_filter.owners
+    assert len(index) == 2
+
+
+def test_upsert_reuses_slot_and_drops_inactive():
+    index = _index()
+    index.remove("p1")
+
+    index.upsert({"id": "p4", "user_id": "u4", "keywords": ["rust"]})
+    index.upsert({"id": "p3", "user_id": "u3", "keywords": ["figma"], "is_active": False})
+
+    assert index._slots["p4"] == 0
+    assert index.match("Rust и Figma") == {"u2", "u4"}
+
+
+def test_changes_before_load_are_applied_after_it():
+    index = ProfileIndex()
+    index.upsert({"id": "p9", "user_id": "u9", "keywords": ["go"]})
+
+    index.load([])
+
+    assert index.match("go разработчик") == {"u9"}
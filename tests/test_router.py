@@ -0,0 +1,43 @@
+"""Хеджирование: отменённый медленный запрос не портит статистику и предохранитель."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from llm.resilience import CircuitBreaker
+from llm.router import Endpoint, EndpointConfig, EndpointRouter
+
+
+def _endpoint(name: str, create) -> Endpoint:
+    endpoint = Endpoint(EndpointConfig(name=name, base_url="http://test", api_key="x",
+                                       model=f"{name}-model"))
+    endpoint.breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30.0)
+    endpoint.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=create,
+    )))
+    return endpoint
+
+
+def test_cancelled_hedge_is_not_a_latency_sample_and_releases_probe():
+    async def hang(**kwargs):
+        await asyncio.sleep(3600)
+
+    async def fast(**kwargs):
+        return SimpleNamespace(usage=None, model=kwargs["model"])
+
+    slow_endpoint = _endpoint("slow", hang)
+    fast_endpoint = _endpoint("fast", fast)
+    # Медленный endpoint — в half_open: его запрос и есть проба
+    for _ in range(5):
+        slow_endpoint.breaker.record_failure()
+    slow_endpoint.breaker._opened_at = time.monotonic() - 31
+
+    router = EndpointRouter([slow_endpoint, fast_endpoint], hedge_after=0.01)
+    endpoint, _ = asyncio.run(
+        router._hedged([slow_endpoint, fast_endpoint], {}, 10, 0),
+    )
+
+    assert endpoint is fast_endpoint
+    assert slow_endpoint.stats.snapshot()["samples"] == 0
+    assert fast_endpoint.stats.snapshot()["samples"] == 1
+    assert slow_endpoint.breaker.before_call() is True
@@ -0,0 +1,35 @@
+"""Фоновое обновление кэша поиска каналов."""
+
+import asyncio
+import logging
+
+from parsers.search_cache import CachedChannelSearch
+
+
+class _Parser:
+    def __init__(self) -> None:
+        self.fail = False
+
+    async def search(self, query: str, limit: int = 20, user_id: str | None = None) -> list[dict]:
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("tgstat restricted")
+        return [{"username": "python_jobs"}]
+
+
+def test_failed_background_refresh_is_logged(caplog):
+    async def scenario() -> None:
+        parser = _Parser()
+        cache = CachedChannelSearch(parser, ttl=0, stale_ttl=60)
+        assert await cache.search("Python") == [{"username": "python_jobs"}]
+
+        parser.fail = True
+        # Устаревшая запись отдаётся сразу, обновление уходит в фон
+        assert await cache.search("python") == [{"username": "python_jobs"}]
+        assert len(cache._background) == 1
+        await asyncio.sleep(0.01)
+        assert cache._background == set()
+
+    with caplog.at_level(logging.WARNING, logger="parsers.search_cache"):
+        asyncio.run(scenario())
+    assert "tgstat restricted" in caplog.text
@@ -0,0 +1,46 @@
+"""SimHash-отпечатки и индекс почти одинаковых сообщений."""
+
+from parsers.simhash import SimHashIndex, fingerprint, from_signed, hamming, to_signed
+
+_VACANCY = (
+    "Ищем дизайнера интерфейсов для мобильного приложения доставки еды. Нужно отрисовать "
+    "около тридцати экранов в Figma, подготовить дизайн-систему и передать макеты "
+    "разработчикам. Бюджет 80 тысяч рублей, срок три недели, оплата поэтапно. "
+    "Пишите в личку с портфолио."
+)
+_NEWS = (
+    "Сегодня в канале подборка новостей про рынок фриланса: ставки растут, заказчики "
+    "всё чаще просят знание нейросетей, а биржи меняют комиссии для новых исполнителей."
+)
+
+
+def test_reposts_are_close_and_different_texts_are_far():
+    original = fingerprint(_VACANCY)
+
+    # Ссылки, эмодзи и регистр не влияют на отпечаток
+    assert fingerprint(f"🔥 {_VACANCY.upper()} https://t.me/jobs/123") == original
+    assert hamming(original, fingerprint(_VACANCY + " #вакансия")) <= 6
+    assert hamming(original, fingerprint(_NEWS)) > 16
+    assert fingerprint("") == 0
+
+
+def test_signed_roundtrip_for_bigint_column():
+    value = (1 << 64) - 5
+    assert to_signed(value) == -5
+    assert from_signed(to_signed(value)) == value
+    assert to_signed(42) == 42
+
+
+def test_index_finds_near_copy_and_evicts_oldest():
+    index: SimHashIndex[str] = SimHashIndex(max_distance=6, max_size=2)
+    index.add("vacancy", fingerprint(_VACANCY))
+
+    assert index.find(fingerprint(_VACANCY + " #вакансия")) == "vacancy"
+    assert index.find(fingerprint(_NEWS)) is None
+
+    index.add("news", fingerprint(_NEWS))
+    index.add("other", fingerprint("Совсем другой текст про погоду на выходных"))
+
+    assert len(index) == 2
+    assert index.find(fingerprint(_VACANCY)) is None
+    assert index.find(fingerprint(_NEWS)) == "news"
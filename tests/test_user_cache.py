@@ -0,0 +1,32 @@
+"""Кэш пользователей не хранит строку, прочитанную до изменения пользователя."""
+
+from db.user_cache import UserCache
+
+
+def _user(plan: str) -> dict:
+    return {"id": "u1", "telegram_id": 100, "plan": plan}
+
+
+def test_put_after_concurrent_invalidate_is_skipped():
+    cache = UserCache()
+    version = cache.version()
+    stale = _user("free")
+    # Пока строка читалась из БД, пользователь сменил тариф
+    cache.invalidate("u1")
+    cache.put(stale, version)
+
+    assert cache.get(100) is None
+
+    cache.put(_user("pro"), cache.version())
+    assert cache.get(100)["plan"] == "pro"
+
+
+def test_evicted_invalidation_still_blocks_older_reads():
+    cache = UserCache(max_size=1)
+    version = cache.version()
+    cache.invalidate("u1")
+    cache.invalidate("u2")
+
+    cache.put(_user("free"), version)
+
+    assert cache.get(100) is None
@@ -0,0 +1,40 @@
+"""Пачечная классификация: обрезанный ответ не отправляет всю пачку по одному."""
+
+import asyncio
+import json
+
+import services.vacancy_classifier
+from services.vacancy_classifier import VacancyClassifier, parse_batch_classification
+
+
+def _item(item_id: int) -> dict:
+    return {"id": item_id, "is_vacancy": True, "title": f"Задача {item_id}", "skills": []}
+
+
+def test_truncated_batch_keeps_complete_items():
+    raw = json.dumps([_item(1), _item(2)], ensure_ascii=False)[:-1] + ', {"id": 3, "is_vac'
+
+    results = parse_batch_classification(raw, 3)
+
+    assert [r and r["title"] for r in results] == ["Задача 1", "Задача 2", None]
+
+
+def test_only_missing_items_are_retried(monkeypatch):
+    prompts: list[str] = []
+
+    class _Client:
+        async def generate_json(self, system_prompt, user_prompt, **kwargs) -> str:
+            prompts.append(user_prompt)
+            if len(prompts) == 1:
+                # Ответ упёрся в max_tokens на третьем объекте
+                return json.dumps([_item(1), _item(2)])[:-1] + ', {"id": 3, "ti'
+            return json.dumps({"is_vacancy": False})
+
+    monkeypatch.setattr(services.vacancy_classifier, "get_llm_client", lambda: _Client())
+    classifier = VacancyClassifier(batch_tokens=100_000, batch_size=10, concurrency=2)
+
+    results = asyncio.run(classifier.classify_many(["первый", "второй", "третий"], []))
+
+    assert [r["is_vacancy"] for r in results] == [True, True, False]
+    assert len(prompts) == 2
+    assert "третий" in prompts[1] and "первый" not in prompts[1]
@@ -0,0 +1,103 @@
+"""Фильтр вакансий: общий предфильтр и пачечная запись результатов."""
+
+import asyncio
+
+from db.profile_index import ProfileIndex
+from services.vacancy_filter import VacancyFilterService
+
+
+class _Profiles:
+    def __init__(self, profiles: list[dict]) -> None:
+        self._index = ProfileIndex()
+        self._index.load(profiles)
+
+    async def get_index(self) -> ProfileIndex:
+        return self._index
+
+
+class _Vacancies:
+    def __init__(self) -> None:
+        self.not_vacancies: list[str] = []
+        self.updates: list[list[dict]] = []
+
+    async def mark_many_as_not_vacancy(self, ids: list[str]) -> None:
+        self.not_vacancies.extend(ids)
+
+    async def update_many(self, rows: list[dict]) -> None:
+        self.updates.append(rows)
+
+
+class _Dedup:
+    async def warm(self) -> None:
+        pass
+
+    def group(self, messages: list[dict]) -> dict[str, list[dict]]:
+        # Перепосты — сообщения с одинаковым текстом
+        groups: dict[str, list[dict]] = {}
+        first: dict[str, str] = {}
+        for message in messages:
+            canonical_id = first.setdefault(message["text"], message["id"])
+            groups.setdefault(canonical_id, []).append(message)
+        return groups
+
+    def verdict(self, canonical_id: str) -> None:
+        return None
+
+    def record(self, *args) -> None:
+        pass
+
+
+class _Classifier:
+    def __init__(self) -> None:
+        self.texts: list[str] = []
+
+    async def classify_many(self, texts: list[str], keywords: list[str]) -> list[dict]:
+        self.texts.extend(texts)
+        return [{"is_vacancy": True, "title": text[:20]} for text in texts]
+
+
+def _service() -> VacancyFilterService:
+    service = VacancyFilterService.__new__(VacancyFilterService)
+    service._profiles = _Profiles([
+        {"id": "p1", "user_id": "u1", "keywords": ["figma"]},
+        {"id": "p2", "user_id": "u2", "keywords": ["python"]},
+    ])
+    service._vacancies = _Vacancies()
+    service._dedup = _Dedup()
+    service._classifier = _Classifier()
+    return service
+
+
+def _message(message_id: str, text: str) -> dict:
+    return {"id": message_id, "channel_id": "c1", "telegram_message_id": 1, "text": text}
+
+
+def test_post_matching_another_subscriber_is_not_rejected():
+    service = _service()
+    messages = [
+        _message("m1", "Разработка на Python, пишите в личку"),
+        _message("m2", "Сегодня в канале подборка новостей"),
+    ]
+
+    found = asyncio.run(service.filter_messages(messages, ["figma"]))
+
+    assert [message["id"] for message in found] == ["m1"]
+    assert service._vacancies.not_vacancies == ["m2"]
+
+
+def test_reposts_and_vacancies_are_written_in_bulk():
+    service = _service()
+    messages = [
+        _message("m1", "Ищем Python разработчика"),
+        _message("m2", "Ищем Python разработчика"),
+        _message("m3", "Нужен дизайнер Figma"),
+        _message("m4", "Нужен дизайнер Figma"),
+    ]
+
+    found = asyncio.run(service.filter_messages(messages, ["python"]))
+
+    assert [message["id"] for message in found] == ["m1", "m2", "m3", "m4"]
+    links, vacancies = service._vacancies.updates
+    assert [(row["id"], row["canonical_id"]) for row in links] == [("m2", "m1"), ("m4", "m3")]
+    assert [row["id"] for row in vacancies] == ["m1", "m2", "m3", "m4"]
+    assert all(row["is_vacancy"] and row["channel_id"] == "c1" for row in vacancies)
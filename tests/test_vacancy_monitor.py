@@ -0,0 +1,117 @@
+"""Мониторинг рассылает вакансии по notified_at и не повторяет копии."""
+
+import asyncio
+
+from db.profile_index import ProfileIndex
+from services.vacancy_monitor import VacancyMonitor
+
+
+class _Channels:
+    def __init__(self) -> None:
+        self.links = [("c1", "u1")]
+
+    async def get_subscriptions(self, purposes: tuple[str, ...]) -> list[dict]:
+        return [
+            {"channel_id": channel_id, "user_id": user_id, "channels": {"id": channel_id}}
+            for channel_id, user_id in self.links
+        ]
+
+
+class _Profiles:
+    def __init__(self) -> None:
+        self._index = ProfileIndex()
+        self._index.load([
+            {"id": "p1", "user_id": "u1", "keywords": ["python"]},
+            {"id": "p2", "user_id": "u2", "keywords": ["python"]},
+        ])
+
+    async def get_index(self) -> ProfileIndex:
+        return self._index
+
+
+class _Parser:
+    async def parse_channels(self, channels: list[dict]) -> None:
+        pass
+
+
+class _Filter:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def filter_messages(self, messages, keywords, keyword_filter) -> list[dict]:
+        self.calls += 1
+        return []
+
+
+class _Vacancies:
+    """Сообщения в памяти: одна вакансия уже разобрана ручным поиском."""
+
+    def __init__(self) -> None:
+        self.rows = [_vacancy("m1", "c1")]
+        self.unfiltered_order: list[bool] = []
+
+    async def get_unfiltered(self, channel_ids, limit=100, newest_first=True) -> list[dict]:
+        self.unfiltered_order.append(newest_first)
+        return [row for row in self.rows if row["is_vacancy"] is None]
+
+    async def get_unnotified(self, channel_ids, limit=100) -> list[dict]:
+        return [dict(row) for row in self.rows if row["is_vacancy"] and not row["notified_at"]]
+
+    async def get_notified(self, ids: list[str]) -> list[dict]:
+        return [
+            {"id": row["id"], "channel_id": row["channel_id"]}
+            for row in self.rows if row["id"] in ids and row["notified_at"]
+        ]
+
+    async def mark_notified(self, ids: list[str]) -> None:
+        for row in self.rows:
+            if row["id"] in ids:
+                row["notified_at"] = "now"
+
+
+def _vacancy(message_id: str, channel_id: str, canonical_id: str | None = None) -> dict:
+    return {
+        "id": message_id, "channel_id": channel_id, "telegram_message_id": 1,
+        "text": "Ищем Python разработчика", "is_vacancy": True,
+        "vacancy_data": {"title": "Python"}, "canonical_id": canonical_id,
+        "notified_at": None,
+    }
+
+
+def _monitor() -> VacancyMonitor:
+    monitor = VacancyMonitor.__new__(VacancyMonitor)
+    monitor._channels = _Channels()
+    monitor._profiles = _Profiles()
+    monitor._parser = _Parser()
+    monitor._filter = _Filter()
+    monitor._vacancies = _Vacancies()
+    return monitor
+
+
+def test_already_classified_vacancy_is_delivered_once():
+    monitor = _monitor()
+
+    first = asyncio.run(monitor.run_cycle())
+    second = asyncio.run(monitor.run_cycle())
+
+    assert [vacancy["id"] for vacancy in first["u1"]] == ["m1"]
+    assert second == {}
+    # Нечего классифицировать — фильтр не вызывается; очередь берётся от старых
+    assert monitor._filter.calls == 0
+    assert monitor._vacancies.unfiltered_order == [False, False]
+
+
+def test_repost_in_later_cycle_skips_subscribers_of_original():
+    monitor = _monitor()
+    monitor._channels.links = [("c1", "u1"), ("c2", "u1"), ("c2", "u2")]
+    monitor._vacancies.rows = [_vacancy("m1", "c1")]
+    first = asyncio.run(monitor.run_cycle())
+
+    # Перепост оригинала m1 появился в другом канале позже
+    monitor._vacancies.rows.append(_vacancy("m2", "c2", canonical_id="m1"))
+    second = asyncio.run(monitor.run_cycle())
+
+    assert [vacancy["id"] for vacancy in first["u1"]] == ["m1"]
+    assert {user_id: [v["id"] for v in found] for user_id, found in second.items()} == {
+        "u2": ["m2"],
+    }